@@ -0,0 +1,270 @@
+from dataclasses import dataclass
+from decimal import Decimal, localcontext
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from compounding import find_shifted_deposits
+from models import *
+
+# Vectorized evaluation of many investment scenarios at once (e.g. thousands of client plans).
+# One scenario = one InvestmentContext + one Deposit, every parameter is a column (array) of the batch.
+# A scenario holds exactly one deposit - a plan with several deposits (e.g. an entry deposit and monthly deposits)
+# is evaluated as one scenario per deposit with the same context, and the results of its rows are summed.
+# The formulas are the same as in Deposit.calculate_future_value / calculate_yearly_future_values,
+# evaluated in binary floating point (float64 or long double) for all scenarios in one pass.
+# Run the comparison with the Decimal path: python benchmark_batch.py
+
+# Long double has 64 bits of mantissa on x86 (float128 in NumPy), on other platforms it may be just float64
+EXTENDED_DTYPE = np.longdouble
+HAS_EXTENDED_PRECISION = np.finfo(np.longdouble).eps < np.finfo(np.float64).eps
+
+
+def as_float_array(values, dtype=np.float64) -> np.ndarray:
+    # Decimal values are converted through their decimal notation (no rounding to float64 before long double),
+    # other values (int, float, numpy arrays) directly
+    values = list(values) if not isinstance(values, np.ndarray) else values
+    if any(isinstance(value, Decimal) for value in values):
+        return np.array([str(value) for value in values]).astype(dtype)
+    return np.asarray(values).astype(dtype)
+
+
+def exact_decimal(value) -> Decimal:
+    # Exact value of a binary float (float64 or long double) - a ratio with a power of two in the denominator
+    numerator, denominator = value.as_integer_ratio()
+    with localcontext() as ctx:
+        ctx.prec = len(str(numerator)) + denominator.bit_length()
+        return Decimal(numerator) / Decimal(denominator)
+
+
+def as_decimal(value) -> Decimal:
+    # Inverse conversion for the Decimal path (floats are converted exactly, as Decimal(float) does)
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, np.floating):
+        return exact_decimal(value)
+    if isinstance(value, np.integer):
+        return Decimal(int(value))
+    return Decimal(value)
+
+
+def enum_mask(values, member) -> np.ndarray:
+    # Boolean column: True where the scenario has the given enum member (members and plain strings are accepted)
+    return np.array([value == member or value == member.value for value in values], dtype=bool)
+
+
+@dataclass
+class BatchProjection:
+    # Yearly projection of the whole batch, rows = scenarios, columns = years 1, ..., max_years
+    # (the same quantities as projections.YearlyProjection)
+    years: np.ndarray
+    total_deposited: np.ndarray
+    total_value_nominal: np.ndarray
+    total_value_real: np.ndarray
+
+
+@dataclass
+class BatchDeviation:
+    # Maximum deviation of the batch results from the Decimal path over all projected years (per scenario)
+    absolute: np.ndarray
+    relative: np.ndarray
+
+
+class ScenarioBatch:
+    def __init__(
+        self,
+        years: Sequence[int],
+        annual_interest_rate: Sequence,
+        compounding_per_year: Sequence[int],
+        ter_fee: Sequence,
+        tax_interest_rate: Sequence,
+        interest_type: Sequence,
+        deposit_type: Sequence,
+        amount: Sequence,
+        deposits_per_year: Sequence[int],
+        fee_amount: Sequence,
+        fee_type: Sequence,
+        annuity_type: Sequence,
+        dtype=np.float64,
+    ):
+        # Original inputs are kept for building the Decimal scenarios (see to_scenarios)
+        self._inputs = dict(
+            years=list(years), annual_interest_rate=list(annual_interest_rate), compounding_per_year=list(compounding_per_year),
+            ter_fee=list(ter_fee), tax_interest_rate=list(tax_interest_rate), interest_type=list(interest_type),
+            deposit_type=list(deposit_type), amount=list(amount), deposits_per_year=list(deposits_per_year),
+            fee_amount=list(fee_amount), fee_type=list(fee_type), annuity_type=list(annuity_type),
+        )
+        if len({len(column) for column in self._inputs.values()}) > 1:
+            raise ValueError("all scenario columns must have the same length")
+        self.dtype = np.dtype(dtype)
+
+        self.years = np.asarray(self._inputs["years"], dtype=np.int64)
+        self.annual_interest_rate = as_float_array(self._inputs["annual_interest_rate"], dtype)
+        self.compounding_per_year = np.asarray(self._inputs["compounding_per_year"], dtype=np.int64)
+        self.ter_fee = as_float_array(self._inputs["ter_fee"], dtype)
+        self.tax_interest_rate = as_float_array(self._inputs["tax_interest_rate"], dtype)
+        self.nominal = enum_mask(self._inputs["interest_type"], InterestType.NOMINAL)
+        effective = enum_mask(self._inputs["interest_type"], InterestType.EFFECTIVE)
+        self.entry = enum_mask(self._inputs["deposit_type"], DepositType.ENTRY)
+        periodic = enum_mask(self._inputs["deposit_type"], DepositType.PERIODIC)
+        self.amount = as_float_array(self._inputs["amount"], dtype)
+        self.deposits_per_year = np.asarray(self._inputs["deposits_per_year"], dtype=np.int64)
+        self.fee_amount = as_float_array(self._inputs["fee_amount"], dtype)
+        proportional = enum_mask(self._inputs["fee_type"], FeeType.PROPORTIONAL)
+        fixed = enum_mask(self._inputs["fee_type"], FeeType.FIXED)
+        self.due = enum_mask(self._inputs["annuity_type"], AnnuityType.DUE)
+
+        # Invalid input - the same checks as InvestmentContext and Deposit
+        if (self.annual_interest_rate <= 0).any():
+            raise ValueError("annual_interest_rate must be grater than 0")
+        if ((self.compounding_per_year <= 0) | (self.compounding_per_year >= 366)).any():
+            raise ValueError("compounding_per_year must be grater than 0 and lower than 366")
+        if not (self.nominal | effective).all():
+            raise ValueError("interest_type must be 'nominal' (APR) or 'effective' (EAR)")
+        if not (self.entry | periodic).all():
+            raise ValueError("deposit_type must be 'entry' or 'periodic'")
+        if not (proportional | fixed).all():
+            raise ValueError("fee_type must be 'proportional' or 'exact'")
+        if (periodic & (self.deposits_per_year <= 0)).any():
+            raise ValueError("for deposit_type == 'periodic' value of deposits_per_year must be greater than 0")
+
+        self.fee = np.where(proportional, self.amount * self.fee_amount, self.fee_amount)
+
+        # Annual net rate - apply TER and tax only where they are set (as InvestmentContext does)
+        annual_rate = self.annual_interest_rate
+        annual_rate = np.where(self.ter_fee > 0, (1 + annual_rate) * (1 - self.ter_fee) - 1, annual_rate)
+        annual_rate = np.where(self.tax_interest_rate > 0, annual_rate * (1 - self.tax_interest_rate), annual_rate)
+        self.annual_net_rate = annual_rate
+        # Periodic rate [i] and daily rate [d] of the time simulation;
+        # log1p / expm1 keep the full relative precision of small rates
+        compounding = self.compounding_per_year.astype(self.dtype)
+        self.periodic_interest_rate = np.where(self.nominal, annual_rate / compounding, np.expm1(np.log1p(annual_rate) / compounding))
+        self.daily_interest_rate = np.where(self.nominal, annual_rate / 365, np.expm1(np.log1p(annual_rate) / 365))
+
+    @classmethod
+    def from_scenarios(cls, scenarios: Sequence[Tuple[InvestmentContext, Deposit]], dtype=np.float64):
+        # Batch from existing (context, deposit) pairs
+        contexts = [context for context, _ in scenarios]
+        deposits = [deposit for _, deposit in scenarios]
+        return cls(
+            years=[context.years for context in contexts],
+            annual_interest_rate=[context.annual_interest_rate for context in contexts],
+            compounding_per_year=[int(context.compounding_per_year) for context in contexts],
+            ter_fee=[context.ter_fee for context in contexts],
+            tax_interest_rate=[context.tax_interest_rate for context in contexts],
+            interest_type=[context.interest_type for context in contexts],
+            deposit_type=[deposit.deposit_type for deposit in deposits],
+            amount=[deposit.amount for deposit in deposits],
+            deposits_per_year=[deposit.deposits_per_year for deposit in deposits],
+            fee_amount=[deposit.fee_amount for deposit in deposits],
+            fee_type=[deposit.fee_type for deposit in deposits],
+            annuity_type=[deposit.annuity_type for deposit in deposits],
+            dtype=dtype,
+        )
+
+    def __len__(self):
+        return len(self.years)
+
+    def to_scenarios(self) -> List[Tuple[InvestmentContext, Deposit]]:
+        # The same scenarios as Decimal objects (for the reference calculation)
+        inputs = self._inputs
+        return [
+            (
+                InvestmentContext(int(inputs["years"][index]), as_decimal(inputs["annual_interest_rate"][index]),
+                                  int(inputs["compounding_per_year"][index]), as_decimal(inputs["ter_fee"][index]),
+                                  InterestType(inputs["interest_type"][index]), as_decimal(inputs["tax_interest_rate"][index])),
+                Deposit(DepositType(inputs["deposit_type"][index]), as_decimal(inputs["amount"][index]),
+                        int(inputs["deposits_per_year"][index]), as_decimal(inputs["fee_amount"][index]),
+                        FeeType(inputs["fee_type"][index]), AnnuityType(inputs["annuity_type"][index])),
+            )
+            for index in range(len(self))
+        ]
+
+    def calculate_yearly_future_values(self, max_years: int = None) -> np.ndarray:
+        # Future values after 1, 2, ..., max_years years for every scenario (rows = scenarios)
+        if max_years is None:
+            max_years = int(self.years.max()) if len(self) else 0
+        year = np.arange(1, max_years + 1, dtype=self.dtype)
+        future_values = np.zeros((len(self), max_years), dtype=self.dtype)
+
+        # Entry deposit and periodic deposits with deposits_per_year == compounding_per_year:
+        # (1 + i) ** (compounding_per_year * year) = exp(compounding_per_year * year * log(1 + i))
+        exponent = self.compounding_per_year.astype(self.dtype)[:, None] * year * np.log1p(self.periodic_interest_rate)[:, None]
+        principal = (self.amount - self.fee)[:, None]
+        entry_values = principal * np.exp(exponent)
+        annuity_values = principal * (np.expm1(exponent) / self.periodic_interest_rate[:, None])
+        annuity_values = np.where(self.due[:, None], annuity_values * (1 + self.periodic_interest_rate)[:, None], annuity_values)
+        classic = ~self.entry & (self.deposits_per_year == self.compounding_per_year)
+        future_values[self.entry] = entry_values[self.entry]
+        future_values[classic] = annuity_values[classic]
+
+        # Time simulation - scenarios are grouped by deposits_per_year, every group shares the deposit days
+        simulated = ~self.entry & ~classic
+        for deposits_per_year in np.unique(self.deposits_per_year[simulated]):
+            group = simulated & (self.deposits_per_year == deposits_per_year)
+            future_values[group] = self._calculate_yearly_simulated_values(group, int(deposits_per_year), year)
+        return future_values
+
+    def _calculate_yearly_simulated_values(self, group: np.ndarray, deposits_per_year: int, year: np.ndarray) -> np.ndarray:
+        # calculate_yearly_mismatched_future_values for a group of scenarios with the same deposits_per_year:
+        # (sum over the first year) * (1 + G + ... + G ** (year - 1)) with G = (1 + d) ** 365
+        # plus the deposits which the rounded deposit interval places one day earlier
+        daily_rate = self.daily_interest_rate[group][:, None]
+        log_growth = np.log1p(daily_rate)
+        first_year_days = np.array([365 - k * 365 // deposits_per_year for k in range(deposits_per_year)], dtype=self.dtype)
+        first_year_sum = np.exp(first_year_days * log_growth).sum(axis=1, keepdims=True)
+        year_growth = np.expm1(365 * log_growth)
+        geometric_sum = np.divide(np.expm1(365 * year * log_growth), year_growth,
+                                  out=np.broadcast_to(year, (len(daily_rate), len(year))).copy(), where=year_growth != 0)
+        total = first_year_sum * geometric_sum
+        for k in find_shifted_deposits(len(year) * deposits_per_year, deposits_per_year):
+            # one more day of interest from the year of the deposit on
+            deposit_year = k // deposits_per_year + 1
+            remaining_days = year[deposit_year - 1:] * 365 - k * 365 // deposits_per_year
+            total[:, deposit_year - 1:] += np.exp(remaining_days * log_growth) * daily_rate
+        return self.amount[group][:, None] * total
+
+    def calculate_future_values(self) -> np.ndarray:
+        # Future value of every scenario after its own number of years
+        future_values = self.calculate_yearly_future_values()
+        return future_values[np.arange(len(self)), self.years - 1]
+
+    def calculate_total_deposit_amounts(self, max_years: int = None) -> np.ndarray:
+        # Deposited amount after 1, 2, ..., max_years years (rows = scenarios)
+        if max_years is None:
+            max_years = int(self.years.max()) if len(self) else 0
+        year = np.arange(1, max_years + 1, dtype=self.dtype)
+        periodic_amounts = (self.amount * self.deposits_per_year.astype(self.dtype))[:, None] * year
+        return np.where(self.entry[:, None], self.amount[:, None], periodic_amounts)
+
+    def generate_yearly_projection(self, max_years: int = None, inflation_rate=0) -> BatchProjection:
+        # Vectorized generate_yearly_projection for a single deposit per scenario (generate_yearly_projection(max_years,
+        # context, [deposit], inflation_rate) of every row), inflation_rate is a scalar or one rate per scenario
+        if max_years is None:
+            max_years = int(self.years.max()) if len(self) else 0
+        year = np.arange(1, max_years + 1, dtype=self.dtype)
+        nominal = self.calculate_yearly_future_values(max_years)
+        inflation_rate = np.broadcast_to(as_float_array(np.atleast_1d(inflation_rate), self.dtype), (len(self),))[:, None]
+        inflation_factor = np.where(inflation_rate > 0, np.exp(year * np.log1p(np.maximum(inflation_rate, 0))), 1)
+        return BatchProjection(
+            years=np.arange(1, max_years + 1),
+            total_deposited=self.calculate_total_deposit_amounts(max_years),
+            total_value_nominal=nominal,
+            total_value_real=nominal / inflation_factor,
+        )
+
+    def compare_with_decimal(self, max_years: int = None) -> BatchDeviation:
+        # Maximum deviation of the yearly future values from Deposit.calculate_yearly_future_values (Decimal path)
+        # per scenario; the batch values are converted to Decimal exactly, so the deviation is the true error
+        if max_years is None:
+            max_years = int(self.years.max()) if len(self) else 0
+        future_values = self.calculate_yearly_future_values(max_years)
+        absolute = np.zeros(len(self))
+        relative = np.zeros(len(self))
+        for index, (context, deposit) in enumerate(self.to_scenarios()):
+            expected = deposit.calculate_yearly_future_values(context, max_years)
+            errors = [(abs(exact_decimal(value) - reference), abs(reference))
+                      for value, reference in zip(future_values[index], expected)]
+            absolute[index] = max((float(error) for error, _ in errors), default=0)
+            relative[index] = max((float(error / reference) for error, reference in errors if reference), default=0)
+        return BatchDeviation(absolute=absolute, relative=relative)
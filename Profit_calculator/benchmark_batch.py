@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+
+from batch import *
+
+# Benchmark of the vectorized ScenarioBatch against Deposit.calculate_future_value / calculate_yearly_future_values
+# (Decimal path, one scenario at a time) for randomly generated client plans, and the maximum deviation
+# of the float64 and long double results from the Decimal path.
+# Run: python benchmark_batch.py
+
+SCENARIOS = 5000
+SEED = 0
+REPEAT = 3
+
+rng = np.random.default_rng(SEED)
+columns = dict(
+    years=rng.integers(1, 41, SCENARIOS),
+    annual_interest_rate=rng.uniform(0.01, 0.12, SCENARIOS),
+    compounding_per_year=rng.choice([1, 2, 4, 12, 365], SCENARIOS),
+    ter_fee=rng.choice([0, 0.0003, 0.002], SCENARIOS),
+    tax_interest_rate=rng.choice([0, 0.15], SCENARIOS),
+    interest_type=rng.choice([InterestType.NOMINAL.value, InterestType.EFFECTIVE.value], SCENARIOS),
+    deposit_type=rng.choice([DepositType.ENTRY.value, DepositType.PERIODIC.value], SCENARIOS),
+    amount=rng.integers(100, 20000, SCENARIOS),
+    deposits_per_year=rng.choice([1, 4, 12, 24, 52, 365], SCENARIOS),
+    fee_amount=rng.choice([0, 0.0015], SCENARIOS),
+    fee_type=rng.choice([FeeType.PROPORTIONAL.value, FeeType.FIXED.value], SCENARIOS),
+    annuity_type=rng.choice([AnnuityType.DUE.value, AnnuityType.ORDINARY.value], SCENARIOS),
+)
+
+
+def best_time(function):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def decimal_future_values(scenarios):
+    return [deposit.calculate_future_value(context) for context, deposit in scenarios]
+
+
+def decimal_yearly_future_values(scenarios, max_years):
+    return [deposit.calculate_yearly_future_values(context, max_years) for context, deposit in scenarios]
+
+
+batch = ScenarioBatch(**columns)
+scenarios = batch.to_scenarios()
+max_years = int(batch.years.max())
+print(f'{SCENARIOS} scénářů, projekce na {max_years} let:')
+
+decimal_seconds, _ = best_time(lambda: decimal_future_values(scenarios))
+decimal_yearly_seconds, _ = best_time(lambda: decimal_yearly_future_values(scenarios, max_years))
+print(f'  Decimal (po scénářích)   FV {decimal_seconds * 1000:9.2f} ms  projekce {decimal_yearly_seconds * 1000:9.2f} ms')
+
+dtypes = [np.float64] + ([EXTENDED_DTYPE] if HAS_EXTENDED_PRECISION else [])
+for dtype in dtypes:
+    dtype_batch = ScenarioBatch(**columns, dtype=dtype)
+    batch_seconds, _ = best_time(dtype_batch.calculate_future_values)
+    batch_yearly_seconds, _ = best_time(lambda: dtype_batch.calculate_yearly_future_values(max_years))
+    deviation = dtype_batch.compare_with_decimal(max_years)
+    print(f'  {np.dtype(dtype).name:<23}  FV {batch_seconds * 1000:9.2f} ms  projekce {batch_yearly_seconds * 1000:9.2f} ms'
+          f'  ({decimal_yearly_seconds / batch_yearly_seconds:.0f}x)')
+    print(f'    max. odchylka od Decimal: {deviation.absolute.max():.3e} CZK, relativní {deviation.relative.max():.3e}'
+          f' (scénář {int(deviation.relative.argmax())})')
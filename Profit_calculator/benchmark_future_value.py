@@ -0,0 +1,79 @@
+import time
+from decimal import Decimal, localcontext
+
+from compounding import DEPOSIT_DAY_PRECISION, GUARD_DIGITS
+from models import *
+
+# Benchmark of Deposit.calculate_future_value for deposits_per_year != compounding_per_year:
+# the original day-by-day loop (one Decimal exponentiation per deposit) against the compounding engine.
+# Run: python benchmark_future_value.py
+
+PRECISIONS = (20, 28, 50)
+REPEAT = 3
+
+
+def calculate_future_value_by_days(deposit: Deposit, context: InvestmentContext, daily_rate: Decimal):
+    # Original time simulation - (1 + daily_rate) ** remaining_days computed from scratch for every deposit
+    total_days = context.years * 365
+
+    with localcontext() as ctx:
+        # deposit days as with the default Decimal context, independent of the evaluated precision
+        ctx.prec = DEPOSIT_DAY_PRECISION
+        deposit_interval = Decimal(365) / Decimal(deposit.deposits_per_year)
+        deposit_days = [int(k * deposit_interval) for k in range(context.years * deposit.deposits_per_year)]
+    future_value_annuity = Decimal("0")
+
+    for deposit_day in deposit_days:
+        remaining_days = total_days - deposit_day
+        future_value_annuity += deposit.amount * ((Decimal(1) + daily_rate) ** remaining_days)
+
+    return future_value_annuity
+
+
+def reference_future_value(deposit: Deposit, context: InvestmentContext, precision: int):
+    # Original loop evaluated with guard digits and rounded to the requested precision
+    with localcontext() as ctx:
+        ctx.prec = precision + GUARD_DIGITS
+        future_value = calculate_future_value_by_days(deposit, context, context.calculate_daily_interest_rate(precision))
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return +future_value
+
+
+def best_time(function):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+scenarios = [
+    # (description, context, deposit)
+    ("40 let, týdenní vklad, denní úročení (EAR)",
+     InvestmentContext(40, 0.07, CompoundingFrequency.PER_DIEM, 0.0003, InterestType.EFFECTIVE, 0.15),
+     Deposit(DepositType.PERIODIC, 1000, 52, 0.0015, FeeType.PROPORTIONAL, AnnuityType.DUE)),
+    ("40 let, měsíční vklad, roční úročení (APR)",
+     InvestmentContext(40, 0.05, CompoundingFrequency.PER_ANNUM, 0.0003, InterestType.NOMINAL, 0.15),
+     Deposit(DepositType.PERIODIC, 2000, 12, 0, FeeType.FIXED, AnnuityType.DUE)),
+    ("30 let, vklad 24x ročně, čtvrtletní úročení (APR)",
+     InvestmentContext(30, 0.04, CompoundingFrequency.PER_QUARTALE, 0, InterestType.NOMINAL, 0),
+     Deposit(DepositType.PERIODIC, 500, 24, 0, FeeType.FIXED, AnnuityType.ORDINARY)),
+    ("18 let, denní vklad, měsíční úročení (EAR)",
+     InvestmentContext(18, 0.10, CompoundingFrequency.PER_MENSEM, 0.0003, InterestType.EFFECTIVE, 0),
+     Deposit(DepositType.PERIODIC, 100, 365, 0, FeeType.FIXED, AnnuityType.DUE)),
+]
+
+for description, context, deposit in scenarios:
+    print(f'{description} ({context.years * deposit.deposits_per_year} vkladů):')
+    loop_seconds, loop_value = best_time(lambda: calculate_future_value_by_days(deposit, context, context.calculate_daily_interest_rate()))
+    engine_seconds, engine_value = best_time(lambda: deposit.calculate_future_value(context))
+    print(f'  původní smyčka {loop_seconds * 1000:8.2f} ms  {loop_value}')
+    print(f'  power tables   {engine_seconds * 1000:8.2f} ms  {engine_value}  ({loop_seconds / engine_seconds:.1f}x)')
+    for precision in PRECISIONS:
+        expected = reference_future_value(deposit, context, precision)
+        value = deposit.calculate_future_value(context, precision)
+        if value != expected:
+            raise AssertionError(f'Výsledek na {precision} platných číslic se liší: {value} != {expected}')
+    print(f'  shoda s původní smyčkou na {", ".join(map(str, PRECISIONS))} platných číslic')
@@ -0,0 +1,45 @@
+import os
+import time
+
+from monte_carlo import *
+
+# Benchmark of the Monte Carlo simulation: percentile bands of the projection and probability of depletion
+# for 100 000 paths in this process and in the process pool. Determinism, pool == one process and the zero-volatility
+# match with the deterministic calculation are checked by the unit tests (test_monte_carlo.py).
+# Run: python benchmark_monte_carlo.py
+
+PATHS = 100_000
+SEED = 0
+WITHDRAWAL_YEARS = 40
+
+annual_inflation_rate = Decimal("0.02")
+withdrawal_amount = Decimal("20000")
+context = InvestmentContext(25, 0.07, CompoundingFrequency.PER_DIEM, 0.0003, InterestType.EFFECTIVE, 0)
+deposits = [
+    Deposit(DepositType.ENTRY, 50000, 0, 0.0015, FeeType.PROPORTIONAL, AnnuityType.DUE),
+    Deposit(DepositType.PERIODIC, 5000, 12, 0.0015, FeeType.PROPORTIONAL, AnnuityType.DUE),
+]
+return_models = [
+    ("normální", ReturnModel(ReturnDistribution.NORMAL, 0.07, 0.15)),
+    ("lognormální", ReturnModel(ReturnDistribution.LOGNORMAL, 0.07, 0.15)),
+    ("bootstrap", ReturnModel(ReturnDistribution.BOOTSTRAP, history=(0.26, 0.15, -0.37, 0.26, 0.15, 0.02, 0.16, 0.32, 0.14, 0.01,
+                                                                       0.12, 0.22, -0.04, 0.31, 0.18, 0.29, -0.18, 0.26, 0.25, 0.23))),
+]
+
+print(f'{PATHS} cest, {context.years} let spoření, {WITHDRAWAL_YEARS} let výběru {withdrawal_amount} CZK měsíčně, {os.cpu_count()} CPU:')
+for description, return_model in return_models:
+    start = time.perf_counter()
+    projection = simulate_yearly_projection(context.years, context, deposits, return_model, annual_inflation_rate, PATHS, SEED, workers=1)
+    risk = simulate_depletion_probability(projection.final_values_real, withdrawal_amount, 12, annual_inflation_rate, context,
+                                          return_model, WITHDRAWAL_YEARS, paths=PATHS, seed=SEED + 1, workers=1)
+    serial_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    pool_projection = simulate_yearly_projection(context.years, context, deposits, return_model, annual_inflation_rate, PATHS, SEED)
+    pool_risk = simulate_depletion_probability(pool_projection.final_values_real, withdrawal_amount, 12, annual_inflation_rate, context,
+                                               return_model, WITHDRAWAL_YEARS, paths=PATHS, seed=SEED + 1)
+    pool_seconds = time.perf_counter() - start
+
+    print(f'  {description:<12} 1 proces {serial_seconds:6.2f} s, pool {pool_seconds:6.2f} s, pravděpodobnost vyčerpání {risk.probability:.1%}')
+    for percentile in projection.percentiles:
+        band = projection.bands[percentile][-1]
+        print(f'    {percentile:>3}. percentil: naspořeno {int(band.total_value_nominal):>12} CZK, reálně {int(band.total_value_real):>12} CZK')
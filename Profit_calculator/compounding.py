@@ -0,0 +1,136 @@
+from decimal import Decimal, localcontext
+from math import gcd
+from typing import Dict, List
+
+# Significant digits of results computed by the compounding engine (default precision of Decimal)
+DEFAULT_PRECISION = 28
+# Extra digits carried during the calculation, so that rounding errors of the intermediate products
+# never reach the requested precision of the result
+GUARD_DIGITS = 12
+# Relative drift of the original day-by-day loop evaluated at DEFAULT_PRECISION (without guard digits) from
+# the results of this engine - the loop loses its last ~5 digits to rounding of the accumulated terms
+ORIGINAL_LOOP_DRIFT = Decimal("1e-23")
+# Precision of the deposit interval 365 / deposits_per_year - the day-by-day simulation always placed
+# the deposits with the default Decimal precision, so the deposit days do not depend on the result precision
+DEPOSIT_DAY_PRECISION = 28
+
+
+def calculate_deposit_day(k: int, deposits_per_year: int) -> int:
+    # Day of the k-th deposit counted from the start of the investment (years of 365 days),
+    # exactly as in the day-by-day simulation: int(k * Decimal(365) / deposits_per_year)
+    with localcontext() as ctx:
+        ctx.prec = DEPOSIT_DAY_PRECISION
+        return int(k * (Decimal(365) / Decimal(deposits_per_year)))
+
+
+def find_shifted_deposits(deposits: int, deposits_per_year: int) -> List[int]:
+    # Deposits placed one day earlier than the exact day k * 365 // deposits_per_year.
+    # The rounded Decimal interval can only move a deposit whose exact day is a whole number
+    # (k * 365 divisible by deposits_per_year) - any other exact day is at least 1/365 away from an integer.
+    if 365 % deposits_per_year == 0:
+        # the interval is a whole number of days, no rounding
+        return []
+    step = deposits_per_year // gcd(365, deposits_per_year)
+    return [k for k in range(step, deposits, step) if calculate_deposit_day(k, deposits_per_year) != k * 365 // deposits_per_year]
+
+
+def calculate_power_table(base: Decimal, exponents) -> Dict[int, Decimal]:
+    # Powers base ** exponent for every distinct exponent (each power is computed only once)
+    return {exponent: base ** exponent for exponent in set(exponents)}
+
+
+def calculate_sum_of_powers(base: Decimal, exponents: List[int], precision: int = DEFAULT_PRECISION) -> Decimal:
+    # Sum of base ** exponent over non-increasing exponents (e.g. remaining days of the deposits).
+    # Horner scheme: sum = base ** e_last * (... (1 * base ** (e_0 - e_1) + 1) * base ** (e_1 - e_2) + ... + 1),
+    # the gaps between consecutive deposits take only a few distinct values, so their powers come
+    # from a small table and every deposit costs one multiplication instead of a full exponentiation.
+    if not exponents:
+        return Decimal(0)
+    with localcontext() as ctx:
+        ctx.prec = precision + GUARD_DIGITS
+        gaps = [previous - current for previous, current in zip(exponents, exponents[1:])]
+        if any(gap < 0 for gap in gaps):
+            raise ValueError("exponents must be in non-increasing order")
+        gap_powers = calculate_power_table(base, gaps)
+        total = Decimal(1)
+        for gap in gaps:
+            total = total * gap_powers[gap] + 1
+        total *= base ** exponents[-1]
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return +total
+
+
+def calculate_geometric_sum(ratio: Decimal, terms: int) -> Decimal:
+    # 1 + ratio + ratio ** 2 + ... + ratio ** (terms - 1) in closed form
+    if ratio == 1:
+        return Decimal(terms)
+    return (Decimal(1) - ratio ** terms) / (Decimal(1) - ratio)
+
+
+def calculate_yearly_power_factors(base: Decimal, periods_per_year: int, years: int) -> List[Decimal]:
+    # base ** (periods_per_year * year) for year = 1, ..., years.
+    # Every factor is a direct exponentiation at the current precision, not the previous factor multiplied
+    # by base ** periods_per_year - Decimal integer powers are not always correctly rounded in the last digit
+    # and the closed formulas must give exactly the same values as calculate_future_value.
+    return [base ** (periods_per_year * year) for year in range(1, years + 1)]
+
+
+def calculate_mismatched_future_value(
+    amount: Decimal,
+    years: int,
+    deposits_per_year: int,
+    daily_rate: Decimal,
+    precision: int = DEFAULT_PRECISION,
+) -> Decimal:
+    # Future value of periodic deposits whose frequency differs from the compounding frequency:
+    # every deposit earns daily interest for its remaining days of the investment, i.e. the sum of
+    # amount * (1 + daily_rate) ** remaining_days over all deposits, rounded to `precision` significant digits.
+    #
+    # Deposits of every year are the deposits of the first year moved by 365 days, so the sum is
+    # (sum over the first year) * (1 + q + ... + q ** (years - 1)) with q = (1 + daily_rate) ** -365
+    # plus a correction for the few deposits which the rounded interval places one day earlier.
+    # The cost depends on deposits_per_year, not on the number of deposits over the whole investment.
+    total_days = years * 365
+    with localcontext() as ctx:
+        ctx.prec = precision + GUARD_DIGITS
+        growth = Decimal(1) + daily_rate
+        first_year = [total_days - k * 365 // deposits_per_year for k in range(deposits_per_year)]
+        total = calculate_sum_of_powers(growth, first_year, ctx.prec) * calculate_geometric_sum(growth ** -365, years)
+        for k in find_shifted_deposits(years * deposits_per_year, deposits_per_year):
+            # one more day of interest: growth ** (e + 1) - growth ** e
+            total += growth ** (total_days - k * 365 // deposits_per_year) * (growth - 1)
+        future_value = amount * total
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return +future_value
+
+
+def calculate_yearly_mismatched_future_values(
+    amount: Decimal,
+    years: int,
+    deposits_per_year: int,
+    daily_rate: Decimal,
+    precision: int = DEFAULT_PRECISION,
+) -> List[Decimal]:
+    # calculate_mismatched_future_value after 1, 2, ..., years years in one pass:
+    # the sum of the previous year earns 365 more days of interest and the deposits of the new year
+    # (the first-year sum plus corrections of shifted deposits) are added
+    with localcontext() as ctx:
+        ctx.prec = precision + GUARD_DIGITS
+        growth = Decimal(1) + daily_rate
+        first_year_sum = calculate_sum_of_powers(growth, [365 - k * 365 // deposits_per_year for k in range(deposits_per_year)], ctx.prec)
+        year_growth = growth ** 365
+        shifted = {}
+        for k in find_shifted_deposits(years * deposits_per_year, deposits_per_year):
+            shifted.setdefault(k // deposits_per_year + 1, []).append(k)
+        total = Decimal(0)
+        future_values = []
+        for year in range(1, years + 1):
+            total = total * year_growth + first_year_sum
+            for k in shifted.get(year, ()):
+                total += growth ** (year * 365 - k * 365 // deposits_per_year) * (growth - 1)
+            future_values.append(amount * total)
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return [+future_value for future_value in future_values]
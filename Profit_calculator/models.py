@@ -1,5 +1,15 @@
+from dataclasses import dataclass, field, replace
 from enum import Enum
-from decimal import Decimal
+from decimal import Decimal, localcontext
+from functools import cached_property
+
+from compounding import (
+    DEFAULT_PRECISION,
+    GUARD_DIGITS,
+    calculate_mismatched_future_value,
+    calculate_yearly_mismatched_future_values,
+    calculate_yearly_power_factors,
+)
 
 
 class InterestType(str, Enum):
@@ -36,33 +46,44 @@ class FeeType(str, Enum):
     FIXED = "fixed"
 
 
+@dataclass(frozen=True)
 class InvestmentContext:
-    def __init__(
-        self,
-        years: int,
-        annual_interest_rate: int,
-        compounding_per_year: CompoundingFrequency,
-        ter_fee: int,
-        interest_type: InterestType = InterestType.NOMINAL,
-        tax_interest_rate: Decimal = Decimal(0.15),
-    ):
-        self.years = years
-        self.annual_interest_rate = Decimal(annual_interest_rate)
-        self.compounding_per_year = compounding_per_year
-        self.ter_fee = Decimal(ter_fee)
-        self.interest_type = interest_type
-        self.tax_interest_rate = Decimal(tax_interest_rate)
-        # Annual tax rate of interests (in CZE it is 0,15), for ETFs after time-test it is 0.
+    # Immutable value object - contexts with the same parameters are equal and hashable (usable as cache keys).
+    # Inputs are validated once at construction; derived quantities (net annual rate, periodic rate, period count,
+    # growth factor per period, ...) are computed lazily on first use and cached for the lifetime of the context.
+    years: int
+    annual_interest_rate: Decimal
+    compounding_per_year: CompoundingFrequency
+    ter_fee: Decimal
+    interest_type: InterestType = InterestType.NOMINAL
+    tax_interest_rate: Decimal = Decimal(0.15)
+    # Annual tax rate of interests (in CZE it is 0,15), for ETFs after time-test it is 0.
+
+    # Caches of derived quantities depending on an argument (not part of equality and hash)
+    _daily_interest_rates: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _yearly_power_factors: list = field(default_factory=list, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # frozen dataclass - normalized values are set through object.__setattr__
+        object.__setattr__(self, "annual_interest_rate", Decimal(self.annual_interest_rate))
+        object.__setattr__(self, "ter_fee", Decimal(self.ter_fee))
+        object.__setattr__(self, "tax_interest_rate", Decimal(self.tax_interest_rate))
+        # Invalid input
+        if self.annual_interest_rate <= 0:
+            raise ValueError("annual_interest_rate must be grater than 0")
+        if not 0 < self.compounding_per_year < 366:
+            raise ValueError("compounding_per_year must be grater than 0 and lower than 366")
+        if self.interest_type not in (InterestType.NOMINAL, InterestType.EFFECTIVE):
+            raise ValueError("interest_type must be 'nominal' (APR) or 'effective' (EAR)")
+        object.__setattr__(self, "interest_type", InterestType(self.interest_type))
 
     def __str__(self):
         # Annotation of investment in CZE
         return print(f'Investice na {self.years} let s úrokem {self.annual_interest_rate} kapitalizovaným {self.compounding_per_year}-krát ročně a ročním poplatkem {self.ter_fee}.')
 
     # Zamyšlení k výpočtu "apply_ter" a "apply_tax": zvážit oddělení těchto dvou výpočtů a zahrnout možnost vypnutí daně po časovém testu
-    def calculate_annual_interest_rate(self):
-        # Invalid input
-        if self.annual_interest_rate <= 0:
-            raise ValueError("annual_interest_rate must be grater than 0")
+    def _calculate_net_annual_rate(self):
+        # Net annual rate in the current Decimal context
         annual_rate = self.annual_interest_rate
         # Apply TER on annual level (reduces gross return)
         if self.ter_fee > 0:
@@ -72,36 +93,71 @@ class InvestmentContext:
             annual_rate = annual_rate * (Decimal(1) - self.tax_interest_rate)
         return annual_rate
 
-    def calculate_periods_per_investment(self):
-        # Calculate the total number of periods between interests [n]
-        if 0 >= self.compounding_per_year >= 366:
-            raise ValueError("compounding_per_year must be grater than 0 and lower than 366")
-        periods_per_investment = self.years * self.compounding_per_year
-        return periods_per_investment
+    # Cached quantities are always computed with DEFAULT_PRECISION, so that their values
+    # do not depend on the Decimal context of the first caller
 
-    def calculate_periodic_interest_rate(self):
+    @cached_property
+    def annual_net_rate(self):
+        # Annual interest rate after TER and tax
+        with localcontext() as ctx:
+            ctx.prec = DEFAULT_PRECISION
+            return self._calculate_net_annual_rate()
+
+    @cached_property
+    def periodic_interest_rate(self):
         # Convert to the periodic_interest_rate [i]
-        if self.interest_type == InterestType.NOMINAL:
-            # nominal annual rate (APR)
-            periodic_interest_rate = self.calculate_annual_interest_rate() / Decimal(self.compounding_per_year)
-            return periodic_interest_rate
-        elif self.interest_type == InterestType.EFFECTIVE:
+        with localcontext() as ctx:
+            ctx.prec = DEFAULT_PRECISION
+            if self.interest_type == InterestType.NOMINAL:
+                # nominal annual rate (APR)
+                return self.annual_net_rate / Decimal(self.compounding_per_year)
             # effective annual rate (EAR)
-            periodic_interest_rate = ((Decimal(1) + self.calculate_annual_interest_rate()) ** (Decimal(1) / Decimal(self.compounding_per_year))) - Decimal(1)
-            return periodic_interest_rate
-        else:
-            # invalid input
-            raise ValueError("interest_type must be 'nominal' (APR) or 'effective' (EAR)")
+            return ((Decimal(1) + self.annual_net_rate) ** (Decimal(1) / Decimal(self.compounding_per_year))) - Decimal(1)
+
+    @cached_property
+    def periods_per_investment(self):
+        # Calculate the total number of periods between interests [n]
+        return self.years * self.compounding_per_year
+
+    @cached_property
+    def periodic_growth_factor(self):
+        # Growth factor per compounding period [1 + i]
+        with localcontext() as ctx:
+            ctx.prec = DEFAULT_PRECISION
+            return Decimal(1) + self.periodic_interest_rate
+
+    def calculate_annual_interest_rate(self):
+        return self.annual_net_rate
+
+    def calculate_periods_per_investment(self):
+        return self.periods_per_investment
+
+    def calculate_periodic_interest_rate(self):
+        return self.periodic_interest_rate
+
+    def calculate_daily_interest_rate(self, precision: int = DEFAULT_PRECISION):
+        # Daily rate [d] of the time simulation (years of 365 days), computed with guard digits (cached per precision)
+        if precision not in self._daily_interest_rates:
+            with localcontext() as ctx:
+                ctx.prec = precision + GUARD_DIGITS
+                if self.interest_type == InterestType.NOMINAL:
+                    daily_rate = self._calculate_net_annual_rate() / Decimal(365)
+                else:
+                    daily_rate = (Decimal(1) + self._calculate_net_annual_rate()) ** (Decimal(1) / Decimal(365)) - Decimal(1)
+            self._daily_interest_rates[precision] = daily_rate
+        return self._daily_interest_rates[precision]
+
+    def calculate_yearly_power_factors(self, years: int):
+        # (1 + i) ** (compounding_per_year * year) for year = 1, ..., years (cached and extended on demand,
+        # shared by all deposits of a projection - the factors do not depend on the number of years of the context)
+        if len(self._yearly_power_factors) < years:
+            with localcontext() as ctx:
+                ctx.prec = DEFAULT_PRECISION
+                self._yearly_power_factors[:] = calculate_yearly_power_factors(self.periodic_growth_factor, self.compounding_per_year, years)
+        return self._yearly_power_factors[:years]
 
     def with_years(self, years: int):
-        return InvestmentContext(
-            years=years,
-            annual_interest_rate=self.annual_interest_rate,
-            compounding_per_year=self.compounding_per_year,
-            interest_type=self.interest_type,
-            ter_fee=self.ter_fee,
-            tax_interest_rate=self.tax_interest_rate,
-        )
+        return replace(self, years=years)
 
 
 class Deposit:
@@ -141,9 +197,10 @@ class Deposit:
         else:
             raise ValueError("fee_type must be 'proportional' or 'exact'")
 
-    def calculate_future_value(self, context: InvestmentContext):
+    def calculate_future_value(self, context: InvestmentContext, precision: int = DEFAULT_PRECISION):
+        # precision = significant digits of the time simulation result (deposits_per_year != compounding_per_year)
         if self.deposit_type == DepositType.ENTRY:
-            future_value = (self.amount - self.fee) * ((Decimal(1) + context.calculate_periodic_interest_rate()) ** context.calculate_periods_per_investment())
+            future_value = (self.amount - self.fee) * (context.periodic_growth_factor ** context.periods_per_investment)
             return future_value
 
         elif self.deposit_type == DepositType.PERIODIC:
@@ -151,28 +208,41 @@ class Deposit:
                 raise ValueError("for deposit_type == 'periodic' value of deposits_per_year must be greater than 0")
             elif self.deposits_per_year == context.compounding_per_year:
                 # classic formula for future value - faster calculation than time simulation
-                future_value_annuity = (self.amount - self.fee) * ((((Decimal(1) + context.calculate_periodic_interest_rate()) ** (Decimal(self.deposits_per_year) * Decimal(context.years))) - 1) / context.calculate_periodic_interest_rate())
+                future_value_annuity = (self.amount - self.fee) * (((context.periodic_growth_factor ** (Decimal(self.deposits_per_year) * Decimal(context.years))) - 1) / context.periodic_interest_rate)
                 if self.annuity_type == AnnuityType.DUE:
-                    future_value_annuity *= (Decimal(1) + context.calculate_periodic_interest_rate())
+                    future_value_annuity *= context.periodic_growth_factor
                 return future_value_annuity
             else:
-                # time simulation
-                total_days = context.years * 365
-
-                if context.interest_type == InterestType.NOMINAL:
-                    daily_rate = context.calculate_annual_interest_rate() / Decimal(365)
-                else:
-                    daily_rate = (Decimal(1) + context.calculate_annual_interest_rate()) ** (Decimal(1) / Decimal(365)) - Decimal(1)
+                # time simulation - every deposit earns daily interest for its remaining days,
+                # summed by the compounding engine (power table + Horner scheme) instead of one exponentiation per deposit
+                daily_rate = context.calculate_daily_interest_rate(precision)
+                return calculate_mismatched_future_value(self.amount, context.years, self.deposits_per_year, daily_rate, precision)
 
-                deposit_interval = Decimal(365) / Decimal(self.deposits_per_year)
-                future_value_annuity = Decimal("0")
+        else:
+            # invalid input
+            raise ValueError("deposit_type must be 'entry' or 'periodic'")
 
-                for k in range(context.years * self.deposits_per_year):
-                    deposit_day = int(k * deposit_interval)
-                    remaining_days = total_days - deposit_day
-                    future_value_annuity += self.amount * ((Decimal(1) + daily_rate) ** remaining_days)
+    def calculate_yearly_future_values(self, context: InvestmentContext, max_years: int, precision: int = DEFAULT_PRECISION):
+        # Future values after 1, 2, ..., max_years years - the same values as calculate_future_value(context.with_years(year))
+        # for every year, but each year carries the previous balance forward instead of compounding again from year 0
+        # (rates and yearly power factors are cached on the context and shared by all its deposits)
+        if self.deposit_type == DepositType.ENTRY:
+            return [(self.amount - self.fee) * power_factor for power_factor in context.calculate_yearly_power_factors(max_years)]
 
-                return future_value_annuity
+        elif self.deposit_type == DepositType.PERIODIC:
+            if self.deposits_per_year <= 0:
+                raise ValueError("for deposit_type == 'periodic' value of deposits_per_year must be greater than 0")
+            elif self.deposits_per_year == context.compounding_per_year:
+                future_values = []
+                for power_factor in context.calculate_yearly_power_factors(max_years):
+                    future_value_annuity = (self.amount - self.fee) * ((power_factor - 1) / context.periodic_interest_rate)
+                    if self.annuity_type == AnnuityType.DUE:
+                        future_value_annuity *= context.periodic_growth_factor
+                    future_values.append(future_value_annuity)
+                return future_values
+            else:
+                return calculate_yearly_mismatched_future_values(
+                    self.amount, max_years, self.deposits_per_year, context.calculate_daily_interest_rate(precision), precision)
 
         else:
             # invalid input
@@ -0,0 +1,294 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from compounding import find_shifted_deposits
+from models import *
+from projections import YearlyProjection
+
+# Monte Carlo simulation of the investment with random yearly returns instead of one fixed annual_interest_rate.
+# Every path samples a gross annual return for every year; within the year the deposits are evaluated with
+# the same formulas as Deposit.calculate_yearly_future_values (TER, tax, compounding and interest type from the context),
+# so with zero volatility the simulation gives generate_yearly_projection / simulate_withdrawal_until_depleted.
+# All paths of a chunk are evaluated at once as NumPy arrays, chunks run in a process pool.
+# Run: python benchmark_monte_carlo.py
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+# Paths simulated by one task of the process pool. Every chunk has its own random stream spawned from the seed,
+# so the results depend only on the seed and the number of paths, not on the number of workers.
+CHUNK_PATHS = 20_000
+# A sampled annual return can not lose more than everything (normal distribution has unbounded tails)
+MIN_ANNUAL_RETURN = -0.999
+
+
+class ReturnDistribution(str, Enum):
+    # "normal" = gross annual returns ~ N(mean, volatility)
+    # "lognormal" = 1 + return is lognormal with the given mean and volatility of the return
+    # "bootstrap" = annual returns drawn with replacement from a supplied history
+    NORMAL = "normal"
+    LOGNORMAL = "lognormal"
+    BOOTSTRAP = "bootstrap"
+
+
+@dataclass(frozen=True)
+class ReturnModel:
+    distribution: ReturnDistribution = ReturnDistribution.NORMAL
+    mean: float = 0.0
+    volatility: float = 0.0
+    history: Tuple[float, ...] = ()
+
+    def __post_init__(self):
+        object.__setattr__(self, "mean", float(self.mean))
+        object.__setattr__(self, "volatility", float(self.volatility))
+        object.__setattr__(self, "history", tuple(float(annual_return) for annual_return in self.history))
+        # Invalid input
+        if self.distribution not in (ReturnDistribution.NORMAL, ReturnDistribution.LOGNORMAL, ReturnDistribution.BOOTSTRAP):
+            raise ValueError("distribution must be 'normal', 'lognormal' or 'bootstrap'")
+        object.__setattr__(self, "distribution", ReturnDistribution(self.distribution))
+        if self.volatility < 0:
+            raise ValueError("volatility must not be negative")
+        if self.distribution == ReturnDistribution.LOGNORMAL and self.mean <= -1:
+            raise ValueError("mean of lognormal returns must be grater than -1")
+        if self.distribution == ReturnDistribution.BOOTSTRAP:
+            if not self.history:
+                raise ValueError("bootstrap needs a history of annual returns")
+            if min(self.history) <= -1:
+                raise ValueError("history of annual returns must be grater than -1")
+
+    def sample(self, rng: np.random.Generator, paths: int, years: int) -> np.ndarray:
+        # Gross annual returns, rows = paths, columns = years
+        if self.distribution == ReturnDistribution.NORMAL:
+            returns = rng.normal(self.mean, self.volatility, (paths, years))
+        elif self.distribution == ReturnDistribution.LOGNORMAL:
+            # parameters of log(1 + return), so that the return has the required mean and volatility
+            sigma_squared = math.log1p((self.volatility / (1 + self.mean)) ** 2)
+            mu = math.log1p(self.mean) - sigma_squared / 2
+            returns = np.expm1(rng.normal(mu, math.sqrt(sigma_squared), (paths, years)))
+        else:
+            returns = rng.choice(np.array(self.history), (paths, years))
+        return np.maximum(returns, MIN_ANNUAL_RETURN)
+
+
+@dataclass
+class MonteCarloProjection:
+    # Percentile bands of the yearly projection - bands[percentile][year - 1] is a YearlyProjection whose values
+    # are the percentile over all paths in that year (every year separately, as in a fan chart)
+    paths: int
+    percentiles: Tuple[float, ...]
+    bands: Dict[float, List[YearlyProjection]]
+    # Real value of every path after max_years (e.g. initial capital for simulate_depletion_probability)
+    final_values_real: np.ndarray = field(repr=False)
+
+
+@dataclass
+class DepletionRisk:
+    # Probability that the capital is depleted within the years of withdrawals,
+    # cumulative_probability[year - 1] = depleted in the first `year` years
+    paths: int
+    years: int
+    probability: float
+    cumulative_probability: List[float]
+
+
+def calculate_net_rates(context: InvestmentContext, gross_returns: np.ndarray) -> np.ndarray:
+    # InvestmentContext.annual_net_rate for every sampled gross return
+    annual_rates = gross_returns
+    if context.ter_fee > 0:
+        annual_rates = (1 + annual_rates) * (1 - float(context.ter_fee)) - 1
+    if context.tax_interest_rate > 0:
+        annual_rates = annual_rates * (1 - float(context.tax_interest_rate))
+    return np.maximum(annual_rates, MIN_ANNUAL_RETURN)
+
+
+def calculate_rate_per_periods(context: InvestmentContext, net_rates: np.ndarray, periods_per_year: int) -> np.ndarray:
+    # Rate per one of periods_per_year periods (periodic rate for compounding_per_year, daily rate for 365)
+    if context.interest_type == InterestType.NOMINAL:
+        return net_rates / periods_per_year
+    return np.expm1(np.log1p(net_rates) / periods_per_year)
+
+
+def spawn_chunks(paths: int, seed: int) -> List[Tuple[int, int, np.random.SeedSequence]]:
+    # (first path, number of paths, seed sequence) of every chunk
+    starts = range(0, paths, CHUNK_PATHS)
+    return [(start, min(CHUNK_PATHS, paths - start), seed_sequence)
+            for start, seed_sequence in zip(starts, np.random.SeedSequence(seed).spawn(len(starts)))]
+
+
+def run_chunks(function, tasks: list, workers: int = None) -> list:
+    # Chunks in a process pool (workers=None = number of CPUs), one chunk or workers=1 runs in this process
+    if workers == 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, tasks))
+
+
+def simulate_deposit_values(context: InvestmentContext, deposit: Deposit, net_rates: np.ndarray) -> np.ndarray:
+    # Values of the deposit at the end of every year for every path (the rate of a year is net_rates[:, year - 1]);
+    # the balance grows with the rate of the year and the deposits of the year are added,
+    # as in Deposit.calculate_yearly_future_values with a fixed rate
+    paths, years = net_rates.shape
+    values = np.empty((paths, years))
+    balance = np.zeros(paths)
+
+    if deposit.deposit_type == DepositType.ENTRY:
+        periodic_rates = calculate_rate_per_periods(context, net_rates, context.compounding_per_year)
+        balance += float(deposit.amount - deposit.fee)
+        for year in range(years):
+            balance *= np.exp(context.compounding_per_year * np.log1p(periodic_rates[:, year]))
+            values[:, year] = balance
+        return values
+
+    if deposit.deposits_per_year <= 0:
+        raise ValueError("for deposit_type == 'periodic' value of deposits_per_year must be greater than 0")
+
+    if deposit.deposits_per_year == context.compounding_per_year:
+        periodic_rates = calculate_rate_per_periods(context, net_rates, context.compounding_per_year)
+        principal = float(deposit.amount - deposit.fee)
+        for year in range(years):
+            rate = periodic_rates[:, year]
+            year_growth = np.expm1(context.compounding_per_year * np.log1p(rate))
+            # deposits of the year: principal * ((1 + i) ** m - 1) / i, for i == 0 the limit principal * m
+            deposits = principal * np.divide(year_growth, rate, out=np.full(paths, float(context.compounding_per_year)), where=rate != 0)
+            if deposit.annuity_type == AnnuityType.DUE:
+                deposits *= 1 + rate
+            balance = balance * (1 + year_growth) + deposits
+            values[:, year] = balance
+        return values
+
+    # time simulation - deposits earn daily interest for their remaining days of the year
+    log_growths = np.log1p(calculate_rate_per_periods(context, net_rates, 365))
+    first_year_days = np.array([365 - k * 365 // deposit.deposits_per_year for k in range(deposit.deposits_per_year)])
+    shifted = {}
+    for k in find_shifted_deposits(years * deposit.deposits_per_year, deposit.deposits_per_year):
+        shifted.setdefault(k // deposit.deposits_per_year, []).append((k // deposit.deposits_per_year + 1) * 365 - k * 365 // deposit.deposits_per_year)
+    amount = float(deposit.amount)
+    for year in range(years):
+        log_growth = log_growths[:, year]
+        deposits = np.exp(np.outer(log_growth, first_year_days)).sum(axis=1)
+        for remaining_days in shifted.get(year, ()):
+            # deposit placed one day earlier by the rounded deposit interval
+            deposits += np.exp(remaining_days * log_growth) * np.expm1(log_growth)
+        balance = balance * np.exp(365 * log_growth) + amount * deposits
+        values[:, year] = balance
+    return values
+
+
+def _simulate_projection_chunk(task) -> np.ndarray:
+    paths, seed_sequence, max_years, context, deposits, return_model = task
+    net_rates = calculate_net_rates(context, return_model.sample(np.random.default_rng(seed_sequence), paths, max_years))
+    total_value_nominal = np.zeros((paths, max_years))
+    for deposit in deposits:
+        total_value_nominal += simulate_deposit_values(context, deposit, net_rates)
+    return total_value_nominal
+
+
+def simulate_yearly_projection(
+        max_years: int,
+        investment_context: InvestmentContext,
+        deposits: List[Deposit],
+        return_model: ReturnModel,
+        inflation_rate: Decimal = Decimal(0),
+        paths: int = 100_000,
+        seed: int = 0,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        workers: int = None,
+) -> MonteCarloProjection:
+    # Monte Carlo counterpart of generate_yearly_projection - percentile bands of the yearly values over all paths
+    if paths <= 0:
+        raise ValueError("paths must be greater than 0")
+    tasks = [(chunk_paths, seed_sequence, max_years, investment_context, deposits, return_model)
+             for _, chunk_paths, seed_sequence in spawn_chunks(paths, seed)]
+    total_value_nominal = np.concatenate(run_chunks(_simulate_projection_chunk, tasks, workers))
+
+    # inflation is the same for all paths - the real values are the nominal values divided by one factor per year
+    inflation_factors = np.ones(max_years)
+    if inflation_rate > 0:
+        inflation_factors = (1 + float(inflation_rate)) ** np.arange(1, max_years + 1)
+    nominal_bands = np.percentile(total_value_nominal, percentiles, axis=0)
+    total_deposited = [sum(deposit.calculate_total_deposit_amount(investment_context.with_years(year)) for deposit in deposits)
+                       for year in range(1, max_years + 1)]
+
+    bands = {}
+    for percentile, nominal_values in zip(percentiles, nominal_bands):
+        bands[percentile] = [
+            YearlyProjection(
+                year=year,
+                total_deposited=Decimal(total_deposited[year - 1]),
+                total_value_nominal=Decimal(float(nominal_value)),
+                total_value_real=Decimal(float(nominal_value / inflation_factor)),
+            )
+            for year, nominal_value, inflation_factor in zip(range(1, max_years + 1), nominal_values, inflation_factors)
+        ]
+    return MonteCarloProjection(
+        paths=paths,
+        percentiles=tuple(percentiles),
+        bands=bands,
+        final_values_real=total_value_nominal[:, -1] / inflation_factors[-1],
+    )
+
+
+def _simulate_depletion_chunk(task) -> np.ndarray:
+    (paths, seed_sequence, years, initial_capital, withdrawal_amount, withdrawals_per_year,
+     annual_inflation_rate, context, return_model, fee_amount, fee_type) = task
+    # Year of depletion of every path (0 = capital lasts all years)
+    net_rates = calculate_net_rates(context, return_model.sample(np.random.default_rng(seed_sequence), paths, years))
+    # growth of the capital per withdrawal period: (1 + i) ** (compounding_per_year / withdrawals_per_year)
+    period_log_growths = (context.compounding_per_year / withdrawals_per_year
+                          * np.log1p(calculate_rate_per_periods(context, net_rates, context.compounding_per_year)))
+    periodic_inflation = (1 + annual_inflation_rate) ** (1 / withdrawals_per_year)
+    capital = np.array(np.broadcast_to(initial_capital, (paths,)), dtype=float)
+    depleted_year = np.zeros(paths, dtype=np.int64)
+    withdrawal = withdrawal_amount
+
+    for period in range(years * withdrawals_per_year):
+        year = period // withdrawals_per_year
+        # the same steps as simulate_withdrawal_until_depleted: interest, inflation, withdrawal with fee
+        capital = capital * np.exp(period_log_growths[:, year]) / periodic_inflation
+        withdrawal *= periodic_inflation
+        fee = withdrawal * fee_amount if fee_type == FeeType.PROPORTIONAL else fee_amount
+        capital -= withdrawal + fee
+        newly_depleted = (capital <= 0) & (depleted_year == 0)
+        depleted_year[newly_depleted] = year + 1
+    return depleted_year
+
+
+def simulate_depletion_probability(
+    initial_capital,
+    withdrawal_amount: Decimal,
+    withdrawals_per_year: int,
+    annual_inflation_rate: Decimal,
+    context: InvestmentContext,
+    return_model: ReturnModel,
+    years: int,
+    fee_amount: Decimal = Decimal(0),
+    fee_type: FeeType = FeeType.FIXED,
+    paths: int = 100_000,
+    seed: int = 0,
+    workers: int = None,
+) -> DepletionRisk:
+    # Monte Carlo counterpart of simulate_withdrawal_until_depleted - probability that the capital is depleted
+    # within `years` years of withdrawals; initial_capital is one amount for all paths or one amount per path
+    # (e.g. MonteCarloProjection.final_values_real)
+    if paths <= 0:
+        raise ValueError("paths must be greater than 0")
+    initial_capital = np.asarray(initial_capital, dtype=float)
+    if initial_capital.ndim and len(initial_capital) != paths:
+        raise ValueError("initial_capital must be one amount or one amount per path")
+    tasks = [(chunk_paths, seed_sequence, years, initial_capital[start:start + chunk_paths] if initial_capital.ndim else initial_capital,
+              float(withdrawal_amount), withdrawals_per_year, float(annual_inflation_rate), context, return_model, float(fee_amount), fee_type)
+             for start, chunk_paths, seed_sequence in spawn_chunks(paths, seed)]
+    depleted_year = np.concatenate(run_chunks(_simulate_depletion_chunk, tasks, workers))
+
+    depleted_per_year = np.bincount(depleted_year, minlength=years + 1)[1:]
+    cumulative_probability = (np.cumsum(depleted_per_year) / paths).tolist()
+    return DepletionRisk(
+        paths=paths,
+        years=years,
+        probability=cumulative_probability[-1] if cumulative_probability else 0.0,
+        cumulative_probability=cumulative_probability,
+    )
@@ -32,6 +32,11 @@ def generate_yearly_projection(
         deposits: List[Deposit],
         inflation_rate: Decimal = Decimal(0),
 ) -> List[YearlyProjection]:
+    # Rolling projection - the rates and yearly power factors are cached on the (immutable) context and shared
+    # by all deposits, time-simulated deposits carry their balance forward one year at a time,
+    # so the projection is linear in max_years instead of recomputing every year from year 0
+    deposit_values = [deposit.calculate_yearly_future_values(investment_context, max_years) for deposit in deposits]
+
     projections = []
 
     for year in range(1, max_years + 1):
@@ -41,9 +46,9 @@ def generate_yearly_projection(
         total_deposited = Decimal(0)
         total_value_nominal = Decimal(0)
 
-        for deposit in deposits:
+        for deposit, future_values in zip(deposits, deposit_values):
             total_deposited += deposit.calculate_total_deposit_amount(yearly_context)
-            total_value_nominal += deposit.calculate_future_value(yearly_context)
+            total_value_nominal += future_values[year - 1]
 
         real_value = adjust_for_inflation(total_value_nominal, year, inflation_rate)
 
@@ -28,7 +28,7 @@ def simulate_withdrawal_until_depleted(
     # reálný kapitál - kupní síla naspořených financí
     capital = initial_capital
     # úroková sazba pro kapitalizační periodu
-    periodic_compounding_interest_rate = context.calculate_periodic_interest_rate()
+    periodic_compounding_interest_rate = context.periodic_interest_rate
     # počet period pro úročení ku periodě výběru
     compounding_periods_per_withdrawal_period = context.compounding_per_year / withdrawals_per_year
     # poměrná část roční inflace (sazba roční inflace je efektivní) ku periodě výběru
@@ -0,0 +1,92 @@
+import unittest
+from decimal import Decimal
+from itertools import product
+
+import numpy as np
+
+from batch import *
+from projections import generate_yearly_projection
+
+# Unit tests of the vectorized ScenarioBatch against the Decimal path (generate_yearly_projection).
+# Run: python -m unittest test_batch (in the Profit_calculator folder)
+
+# Maximum relative error of the float64 batch results
+FLOAT64_RTOL = 1e-12
+MAX_YEARS = 40
+
+
+def relative_error(value, expected: Decimal) -> float:
+    # The batch value is converted to Decimal exactly, so the error is not hidden by a conversion of the reference
+    return float(abs(exact_decimal(value) - expected) / abs(expected)) if expected else float(abs(value))
+
+
+def scenario_grid():
+    # Every compounding frequency with every deposit frequency (matched and time-simulated), entry and periodic
+    # deposits, both fee types, both annuity types and both interest types
+    scenarios = []
+    grid = product(CompoundingFrequency, (1, 4, 12, 24, 52, 365), DepositType, FeeType, AnnuityType, InterestType)
+    for index, (frequency, deposits_per_year, deposit_type, fee_type, annuity_type, interest_type) in enumerate(grid):
+        context = InvestmentContext(1 + index % MAX_YEARS, (0.01, 0.05, 0.12)[index % 3], frequency,
+                                    (0, 0.0003, 0.002)[index % 3], interest_type, (0.15, 0)[index % 2])
+        fee_amount = 0.0015 if fee_type == FeeType.PROPORTIONAL else 5
+        scenarios.append((context, Deposit(deposit_type, 100 + 37 * index, deposits_per_year, fee_amount, fee_type, annuity_type)))
+    return scenarios
+
+
+class TestScenarioBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.scenarios = scenario_grid()
+        cls.batch = ScenarioBatch.from_scenarios(cls.scenarios)
+        cls.inflation = [(Decimal(0), Decimal("0.025"))[index % 2] for index in range(len(cls.scenarios))]
+
+    def test_projection_matches_decimal(self):
+        projection = self.batch.generate_yearly_projection(MAX_YEARS, self.inflation)
+        np.testing.assert_array_equal(projection.years, np.arange(1, MAX_YEARS + 1))
+        for index, (context, deposit) in enumerate(self.scenarios):
+            expected = generate_yearly_projection(MAX_YEARS, context, [deposit], self.inflation[index])
+            with self.subTest(scenario=index, frequency=context.compounding_per_year, deposits_per_year=deposit.deposits_per_year,
+                              deposit_type=deposit.deposit_type, fee_type=deposit.fee_type, annuity_type=deposit.annuity_type):
+                for year, row in enumerate(expected):
+                    self.assertLessEqual(relative_error(projection.total_value_nominal[index, year], row.total_value_nominal), FLOAT64_RTOL)
+                    self.assertLessEqual(relative_error(projection.total_value_real[index, year], row.total_value_real), FLOAT64_RTOL)
+                    self.assertLessEqual(relative_error(projection.total_deposited[index, year], row.total_deposited), FLOAT64_RTOL)
+
+    def test_compare_with_decimal(self):
+        deviation = self.batch.compare_with_decimal(MAX_YEARS)
+        self.assertLessEqual(deviation.relative.max(), FLOAT64_RTOL)
+
+    def test_future_values_after_own_years(self):
+        future_values = self.batch.calculate_future_values()
+        for index, (context, deposit) in enumerate(self.scenarios):
+            self.assertLessEqual(relative_error(future_values[index], deposit.calculate_future_value(context)), FLOAT64_RTOL)
+
+    def test_several_deposits_are_several_scenarios(self):
+        # A plan with an entry deposit and monthly deposits = two scenarios with the same context, summed
+        context = InvestmentContext(30, 0.06, CompoundingFrequency.PER_ANNUM, 0.0003, InterestType.NOMINAL, 0.15)
+        deposits = [Deposit(DepositType.ENTRY, 50000, 0, 0.01), Deposit(DepositType.PERIODIC, 3000, 12, 0.0015)]
+        batch = ScenarioBatch.from_scenarios([(context, deposit) for deposit in deposits])
+        projection = batch.generate_yearly_projection(30, Decimal("0.02"))
+        expected = generate_yearly_projection(30, context, deposits, Decimal("0.02"))
+        for year, row in enumerate(expected):
+            self.assertLessEqual(relative_error(projection.total_value_nominal[:, year].sum(), row.total_value_nominal), FLOAT64_RTOL)
+            self.assertLessEqual(relative_error(projection.total_deposited[:, year].sum(), row.total_deposited), FLOAT64_RTOL)
+
+    def test_to_scenarios_round_trip(self):
+        for (context, deposit), (expected_context, expected_deposit) in zip(self.batch.to_scenarios(), self.scenarios):
+            self.assertEqual(context, expected_context)
+            self.assertEqual(vars(deposit), vars(expected_deposit))
+
+    def test_invalid_input(self):
+        columns = dict(years=[10], annual_interest_rate=[0.05], compounding_per_year=[12], ter_fee=[0], tax_interest_rate=[0],
+                       interest_type=["nominal"], deposit_type=["periodic"], amount=[1000], deposits_per_year=[12],
+                       fee_amount=[0], fee_type=["fixed"], annuity_type=["due"])
+        for column, value in (("years", [10, 20]), ("annual_interest_rate", [0]), ("compounding_per_year", [366]),
+                              ("interest_type", ["simple"]), ("deposit_type", ["once"]), ("fee_type", ["exact"]),
+                              ("deposits_per_year", [0])):
+            with self.subTest(column=column), self.assertRaises(ValueError):
+                ScenarioBatch(**{**columns, column: value})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+from decimal import Decimal, localcontext
+from itertools import product
+
+from compounding import *
+from models import *
+
+# Unit tests of the compounding engine against the original day-by-day loop.
+# Run: python -m unittest test_compounding (in the Profit_calculator folder)
+
+# Relative drift of the original loop at the default 28 digits (without guard digits) from the engine -
+# the loop loses its last ~5 digits to rounding of the accumulated terms, see ORIGINAL_LOOP_DRIFT in compounding
+DRIFT = ORIGINAL_LOOP_DRIFT
+
+FEES = ((FeeType.FIXED, 5), (FeeType.PROPORTIONAL, 0.0015))
+
+
+def calculate_future_value_by_days(deposit: Deposit, context: InvestmentContext):
+    # Original time simulation (deposits_per_year != compounding_per_year) in the current Decimal context -
+    # (1 + daily_rate) ** remaining_days computed from scratch for every deposit
+    total_days = context.years * 365
+    if context.interest_type == InterestType.NOMINAL:
+        daily_rate = context._calculate_net_annual_rate() / Decimal(365)
+    else:
+        daily_rate = (Decimal(1) + context._calculate_net_annual_rate()) ** (Decimal(1) / Decimal(365)) - Decimal(1)
+    with localcontext() as ctx:
+        ctx.prec = DEPOSIT_DAY_PRECISION
+        deposit_interval = Decimal(365) / Decimal(deposit.deposits_per_year)
+        deposit_days = [int(k * deposit_interval) for k in range(context.years * deposit.deposits_per_year)]
+    future_value_annuity = Decimal(0)
+    for deposit_day in deposit_days:
+        future_value_annuity += deposit.amount * ((Decimal(1) + daily_rate) ** (total_days - deposit_day))
+    return future_value_annuity
+
+
+def calculate_future_value_by_periods(deposit: Deposit, context: InvestmentContext):
+    # Period-by-period simulation (deposits_per_year == compounding_per_year) - the net deposit is added
+    # at the beginning (due) or at the end (ordinary) of every compounding period
+    balance = Decimal(0)
+    for _ in range(context.periods_per_investment):
+        if deposit.annuity_type == AnnuityType.DUE:
+            balance = (balance + deposit.amount - deposit.fee) * context.periodic_growth_factor
+        else:
+            balance = balance * context.periodic_growth_factor + deposit.amount - deposit.fee
+    return balance
+
+
+class TestMismatchedFrequencies(unittest.TestCase):
+    def assertDrift(self, value: Decimal, expected: Decimal):
+        self.assertLessEqual(abs(value - expected) / abs(expected), DRIFT, f'{value} != {expected}')
+
+    def test_matches_original_loop(self):
+        for years, (rate, interest_type), frequency, deposits_per_year in product(
+                (1, 7, 40), ((0.03, InterestType.NOMINAL), (0.07, InterestType.EFFECTIVE)),
+                (CompoundingFrequency.PER_ANNUM, CompoundingFrequency.PER_MENSEM, CompoundingFrequency.PER_DIEM),
+                (1, 12, 24, 52, 365)):
+            if deposits_per_year == frequency:
+                continue
+            context = InvestmentContext(years, rate, frequency, 0.0003, interest_type, 0.15)
+            expected = calculate_future_value_by_days(Deposit(DepositType.PERIODIC, 1000, deposits_per_year, 0), context)
+            for annuity_type, (fee_type, fee_amount) in product(AnnuityType, FEES):
+                with self.subTest(years=years, interest_type=interest_type, frequency=frequency,
+                                  deposits_per_year=deposits_per_year, annuity_type=annuity_type, fee_type=fee_type):
+                    # the time simulation places the deposits on their days and, like the original loop,
+                    # does not depend on the annuity type and the fee
+                    deposit = Deposit(DepositType.PERIODIC, 1000, deposits_per_year, fee_amount, fee_type, annuity_type)
+                    self.assertDrift(deposit.calculate_future_value(context), expected)
+
+    def test_identical_to_original_loop_with_guard_digits(self):
+        # The original loop evaluated with guard digits and rounded gives the engine result to the last digit
+        context = InvestmentContext(40, 0.07, CompoundingFrequency.PER_DIEM, 0.0003, InterestType.EFFECTIVE, 0.15)
+        for precision, deposits_per_year in product((20, 28, 50), (12, 24, 52)):
+            with self.subTest(precision=precision, deposits_per_year=deposits_per_year):
+                deposit = Deposit(DepositType.PERIODIC, 1000, deposits_per_year, 0)
+                with localcontext() as ctx:
+                    ctx.prec = precision + GUARD_DIGITS
+                    future_value = calculate_future_value_by_days(deposit, context)
+                with localcontext() as ctx:
+                    ctx.prec = precision
+                    expected = +future_value
+                self.assertEqual(deposit.calculate_future_value(context, precision), expected)
+
+    def test_yearly_values_match_single_plans(self):
+        context = InvestmentContext(25, 0.05, CompoundingFrequency.PER_QUARTALE, 0.0003, InterestType.NOMINAL, 0.15)
+        deposit = Deposit(DepositType.PERIODIC, 2000, 24, 0)
+        expected = [deposit.calculate_future_value(context.with_years(year)) for year in range(1, 26)]
+        self.assertEqual(deposit.calculate_yearly_future_values(context, 25), expected)
+
+
+class TestMatchedFrequencies(unittest.TestCase):
+    def test_matches_period_loop(self):
+        for years, (rate, interest_type), frequency, annuity_type, (fee_type, fee_amount) in product(
+                (1, 7, 40), ((0.03, InterestType.NOMINAL), (0.07, InterestType.EFFECTIVE)),
+                CompoundingFrequency, AnnuityType, FEES):
+            with self.subTest(years=years, interest_type=interest_type, frequency=frequency,
+                              annuity_type=annuity_type, fee_type=fee_type):
+                context = InvestmentContext(years, rate, frequency, 0.0003, interest_type, 0.15)
+                deposit = Deposit(DepositType.PERIODIC, 1000, int(frequency), fee_amount, fee_type, annuity_type)
+                expected = calculate_future_value_by_periods(deposit, context)
+                value = deposit.calculate_future_value(context)
+                self.assertLessEqual(abs(value - expected) / expected, DRIFT, f'{value} != {expected}')
+                self.assertEqual(deposit.calculate_yearly_future_values(context, years)[-1], value)
+
+    def test_due_earns_one_more_period(self):
+        context = InvestmentContext(10, 0.06, CompoundingFrequency.PER_MENSEM, 0, InterestType.NOMINAL, 0)
+        due = Deposit(DepositType.PERIODIC, 100, 12, 0, FeeType.FIXED, AnnuityType.DUE)
+        ordinary = Deposit(DepositType.PERIODIC, 100, 12, 0, FeeType.FIXED, AnnuityType.ORDINARY)
+        self.assertEqual(due.calculate_future_value(context), ordinary.calculate_future_value(context) * context.periodic_growth_factor)
+
+
+class TestCompoundingHelpers(unittest.TestCase):
+    def test_deposit_days(self):
+        # Shifted deposits are exactly the deposits placed one day before k * 365 // deposits_per_year
+        for deposits_per_year in range(1, 366):
+            deposits = 3 * deposits_per_year
+            with localcontext() as ctx:
+                ctx.prec = DEPOSIT_DAY_PRECISION
+                interval = Decimal(365) / Decimal(deposits_per_year)
+                days = [int(k * interval) for k in range(deposits)]
+            self.assertEqual([calculate_deposit_day(k, deposits_per_year) for k in range(deposits)], days)
+            shifted = [k for k in range(deposits) if days[k] != k * 365 // deposits_per_year]
+            self.assertEqual(find_shifted_deposits(deposits, deposits_per_year), shifted, deposits_per_year)
+            self.assertTrue(all(days[k] == k * 365 // deposits_per_year - 1 for k in shifted))
+
+    def test_sum_of_powers(self):
+        base = Decimal("1.0001917")
+        exponents = [730 - k * 365 // 52 for k in range(104)]
+        with localcontext() as ctx:
+            ctx.prec = DEFAULT_PRECISION + GUARD_DIGITS
+            total = sum(base ** exponent for exponent in exponents)
+        with localcontext() as ctx:
+            ctx.prec = DEFAULT_PRECISION
+            expected = +total
+        self.assertEqual(calculate_sum_of_powers(base, exponents), expected)
+        self.assertEqual(calculate_sum_of_powers(base, []), 0)
+        with self.assertRaises(ValueError):
+            calculate_sum_of_powers(base, [1, 2])
+
+    def test_geometric_sum(self):
+        self.assertEqual(calculate_geometric_sum(Decimal(1), 7), 7)
+        self.assertEqual(calculate_geometric_sum(Decimal(2), 10), 1023)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+
+import monte_carlo
+from monte_carlo import *
+from projections import generate_yearly_projection
+from retirement import simulate_withdrawal_until_depleted
+
+# Unit tests of the Monte Carlo simulation with small numbers of paths (timing: benchmark_monte_carlo.py).
+# Run: python -m unittest test_monte_carlo (in the Profit_calculator folder)
+
+PATHS = 400
+# Paths per chunk in the tests, so that a few hundred paths are split into several chunks (and pool tasks)
+TEST_CHUNK_PATHS = 100
+# Maximum relative deviation of the zero-volatility simulation (float64) from the Decimal calculation
+FLOAT64_RTOL = 1e-12
+
+inflation_rate = Decimal("0.02")
+withdrawal_amount = Decimal("20000")
+context = InvestmentContext(25, 0.07, CompoundingFrequency.PER_MENSEM, 0.0003, InterestType.EFFECTIVE, 0.15)
+deposits = [
+    Deposit(DepositType.ENTRY, 50000, 0, 0.0015, FeeType.PROPORTIONAL, AnnuityType.DUE),
+    Deposit(DepositType.PERIODIC, 5000, 12, 0.0015, FeeType.PROPORTIONAL, AnnuityType.ORDINARY),
+    Deposit(DepositType.PERIODIC, 1000, 52, 10, FeeType.FIXED, AnnuityType.DUE),
+]
+normal_model = ReturnModel(ReturnDistribution.NORMAL, 0.07, 0.15)
+
+
+def fixed_models(annual_rate: float):
+    # Every distribution with zero volatility returns annual_rate in every year
+    return [ReturnModel(ReturnDistribution.NORMAL, annual_rate, 0), ReturnModel(ReturnDistribution.LOGNORMAL, annual_rate, 0),
+            ReturnModel(ReturnDistribution.BOOTSTRAP, history=(annual_rate,))]
+
+
+@mock.patch.object(monte_carlo, "CHUNK_PATHS", TEST_CHUNK_PATHS)
+class TestMonteCarlo(unittest.TestCase):
+    def simulate(self, seed: int = 0, workers: int = 1):
+        projection = simulate_yearly_projection(context.years, context, deposits, normal_model, inflation_rate, PATHS, seed,
+                                                workers=workers)
+        risk = simulate_depletion_probability(projection.final_values_real, withdrawal_amount, 12, inflation_rate, context,
+                                              normal_model, 30, paths=PATHS, seed=seed + 1, workers=workers)
+        return projection, risk
+
+    def test_fixed_seed_is_deterministic(self):
+        projection, risk = self.simulate(seed=7)
+        same_projection, same_risk = self.simulate(seed=7)
+        self.assertEqual(projection.bands, same_projection.bands)
+        np.testing.assert_array_equal(projection.final_values_real, same_projection.final_values_real)
+        self.assertEqual(risk, same_risk)
+        other_projection, _ = self.simulate(seed=8)
+        self.assertNotEqual(projection.bands, other_projection.bands)
+
+    def test_pool_matches_serial(self):
+        projection, risk = self.simulate(workers=1)
+        for workers in (2, 3):
+            with self.subTest(workers=workers):
+                pool_projection, pool_risk = self.simulate(workers=workers)
+                self.assertEqual(pool_projection.bands, projection.bands)
+                np.testing.assert_array_equal(pool_projection.final_values_real, projection.final_values_real)
+                self.assertEqual(pool_risk, risk)
+
+    def test_zero_volatility_matches_projection(self):
+        expected = generate_yearly_projection(context.years, context, deposits, inflation_rate)
+        for model in fixed_models(float(context.annual_interest_rate)):
+            with self.subTest(distribution=model.distribution):
+                fixed = simulate_yearly_projection(context.years, context, deposits, model, inflation_rate, paths=10)
+                for percentile in fixed.percentiles:
+                    for projection, band in zip(expected, fixed.bands[percentile]):
+                        self.assertEqual(band.total_deposited, projection.total_deposited)
+                        for value, reference in ((band.total_value_nominal, projection.total_value_nominal),
+                                                 (band.total_value_real, projection.total_value_real)):
+                            self.assertLessEqual(abs(value - reference) / reference, FLOAT64_RTOL)
+
+    def test_zero_volatility_depletion_year(self):
+        capital = generate_yearly_projection(context.years, context, deposits, inflation_rate)[-1].total_value_real
+        for fee_amount, fee_type in ((Decimal(0), FeeType.FIXED), (Decimal(15), FeeType.FIXED), (Decimal("0.01"), FeeType.PROPORTIONAL)):
+            withdrawals = simulate_withdrawal_until_depleted(capital, withdrawal_amount, 12, inflation_rate, context, fee_amount, fee_type)
+            depleted_year = withdrawals[-1].year
+            for model in fixed_models(float(context.annual_interest_rate)):
+                with self.subTest(fee_type=fee_type, fee_amount=fee_amount, distribution=model.distribution):
+                    risk = simulate_depletion_probability(capital, withdrawal_amount, 12, inflation_rate, context, model,
+                                                          depleted_year + 2, fee_amount, fee_type, paths=10)
+                    self.assertEqual(risk.cumulative_probability.index(1.0) + 1, depleted_year)
+                    self.assertEqual(risk.cumulative_probability[:depleted_year - 1], [0.0] * (depleted_year - 1))
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            simulate_yearly_projection(context.years, context, deposits, normal_model, paths=0)
+        with self.assertRaises(ValueError):
+            simulate_depletion_probability([1.0, 2.0], withdrawal_amount, 12, inflation_rate, context, normal_model, 10, paths=3)
+        with self.assertRaises(ValueError):
+            ReturnModel(ReturnDistribution.NORMAL, 0.07, -0.1)
+        with self.assertRaises(ValueError):
+            ReturnModel(ReturnDistribution.BOOTSTRAP)
+
+
+if __name__ == "__main__":
+    unittest.main()
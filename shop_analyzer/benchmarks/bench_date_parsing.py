@@ -0,0 +1,74 @@
+"""
+Benchmark převodu sloupce 'Datum': původní cesta (automatická detekce formátu s dayfirst=True)
+proti detekci převládajícího formátu a vektorizovanému převodu s explicitním formátem.
+
+Spuštění (ze složky shop_analyzer):
+    python -m benchmarks.bench_date_parsing --rows 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils import parse_dates
+
+
+def generate_dates(rows: int, seed: int = 42) -> pd.Series:
+    """
+    Vygeneruje sloupec textových dat ve formátu DD.MM.YYYY (stejně jako tests/generator.py).
+
+    :param rows: Počet řádků.
+    :param seed: Semínko generátoru náhodných čísel.
+    :return: Series s textovými hodnotami data.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp(2024, 12, 31) - pd.to_timedelta(rng.integers(0, 365, rows), unit="D")
+    # Formátování přes unikátní dny je řádově rychlejší než strftime pro každý řádek
+    unique_days, inverse = np.unique(days.to_numpy(), return_inverse=True)
+    labels = pd.DatetimeIndex(unique_days).strftime("%d.%m.%Y").to_numpy(dtype=object)
+    return pd.Series(labels[inverse])
+
+
+def legacy_parse(values: pd.Series) -> pd.Series:
+    """Původní převod z DataLoader.validate_data (před explicitním formátem)."""
+    return pd.to_datetime(values, format=None, dayfirst=True, errors="coerce")
+
+
+def measure(func, values: pd.Series, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(values)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark převodu sloupce 'Datum'.")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Počet řádků (výchozí 10 000 000).")
+    parser.add_argument("--repeat", type=int, default=3, help="Počet opakování, použije se nejlepší čas.")
+    args = parser.parse_args()
+
+    clean = generate_dates(args.rows)
+    # Jediná neplatná hodnota na prvním řádku znemožní Pandas odvodit formát z prvního prvku
+    dirty = clean.copy()
+    dirty.iloc[0] = "neplatné datum"
+
+    print(f"Řádků: {args.rows}")
+    for label, values in (("čistá data", clean), ("neplatný první řádek", dirty)):
+        legacy_time = measure(legacy_parse, values, args.repeat)
+        fast_time = measure(parse_dates, values, args.repeat)
+
+        parsed, invalid = parse_dates(values)
+        if not parsed.equals(legacy_parse(values)):
+            raise SystemExit(f"Výsledky obou cest se liší ({label}).")
+
+        print(f"\n[{label}] neplatných řádků: {len(invalid)}")
+        print(f"Původní převod (format=None, dayfirst=True): {legacy_time:.3f} s")
+        print(f"Explicitní formát s detekcí ze vzorku:       {fast_time:.3f} s")
+        print(f"Zrychlení: {legacy_time / fast_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Porovnání paměťové náročnosti načtených dat pro různé plány datových typů (DtypePlan):
+výchozí typy Pandas (objektové řetězce, int64), kategorie s úzkými celými čísly a řetězce v Arrow.
+
+Spuštění (ze složky shop_analyzer):
+    python -m benchmarks.bench_memory --rows 1000000
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.cache import HAS_PYARROW
+from src.data_loader import DataLoader
+from src.profiling import PeakMemory
+from src.schema import DtypePlan, format_memory, memory_usage
+
+from benchmarks.bench_pipeline import DEFAULT_OUTPUT_DIR, dataset_path
+
+
+def measure_plan(file_path: str, plan: DtypePlan) -> dict:
+    """
+    Načte a zvaliduje soubor s daným plánem typů a změří čas, velikost dat a špičkovou paměť.
+
+    :param file_path: Cesta k CSV souboru.
+    :param plan: Plán datových typů.
+    :return: Slovník s časem, velikostí výsledného DataFrame a špičkovou RSS procesu během načítání.
+    """
+    loader = DataLoader(file_path, encoding_cache=None, dtype_plan=plan)
+    with PeakMemory() as memory, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        data = loader.validate_data(loader.load_data())
+        elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "size": memory_usage(data), "peak": memory.peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paměťová náročnost načtených dat podle plánu datových typů.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Počet řádků (výchozí 1 000 000).")
+    parser.add_argument("--seed", type=int, default=0, help="Semínko generátoru dat.")
+    args = parser.parse_args()
+
+    file_path = dataset_path(args.rows, args.seed, os.path.join(DEFAULT_OUTPUT_DIR, "data"))
+    plans = {"výchozí typy Pandas": DtypePlan.unoptimized(), "kategorie + int16": DtypePlan()}
+    if HAS_PYARROW:
+        plans["string[pyarrow] + int16"] = DtypePlan(text_dtype="string[pyarrow]")
+
+    print(f"Řádků: {args.rows}")
+    baseline = None
+    for label, plan in plans.items():
+        # Každý plán se měří v novém procesu, aby špičková paměť nebyla ovlivněna předchozím měřením
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(measure_plan, file_path, plan).result()
+        baseline = baseline or result["size"]
+        print(f"{label:<26} data {format_memory(result['size']):>10} ({baseline / result['size']:4.1f}x menší)  "
+              f"špička RSS {format_memory(result['peak']):>10}  čas {result['seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Porovnání součtů výdajů podle kategorií v korunách (float64) a v celých haléřích (int64)
+s referenčními součty v aritmetice Decimal: odchylka float64 součtů a rychlost obou reprezentací.
+Float64 součty se měří přes groupby (Pandas sčítá s kompenzací chyby) i přes np.bincount
+(prosté sčítání); Analyzer sčítá float64 částky přesně (money.exact_sums) a odchylka jeho součtů
+je dána jen zaokrouhlením vstupních částek na float64.
+
+Spuštění (ze složky shop_analyzer):
+    python -m benchmarks.bench_money --rows 5000000
+"""
+import argparse
+import time
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+from src.money import check_sums, convert_money, decimal_sums, to_decimal
+
+from tests.generator import CATEGORIES, generate_frame
+
+
+def best_time(function, repeat: int) -> tuple:
+    """Spustí funkci opakovaně a vrátí nejlepší čas a poslední výsledek."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def float_error(sums, reference: dict) -> Decimal:
+    """Největší odchylka float64 součtů (přesná binární hodnota) od referenčních součtů Decimal."""
+    return max(abs(Decimal(float(sums[key])) - reference[key]) for key in reference)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Přesnost a rychlost součtů v korunách a v haléřích.")
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Počet řádků (výchozí 5 000 000).")
+    parser.add_argument("--seed", type=int, default=0, help="Semínko generátoru dat.")
+    parser.add_argument("--repeat", type=int, default=3, help="Počet opakování (výsledkem je nejlepší čas).")
+    args = parser.parse_args()
+
+    data = generate_frame(args.rows, np.random.default_rng(args.seed), date(2024, 1, 1), date(2024, 12, 31),
+                          dict.fromkeys(CATEGORIES, 1.0))
+    data["Kategorie"] = data["Kategorie"].astype("category")
+    float_seconds, float_sums = best_time(
+        lambda: data.groupby("Kategorie", observed=True)["Celková cena"].sum(), args.repeat)
+    codes = data["Kategorie"].cat.codes.to_numpy()
+    prices = data["Celková cena"].to_numpy()
+    bincount_seconds, bincount_sums = best_time(
+        lambda: dict(zip(data["Kategorie"].cat.categories, np.bincount(codes, weights=prices))), args.repeat)
+    convert_seconds, exact = best_time(lambda: convert_money(data.copy(), "haler"), 1)
+    haler_seconds, haler_sums = best_time(
+        lambda: exact.groupby("Kategorie", observed=True)["Celková cena"].sum(), args.repeat)
+    decimal_seconds, reference = best_time(lambda: decimal_sums(exact, "Kategorie"), 1)
+
+    if check_sums(haler_sums, reference):
+        raise AssertionError("Součty v haléřích se liší od referenčních součtů Decimal.")
+    print(f"Řádků: {args.rows}, celkem {sum(reference.values())} Kč")
+    print(f"float64 groupby        {float_seconds:.3f} s, max. odchylka od Decimal "
+          f"{float_error(float_sums, reference):.2e} Kč")
+    print(f"float64 np.bincount    {bincount_seconds:.3f} s, max. odchylka od Decimal "
+          f"{float_error(bincount_sums, reference):.2e} Kč")
+    print(f"int64 (haléře)         {haler_seconds:.3f} s, přesně (+ převod na haléře {convert_seconds:.3f} s)")
+    print(f"Decimal (reference)    {decimal_seconds:.3f} s")
+    print(f"Součet v haléřích pro zobrazení: {to_decimal(haler_sums.sum())} Kč")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Benchmark celé cesty načtení → validace → analýza → grafy na vygenerovaných datech.
+
+Každá fáze (DataLoader.detect_encoding, load_data, validate_data, metody Analyzer a grafy Visualizer)
+se měří zvlášť - nejlepší čas z opakování a špičková paměť procesu (RSS) během fáze. Výsledky se
+ukládají jako JSON, takže lze porovnat běhy z různých commitů.
+
+Spuštění (ze složky shop_analyzer):
+    python -m benchmarks.bench_pipeline run --sizes 10k,100k,1M
+    python -m benchmarks.bench_pipeline compare output/benchmarks/abc1234.json output/benchmarks/def5678.json
+
+Příkaz compare skončí s návratovým kódem 1, pokud je některá fáze pomalejší než --threshold (výchozí 20 %).
+Data pro 100M řádků zaberou na disku přibližně 5 GB a načtení do paměti desítky GB.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.analyzer import Analyzer
+from src.data_loader import DataLoader
+from src.profiling import PeakMemory
+from src.visualizer import Visualizer
+from tests.generator import write_csv
+
+RESULTS_VERSION = 1
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT_DIR = os.path.join(BASE_DIR, "output", "benchmarks")
+
+# Jednotky pro zápis počtu řádků (např. "10k", "100M")
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+ANALYZER_STAGES = ["calculate_monthly_expenses", "get_top_items", "analyze_categories", "compute_all"]
+VISUALIZER_STAGES = [
+    ("plot_monthly_expenses", "monthly_expenses"),
+    ("plot_category_distribution", "category_analysis"),
+    ("plot_top_items", "top_items"),
+]
+
+
+def parse_size(text: str) -> int:
+    """
+    Převede zápis počtu řádků na číslo ("10k" = 10 000, "1M" = 1 000 000).
+
+    :param text: Počet řádků, volitelně s příponou k nebo M.
+    :return: Počet řádků.
+    """
+    text = text.strip().lower().replace("_", "")
+    multiplier = SIZE_SUFFIXES.get(text[-1:], 1)
+    if multiplier > 1:
+        text = text[:-1]
+    return int(float(text) * multiplier)
+
+
+def measure(stage: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> dict:
+    """
+    Změří jednu fázi: nejlepší čas z opakování a nejvyšší RSS během všech opakování.
+
+    :param stage: Měřená funkce; dostane výsledek setup, pokud je zadán.
+    :param repeat: Počet opakování.
+    :param setup: Nepovinná příprava vstupu, která se do času nezapočítává (např. kopie dat).
+    :return: Slovník s časem, špičkovou pamětí a výsledkem posledního opakování.
+    """
+    best, peak, peak_delta, result = float("inf"), None, None, None
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        with PeakMemory() as memory, contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = stage(*args)
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        if memory.peak is not None:
+            peak = max(peak or 0, memory.peak)
+            peak_delta = max(peak_delta or 0, memory.peak - memory.start)
+    return {
+        "seconds": best,
+        "peak_rss_mb": None if peak is None else round(peak / 2 ** 20, 1),
+        "peak_rss_delta_mb": None if peak_delta is None else round(peak_delta / 2 ** 20, 1),
+        "result": result,
+    }
+
+
+def dataset_path(rows: int, seed: int, data_dir: str) -> str:
+    """
+    Vrátí cestu k testovacímu souboru o daném počtu řádků; chybějící soubor vygeneruje.
+
+    :param rows: Počet řádků.
+    :param seed: Semínko generátoru.
+    :param data_dir: Adresář pro vygenerovaná data.
+    :return: Cesta k CSV souboru.
+    """
+    file_path = os.path.join(data_dir, f"bench_{rows}_{seed}.csv")
+    if not os.path.exists(file_path):
+        print(f"Generování {rows} řádků do {file_path}...")
+        # Zápis přes dočasný název, aby přerušené generování nezanechalo neúplný soubor
+        write_csv(file_path + ".tmp", rows, seed=seed)
+        os.replace(file_path + ".tmp", file_path)
+    return file_path
+
+
+def run_pipeline(file_path: str, repeat: int, report_dir: str) -> Dict[str, dict]:
+    """
+    Změří všechny fáze zpracování jednoho souboru.
+
+    :param file_path: Cesta k CSV souboru.
+    :param repeat: Počet opakování každé fáze.
+    :param report_dir: Adresář pro grafy.
+    :return: Slovník {fáze: {"seconds", "peak_rss_mb", "peak_rss_delta_mb"}}.
+    """
+    stages = {}
+
+    def record(name: str, measurement: dict):
+        result = measurement.pop("result")
+        stages[name] = measurement
+        return result
+
+    # Nový DataLoader bez trvalé cache, aby se kódování pokaždé skutečně detekovalo
+    new_loader = lambda: DataLoader(file_path, encoding_cache=None)
+    record("detect_encoding", measure(lambda loader: loader.detect_encoding(), repeat, setup=new_loader))
+    raw = record("load_data", measure(lambda loader: loader.load_data(), repeat, setup=new_loader))
+    # validate_data mění předaný DataFrame, proto se pro každé opakování kopíruje
+    data = record("validate_data", measure(lambda loader_df: loader_df[0].validate_data(loader_df[1]), repeat,
+                                           setup=lambda: (new_loader(), raw.copy())))
+    del raw
+    stages["validate_data"]["rows"] = len(data)
+
+    # Analyzer si ukládá zakódované sloupce, každá metoda se proto měří na nové instanci
+    for method in ANALYZER_STAGES:
+        results = record(f"analyzer.{method}",
+                         measure(lambda analyzer: getattr(analyzer, method)(), repeat, setup=lambda: Analyzer(data)))
+    visualizer = Visualizer(output_dir=report_dir)
+    for method, key in VISUALIZER_STAGES:
+        record(f"visualizer.{method}", measure(lambda: getattr(visualizer, method)(results[key]), repeat))
+    return stages
+
+
+def git_revision() -> str:
+    """Vrátí zkrácený hash aktuálního commitu (s příponou -dirty při neuložených změnách)."""
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(sizes: List[int], repeat: int = 3, seed: int = 0, data_dir: Optional[str] = None) -> dict:
+    """
+    Spustí benchmark pro všechny velikosti dat.
+
+    :param sizes: Počty řádků testovacích souborů.
+    :param repeat: Počet opakování každé fáze.
+    :param seed: Semínko generátoru dat.
+    :param data_dir: Adresář pro vygenerovaná data (výchozí: output/benchmarks/data).
+    :return: Výsledky ve formátu ukládaném do JSON.
+    """
+    data_dir = data_dir or os.path.join(DEFAULT_OUTPUT_DIR, "data")
+    results = {}
+    with tempfile.TemporaryDirectory() as report_dir:
+        for rows in sizes:
+            file_path = dataset_path(rows, seed, data_dir)
+            print(f"Měření {rows} řádků...")
+            results[str(rows)] = run_pipeline(file_path, repeat, report_dir)
+    return {
+        "version": RESULTS_VERSION,
+        "revision": git_revision(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2, min_seconds: float = 0.01) -> List[dict]:
+    """
+    Porovná dva běhy benchmarku a vrátí fáze, které se zpomalily více než o threshold.
+
+    :param baseline: Výsledky referenčního běhu.
+    :param current: Výsledky porovnávaného běhu.
+    :param threshold: Povolené relativní zpomalení (0.2 = 20 %).
+    :param min_seconds: Fáze kratší než tato hodnota v obou bězích se ignorují (šum měření).
+    :return: Seznam regresí {"rows", "stage", "baseline", "current", "ratio"} seřazený podle zpomalení.
+    """
+    regressions = []
+    for rows, stages in current["results"].items():
+        for stage, measurement in stages.items():
+            reference = baseline["results"].get(rows, {}).get(stage)
+            if reference is None:
+                continue
+            before, after = reference["seconds"], measurement["seconds"]
+            if max(before, after) < min_seconds:
+                continue
+            ratio = after / before if before > 0 else float("inf")
+            if ratio > 1 + threshold:
+                regressions.append({"rows": int(rows), "stage": stage, "baseline": before, "current": after,
+                                    "ratio": ratio})
+    return sorted(regressions, key=lambda regression: regression["ratio"], reverse=True)
+
+
+def print_results(results: dict):
+    print(f"\nRevize: {results['revision']}")
+    for rows, stages in results["results"].items():
+        print(f"\n{int(rows):,} řádků".replace(",", " "))
+        for stage, measurement in stages.items():
+            memory = measurement["peak_rss_mb"]
+            memory = "?" if memory is None else f"{memory:.0f} MB (+{measurement['peak_rss_delta_mb']:.0f} MB)"
+            print(f"  {stage:<42} {measurement['seconds']:>9.4f} s   RSS {memory}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark fází Shop Analyzer (načtení, validace, analýza, grafy).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Změřit fáze na vygenerovaných datech.")
+    run_parser.add_argument("--sizes", default="10k,100k,1M",
+                            help="Počty řádků oddělené čárkou, např. 10k,1M,100M (výchozí 10k,100k,1M).")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Počet opakování, použije se nejlepší čas.")
+    run_parser.add_argument("--seed", type=int, default=0, help="Semínko generátoru dat.")
+    run_parser.add_argument("--data-dir", default=None, help="Adresář pro vygenerovaná data.")
+    run_parser.add_argument("--output", default=None,
+                            help="Cesta k JSON výsledkům (výchozí: output/benchmarks/<revize>.json).")
+
+    compare_parser = commands.add_parser("compare", help="Porovnat dva uložené běhy.")
+    compare_parser.add_argument("baseline", help="JSON výsledky referenčního běhu.")
+    compare_parser.add_argument("current", help="JSON výsledky porovnávaného běhu.")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="Povolené relativní zpomalení (výchozí 0.2 = 20 %%).")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.01,
+                                help="Kratší fáze se neporovnávají (výchozí 0.01 s).")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run([parse_size(size) for size in args.sizes.split(",")], repeat=args.repeat, seed=args.seed,
+                      data_dir=args.data_dir)
+        print_results(results)
+        output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"{results['revision']}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nVýsledky uloženy do {output}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, threshold=args.threshold, min_seconds=args.min_seconds)
+    print(f"Porovnání {baseline['revision']} → {current['revision']} (práh {args.threshold:.0%})")
+    for regression in regressions:
+        print(f"  REGRESE {regression['rows']:>11} řádků  {regression['stage']:<42} "
+              f"{regression['baseline']:.4f} s → {regression['current']:.4f} s ({regression['ratio']:.2f}x)")
+    if not regressions:
+        print("  Žádné regrese.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Porovnání načtení CSV souboru (DataLoader.load_data) přes pd.read_csv a přes namapovaný soubor
+s vícevláknovým parserem pyarrow. Ověří také, že obě cesty vrátí totožný DataFrame.
+
+Spuštění (ze složky shop_analyzer):
+    python -m benchmarks.bench_reader --rows 1000000
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import pandas as pd
+
+from src.data_loader import DataLoader
+from src.reader import HAS_PYARROW_CSV
+
+from benchmarks.bench_pipeline import DEFAULT_OUTPUT_DIR, dataset_path
+
+
+def measure_engine(file_path: str, engine: str, repeat: int) -> tuple:
+    """
+    Načte soubor zadaným parserem opakovaně a vrátí nejlepší čas a poslední výsledek.
+
+    :param file_path: Cesta k CSV souboru.
+    :param engine: "pandas" nebo "pyarrow".
+    :param repeat: Počet opakování.
+    :return: Dvojice (nejlepší čas v sekundách, načtený DataFrame).
+    """
+    best, data = float("inf"), None
+    for _ in range(repeat):
+        loader = DataLoader(file_path, encoding_cache=None, csv_engine=engine)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            data = loader.load_data()
+            best = min(best, time.perf_counter() - start)
+    return best, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rychlost načtení CSV podle parseru.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Počet řádků (výchozí 1 000 000).")
+    parser.add_argument("--seed", type=int, default=0, help="Semínko generátoru dat.")
+    parser.add_argument("--repeat", type=int, default=3, help="Počet opakování (výsledkem je nejlepší čas).")
+    args = parser.parse_args()
+    if not HAS_PYARROW_CSV:
+        parser.error("Knihovna pyarrow není nainstalována.")
+
+    file_path = dataset_path(args.rows, args.seed, os.path.join(DEFAULT_OUTPUT_DIR, "data"))
+    pandas_seconds, expected = measure_engine(file_path, "pandas", args.repeat)
+    arrow_seconds, data = measure_engine(file_path, "pyarrow", args.repeat)
+    pd.testing.assert_frame_equal(data, expected, check_exact=True)
+    print(f"Řádků: {args.rows}, CPU: {os.cpu_count()}")
+    print(f"pd.read_csv          {pandas_seconds:.3f} s")
+    print(f"mmap + pyarrow       {arrow_seconds:.3f} s ({pandas_seconds / arrow_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,269 @@
-from src.data_loader import DataLoader
-from src.analyzer import Analyzer
-from src.visualizer import Visualizer
+import os
+
+# Neinteraktivní backend Matplotlib se nastaví dřív, než se matplotlib poprvé importuje (i v podprocesech)
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+# Pandas, Matplotlib a moduly, které je používají, se importují až ve chvíli, kdy jsou potřeba,
+# aby chybná zadání a příkazy bez grafů nečekaly na jejich import
+from src.paths import data_path, is_multi_file_pattern
+from src.profiling import Instrumentation, cprofile_to
+from typing import TYPE_CHECKING, List, Optional
+import argparse
 import sys
 
-def main(file_name: str):
+if TYPE_CHECKING:
+    from src.filters import RowFilter
+    from src.schema import DtypePlan
+
+# Příkazy CLI: validate = jen načtení a validace, analyze = výpis výsledků analýzy,
+# plot = grafy bez výpisu výsledků, all = výpis výsledků i grafy (výchozí)
+COMMANDS = ("validate", "analyze", "plot", "all")
+
+# Granularity přepínače --period (odpovídají src.cube.GRANULARITIES, jejichž import by vyžadoval Pandas)
+PERIODS = ("day", "week", "month", "quarter", "year")
+
+
+def main(file_name: str, chunksize: Optional[int] = None, use_cache: bool = True, incremental: bool = False,
+         workers: Optional[int] = None, item_capacity: Optional[int] = None,
+         instrumentation: Optional[Instrumentation] = None, profile: Optional[str] = None,
+         cprofile: Optional[str] = None, on_error: str = "raise",
+         quarantine_file: Optional[str] = None, dtype_plan: Optional["DtypePlan"] = None,
+         row_filter: Optional["RowFilter"] = None, period: Optional[str] = None,
+         command: str = "all") -> Instrumentation:
     """
     Hlavní funkce aplikace Shop Analyzer.
 
-    :param file_name: Název CSV souboru s daty (soubor musí být uložen ve složce 'data').
+    :param file_name: Název CSV souboru s daty (soubor musí být uložen ve složce 'data'),
+                      případně glob vzor nebo adresář pro paralelní zpracování více souborů.
+    :param chunksize: Pokud je zadán, data se zpracují po blocích o daném počtu řádků (pro velké soubory).
+    :param use_cache: Použít sloupcovou cache validovaných dat (výchozí True).
+    :param incremental: Zpracovat jen nově připsané řádky a přičíst je k uloženým agregacím.
+    :param workers: Počet procesů pro zpracování více souborů (výchozí: počet jader CPU).
+    :param item_capacity: Kapacita sketche nejčastějších položek při zpracování jednoho souboru po blocích
+                          (None = přesné počty; bez chunksize, přírůstkově a pro více souborů se odmítne).
+    :param instrumentation: Sběr údajů o běhu s vlastními posluchači (výchozí: nový Instrumentation).
+    :param profile: Cesta k JSON reportu s časy fází, počty řádků a špičkovou pamětí (None = report se neukládá).
+    :param cprofile: Cesta k souboru s výstupem cProfile pro celý běh (None = bez profilování).
+    :param on_error: "raise" = chybná data ukončí běh, "quarantine" = chybné řádky se vyřadí a zpracování pokračuje.
+    :param quarantine_file: CSV soubor pro vyřazené řádky (jen pro jeden soubor, ne pro zpracování více souborů).
+    :param dtype_plan: Datové typy načtených dat (výchozí: kategorie a úzká celá čísla).
+    :param row_filter: Analyzovat jen řádky v časovém okně a vybraných kategoriích/položkách (filtr se
+                       uplatní už při načítání; nelze kombinovat s přírůstkovou analýzou).
+    :param period: Vypsat výdaje po kategoriích v zadané granularitě ("day", "week", "month", "quarter", "year")
+                   z agregační kostky (jen příkazy analyze a all; při zpracování po blocích, více souborů i přírůstkově se kostka
+                   slučuje z bloků).
+    :param command: Rozsah zpracování - "validate", "analyze", "plot" nebo "all" (viz COMMANDS).
+    :return: Instrumentation se záznamem běhu.
     """
+    if command not in COMMANDS:
+        raise ValueError(f"Neznámý příkaz '{command}'. Povolené příkazy: {', '.join(COMMANDS)}.")
+    if instrumentation is None:
+        instrumentation = Instrumentation(track_memory=profile is not None)
+    instrumentation.set_info("file", file_name)
+    instrumentation.set_info("command", command)
     print("\n--- Shop Analyzer ---\n")
     try:
-        # Načtení a validace dat
-        print("Načítání dat...")
-        loader = DataLoader(file_name)
-        data = loader.load_data()
-        validated_data = loader.validate_data(data)
-        print("Data úspěšně načtena a validována.\n")
-
-        # Analýza dat
-        print("Provádění analýzy dat...")
-        analyzer = Analyzer(validated_data)
-        monthly_expenses = analyzer.calculate_monthly_expenses()
-        category_analysis = analyzer.analyze_categories()
-        top_items = analyzer.get_top_items(n=5)
-        print("Analýza úspěšně dokončena.\n")
-
-        # Vizualizace dat
-        print("Generování grafů...")
-        visualizer = Visualizer()
-        visualizer.plot_monthly_expenses(monthly_expenses)
-        visualizer.plot_category_distribution(category_analysis)
-        visualizer.plot_top_items(top_items)
-        print("Grafy byly úspěšně vygenerovány a uloženy.\n")
-
+        with cprofile_to(cprofile):
+            _run(file_name, chunksize, use_cache, incremental, workers, item_capacity, instrumentation,
+                 on_error, quarantine_file, dtype_plan, row_filter, period, command)
     except FileNotFoundError:
+        instrumentation.set_info("error", "FileNotFoundError")
         print(f"Chyba: Soubor s názvem '{file_name}' nebyl nalezen.")
     except ValueError as e:
+        instrumentation.set_info("error", str(e))
         print(f"Chyba: {e}")
     except Exception as e:
+        instrumentation.set_info("error", repr(e))
         print(f"Neočekávaná chyba: {e}")
+    if profile:
+        print(f"Report běhu uložen do {instrumentation.write_report(profile)}")
+    return instrumentation
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Použití: python main.py <název_souboru.csv>")
+
+def _load(file_name: str, chunksize: Optional[int], use_cache: bool, incremental: bool, workers: Optional[int],
+          item_capacity: Optional[int], instrumentation: Instrumentation, on_error: str,
+          quarantine_file: Optional[str], dtype_plan: Optional["DtypePlan"], row_filter: Optional["RowFilter"],
+          track_cube: bool = False):
+    """
+    Načte a zvaliduje data zvoleným způsobem; vrátí dvojici (analyzer, loader nebo None).
+    S track_cube se při zpracování po blocích slučuje i agregační kostka (v paměti se spočítá až na vyžádání).
+    """
+    loader = None
+    if is_multi_file_pattern(file_name):
+        # Paralelní načtení, validace a agregace více souborů (map-reduce)
+        from src.parallel import analyze_files
+        instrumentation.set_info("mode", "parallel")
+        print("Paralelní načítání a analýza více souborů...")
+        analyzer = analyze_files(file_name, workers=workers, chunksize=chunksize or 100_000,
+                                 on_error=on_error, row_filter=row_filter, dtype_plan=dtype_plan,
+                                 track_cube=track_cube)
+    elif incremental:
+        # Načtení a validace pouze nově připsaných řádků, agregace se přičtou k uloženým
+        from src.data_loader import DataLoader
+        from src.incremental import IncrementalAnalyzer
+        instrumentation.set_info("mode", "incremental")
+        print("Přírůstkové načítání a analýza dat...")
+        loader = DataLoader(file_name, instrumentation=instrumentation, on_error=on_error,
+                            quarantine_file=quarantine_file, dtype_plan=dtype_plan)
+        analyzer = IncrementalAnalyzer(file_name, chunksize=chunksize or 100_000, loader=loader,
+                                       track_cube=track_cube).refresh()
+    elif chunksize:
+        # Načtení, validace a analýza dat po blocích
+        from src.analyzer import StreamingAnalyzer
+        from src.data_loader import DataLoader
+        instrumentation.set_info("mode", "chunked")
+        print("Načítání a analýza dat po blocích...")
+        loader = DataLoader(file_name, instrumentation=instrumentation, on_error=on_error,
+                            quarantine_file=quarantine_file, dtype_plan=dtype_plan)
+        analyzer = StreamingAnalyzer(loader.iter_chunks(chunksize, row_filter=row_filter),
+                                     item_capacity=item_capacity, track_cube=track_cube)
     else:
-        file_path = sys.argv[1]
-        main(file_path)
+        # Načtení a validace dat
+        from src.analyzer import Analyzer
+        from src.data_loader import DataLoader
+        instrumentation.set_info("mode", "in_memory")
+        print("Načítání dat...")
+        loader = DataLoader(file_name, instrumentation=instrumentation, on_error=on_error,
+                            quarantine_file=quarantine_file, dtype_plan=dtype_plan)
+        validated_data = loader.load_validated(use_cache=use_cache, row_filter=row_filter)
+        if validated_data.empty:
+            raise ValueError("Zadanému filtru neodpovídají žádná data.")
+        analyzer = Analyzer(validated_data)
+    print("Data úspěšně načtena a validována.\n")
+    return analyzer, loader
+
+
+def _run(file_name: str, chunksize: Optional[int], use_cache: bool, incremental: bool, workers: Optional[int],
+         item_capacity: Optional[int], instrumentation: Instrumentation, on_error: str,
+         quarantine_file: Optional[str], dtype_plan: Optional["DtypePlan"], row_filter: Optional["RowFilter"],
+         period: Optional[str], command: str):
+    """Provede načtení, analýzu a vizualizaci podle příkazu; fáze se zaznamenávají do instrumentation."""
+    multi_file = is_multi_file_pattern(file_name)
+    if item_capacity is not None and (not chunksize or incremental or multi_file):
+        raise ValueError("Přepínač --item-capacity lze použít jen při zpracování jednoho souboru po blocích "
+                         "(--chunksize bez --incremental).")
+    # Neexistující soubor se ohlásí ještě před importem Pandas
+    if not multi_file and not os.path.isfile(data_path(file_name)):
+        raise FileNotFoundError(data_path(file_name))
+    if row_filter is not None and row_filter.is_empty:
+        row_filter = None
+    if row_filter is not None:
+        if incremental:
+            raise ValueError("Filtr nelze kombinovat s přírůstkovou analýzou (uložené agregace obsahují všechna data).")
+        instrumentation.set_info("filter", row_filter.describe())
+        print(f"Filtr: {row_filter.describe()}")
+    with instrumentation.stage("load"):
+        analyzer, loader = _load(file_name, chunksize, use_cache, incremental, workers, item_capacity,
+                                 instrumentation, on_error, quarantine_file, dtype_plan, row_filter,
+                                 track_cube=period is not None and command in ("analyze", "all"))
+    if loader is not None:
+        instrumentation.set_info("validation", loader.validation_report.to_dict())
+    if command == "validate":
+        return
+
+    # Analýza dat
+    print("Provádění analýzy dat...")
+    with instrumentation.stage("analyze"):
+        results = analyzer.compute_all(n=5)
+    if command in ("analyze", "all"):
+        for title, key in (("Měsíční výdaje", "monthly_expenses"), ("Výdaje podle kategorií", "category_analysis"),
+                           ("Top 5 položek", "top_items")):
+            print(f"{title}:\n{results[key].to_string(index=False)}\n")
+        if period is not None:
+            with instrumentation.stage("cube"):
+                expenses = analyzer.cube.pivot(period)
+            print(f"Výdaje podle kategorií ({period}):\n{expenses.to_string()}\n")
+    print("Analýza úspěšně dokončena.\n")
+    if command == "analyze":
+        return
+
+    # Vizualizace dat
+    print("Generování grafů...")
+    with instrumentation.stage("plot"):
+        from src.visualizer import Visualizer
+        Visualizer().render_all(results)
+    print("Grafy byly úspěšně vygenerovány a uloženy.\n")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Sestaví parser příkazové řádky s podpříkazy validate, analyze, plot a all."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("file_name", help="Název CSV souboru ve složce 'data', glob vzor nebo adresář.")
+    common.add_argument("--chunksize", type=int, default=None,
+                        help="Zpracování po blocích o daném počtu řádků (pro velké soubory).")
+    common.add_argument("--no-cache", action="store_true",
+                        help="Nepoužívat cache validovaných dat (vždy načíst CSV).")
+    common.add_argument("--incremental", action="store_true",
+                        help="Zpracovat jen nově připsané řádky a přičíst je k uloženým agregacím.")
+    common.add_argument("--workers", type=int, default=None,
+                        help="Počet procesů pro paralelní zpracování více souborů (výchozí: počet jader CPU).")
+    common.add_argument("--item-capacity", type=int, default=None,
+                        help="Při zpracování po blocích (--chunksize) sledovat nejvýše daný počet položek "
+                             "(přibližné top položky).")
+    common.add_argument("--profile", metavar="REPORT.json", default=None,
+                        help="Uložit JSON report s časy fází, počty řádků a bajtů, kódováním a špičkovou pamětí.")
+    common.add_argument("--cprofile", metavar="FILE.prof", default=None,
+                        help="Uložit výstup cProfile pro celý běh (např. pro pstats nebo snakeviz).")
+    common.add_argument("--quarantine", nargs="?", const="", default=None, metavar="FILE.csv",
+                        help="Chybné řádky vyřadit a pokračovat; volitelně je uložit do zadaného CSV souboru.")
+    common.add_argument("--pyarrow-strings", action="store_true",
+                        help="Textové sloupce ukládat jako řetězce v Arrow (string[pyarrow]) místo kategorií.")
+    common.add_argument("--exact-money", action="store_true",
+                        help="Částky ukládat jako celé haléře (int64) a sčítat je přesně.")
+    common.add_argument("--from", dest="date_from", default=None, metavar="DATUM",
+                        help="Analyzovat jen nákupy od zadaného dne (YYYY-MM-DD nebo DD.MM.YYYY).")
+    common.add_argument("--to", dest="date_to", default=None, metavar="DATUM",
+                        help="Analyzovat jen nákupy do zadaného dne včetně.")
+    common.add_argument("--category", action="append", default=None,
+                        help="Analyzovat jen zadanou kategorii (lze zadat vícekrát).")
+    common.add_argument("--item", action="append", default=None,
+                        help="Analyzovat jen zadanou položku (lze zadat vícekrát).")
+    common.add_argument("--period", choices=PERIODS, default=None,
+                        help="Vypsat výdaje po kategoriích za dny, týdny, měsíce, čtvrtletí nebo roky "
+                             "(příkazy analyze a all).")
+
+    parser = argparse.ArgumentParser(description="Shop Analyzer - analýza nákupů z CSV souboru.")
+    commands = parser.add_subparsers(dest="command", metavar="PŘÍKAZ")
+    descriptions = {
+        "validate": "Načíst a zvalidovat data (bez analýzy a grafů).",
+        "analyze": "Načíst data a vypsat výsledky analýzy (bez grafů).",
+        "plot": "Načíst data, spočítat analýzu a vygenerovat grafy.",
+        "all": "Vypsat výsledky analýzy a vygenerovat grafy (výchozí příkaz).",
+    }
+    for command in COMMANDS:
+        commands.add_parser(command, parents=[common], help=descriptions[command], description=descriptions[command])
+    return parser
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Zpracuje argumenty příkazové řádky. Bez podpříkazu se použije "all"
+    (zachování původního volání *python main.py nakupy.csv*).
+    """
+    if argv and argv[0] not in COMMANDS and argv[0] not in ("-h", "--help"):
+        argv = ["all", *argv]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.error("Zadejte příkaz: " + ", ".join(COMMANDS) + ".")
+    args.row_filter = None
+    if args.date_from or args.date_to or args.category or args.item:
+        from src.filters import RowFilter
+        try:
+            args.row_filter = RowFilter(args.date_from, args.date_to, args.category, args.item)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    dtype_plan = None
+    if args.pyarrow_strings or args.exact_money:
+        from src.schema import DtypePlan
+        dtype_plan = DtypePlan(text_dtype="string[pyarrow]" if args.pyarrow_strings else "category",
+                               money="haler" if args.exact_money else "float")
+    main(args.file_name, args.chunksize, use_cache=not args.no_cache, incremental=args.incremental,
+         workers=args.workers, item_capacity=args.item_capacity, profile=args.profile, cprofile=args.cprofile,
+         on_error="raise" if args.quarantine is None else "quarantine", quarantine_file=args.quarantine or None,
+         dtype_plan=dtype_plan, row_filter=args.row_filter, period=args.period, command=args.command)
@@ -1,5 +1,282 @@
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
+from .cube import ExpenseCube
+from .filters import RowFilter
+from .money import bincount_sum, exact_sums, money_mode, round_sums, to_crowns
+
+# Metriky, které umí vypočítat Analyzer.compute_all (klíče výsledného slovníku)
+METRICS = ("monthly_expenses", "category_analysis", "top_items")
+
+
+def _plain(sums: pd.Series) -> pd.Series:
+    """
+    Převede součty na typy nezávislé na typech vstupních sloupců: klíče z kategorických sloupců
+    na běžné hodnoty a úzké celočíselné typy (např. int16) na int64.
+
+    :param sums: Součty indexované klíči skupin.
+    :return: Součty s jednotnými typy.
+    """
+    if isinstance(sums.index, pd.CategoricalIndex):
+        sums = sums.set_axis(sums.index.astype(sums.index.categories.dtype))
+    if pd.api.types.is_integer_dtype(sums.dtype) and sums.dtype != np.int64:
+        sums = sums.astype(np.int64)
+    return sums
+
+
+def _combine_sums(current: Optional[pd.Series], part: pd.Series) -> pd.Series:
+    """
+    Sečte dvě částečné agregace podle indexu (klíče skupiny).
+    Přesné součty (celé haléře, Fraction) se sčítají přesně, výsledek tedy nezávisí na rozdělení dat do bloků.
+
+    :param current: Dosavadní agregace nebo None, pokud zatím žádná neexistuje.
+    :param part: Nová částečná agregace.
+    :return: Sloučená agregace seřazená podle klíče.
+    """
+    if current is None:
+        return part
+    if part.dtype == object:
+        # Součty Fraction (přesné součty float64 částek, viz exact_sums) - sčítání objektů Pythonu
+        return current.add(part, fill_value=0).sort_index()
+    return pd.concat([current, part]).groupby(level=0).sum()
+
+
+def _encode(keys: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Zakóduje sloupec s klíči na celočíselné kódy.
+    Kategorické sloupce se použijí přímo (bez hashování), měsíce se počítají aritmeticky z datetime64.
+
+    :param keys: Sloupec s klíči (kategorický, textový nebo datetime64 pro měsíční periody).
+    :return: Dvojice (kódy, hodnoty klíčů odpovídající kódům).
+    """
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        return keys.cat.codes.to_numpy(), keys.cat.categories
+    if pd.api.types.is_datetime64_any_dtype(keys):
+        # Dny od 1970-01-01; měsíc se pro každý den v rozsahu dat spočítá jen jednou (tabulka)
+        days = keys.to_numpy().astype("datetime64[D]", copy=False).astype(np.int64)
+        if not len(days):
+            return days, pd.PeriodIndex([], freq="M")
+        first_day = days.min()
+        day_range = np.arange(first_day, days.max() + 1).astype("datetime64[D]")
+        # Počet měsíců od 1970-01 odpovídá ordinálu měsíční periody
+        month_table = day_range.astype("datetime64[M]").astype(np.int64)
+        first_month = month_table[0]
+        codes = month_table[days - first_day] - first_month
+        return codes, pd.PeriodIndex.from_ordinals(np.arange(first_month, month_table[-1] + 1), freq="M")
+    return pd.factorize(keys)
+
+
+def _grouped_sum(codes: np.ndarray, uniques: pd.Index, values: pd.Series, exact: bool = False) -> pd.Series:
+    """
+    Sečte hodnoty podle zakódovaných klíčů jedním průchodem (np.bincount).
+    Výsledek odpovídá groupby(keys)[values].sum() včetně pořadí klíčů a datového typu.
+
+    :param codes: Celočíselné kódy klíčů (z _encode).
+    :param uniques: Hodnoty klíčů odpovídající kódům.
+    :param values: Sloupec s hodnotami ke sečtení.
+    :param exact: Sčítat float64 hodnoty přesně (exact_sums) - výsledkem jsou součty Fraction, které na float
+                  převádí _money_display. Celočíselné hodnoty se sčítají přesně vždy.
+    :return: Series součtů indexovaná seřazenými klíči (pouze klíče, které se v datech vyskytují).
+    """
+    counts = np.bincount(codes, minlength=len(uniques))
+    name, values = values.name, values.to_numpy()
+    if exact and not np.issubdtype(values.dtype, np.integer):
+        sums = exact_sums(codes, values, len(uniques))
+    else:
+        # Stejně jako groupby se celočíselné typy (např. int16, haléře) sčítají přesně do int64
+        sums = bincount_sum(codes, values, len(uniques))
+    observed = counts > 0
+    return pd.Series(sums[observed], index=uniques[observed], name=name).sort_index()
+
+
+def _validate_metrics(metrics: Iterable[str]) -> tuple:
+    metrics = tuple(metrics)
+    unknown = [metric for metric in metrics if metric not in METRICS]
+    if unknown:
+        raise ValueError(f"Neznámé metriky: {', '.join(unknown)}. Povolené metriky: {', '.join(METRICS)}.")
+    return metrics
+
+
+def _money_display(sums: pd.Series, money: Optional[str]) -> pd.Series:
+    """
+    Převede součty částek na koruny (float64) pro výstup: součty v haléřích vydělí 100,
+    přesné součty Fraction zaokrouhlí na nejbližší float64 (stejně jako math.fsum).
+    """
+    if money == "haler":
+        return to_crowns(sums)
+    if sums.dtype == object:
+        return pd.Series(round_sums(sums), index=sums.index, name=sums.name)
+    return sums
+
+
+def _monthly_frame(monthly_sums: pd.Series, money: Optional[str] = None) -> pd.DataFrame:
+    """Převede měsíční součty (v reprezentaci money, viz money_mode) na výstupní DataFrame v korunách."""
+    return (_money_display(monthly_sums, money).rename_axis("Month")
+            .reset_index()
+            .rename(columns={"Celková cena": "Měsíční výdaje"}))
+
+
+def _top_items_frame(item_counts: pd.Series, n: int) -> pd.DataFrame:
+    """
+    Vybere n nejčastějších položek a převede je na výstupní DataFrame.
+    Používá částečný výběr (nlargest) místo řazení všech položek; při shodě počtů
+    rozhoduje pořadí položek v indexu.
+    """
+    return (_plain(item_counts).nlargest(n, keep="first")
+            .rename_axis("Položka")
+            .reset_index()
+            .rename(columns={"Množství": "Celkový počet"}))
+
+
+def sketch_capacity(epsilon: float) -> int:
+    """
+    Spočítá kapacitu sketche nejčastějších položek pro požadovanou maximální chybu.
+
+    :param epsilon: Maximální chyba odhadu počtu jako podíl celkového množství (např. 0.001).
+    :return: Počet sledovaných položek, pro který chyba nepřekročí epsilon * celkové množství.
+    """
+    if not 0 < epsilon < 1:
+        raise ValueError("epsilon musí být v intervalu (0, 1).")
+    return max(math.ceil(1 / epsilon) - 1, 1)
+
+
+def _category_frame(category_sums: pd.Series, money: Optional[str] = None) -> pd.DataFrame:
+    """Převede součty podle kategorií (v reprezentaci money) na výstupní DataFrame v korunách."""
+    return (_money_display(_plain(category_sums), money).rename_axis("Kategorie")
+            .reset_index()
+            .rename(columns={"Celková cena": "Celkové výdaje"}))
+
+
+class AggregateState:
+    """
+    Průběžné částečné agregace pro zpracování dat po blocích.
+
+    Drží měsíční součty výdajů, součty výdajů podle kategorií a součty množství
+    podle položek. Paměťová náročnost závisí pouze na počtu různých klíčů,
+    nikoli na počtu zpracovaných řádků.
+
+    Pokud je zadána kapacita item_capacity, počty položek se drží jako sketch nejčastějších
+    položek (mergeable Misra-Gries, ekvivalent Space-Saving): sleduje se nejvýše item_capacity
+    položek a každý počet je podhodnocen nejvýše o item_error <= celkové množství / (item_capacity + 1).
+    Paměť pak nezávisí ani na počtu různých položek.
+
+    Částky se sčítají přesně v reprezentaci bloků (money_mode) - u bloků v haléřích jako celá čísla,
+    u bloků v korunách jako přesné součty Fraction (exact_sums). Na koruny (float64) se převádějí až výsledné
+    tabulky, výsledky jsou tedy bitově shodné se zpracováním celého souboru v paměti bez ohledu na velikost bloků.
+
+    Pokud je zapnuto track_cube, průběžně se slučuje i denní agregační kostka (ExpenseCube.merge) pro přehledy
+    po obdobích. Její velikost závisí na počtu kombinací den × kategorie × položka (sketch položek ji neomezuje);
+    float součty v buňkách se sčítají po blocích, a proto se od kostky celých dat mohou lišit v poslední číslici.
+    """
+
+    def __init__(self, item_capacity: Optional[int] = None, track_cube: bool = False):
+        """
+        Inicializuje prázdný stav agregací.
+
+        :param item_capacity: Maximální počet sledovaných položek (None = přesné počty všech položek).
+        :param track_cube: Průběžně slučovat i denní agregační kostku (atribut cube).
+        """
+        if item_capacity is not None and item_capacity <= 0:
+            raise ValueError("Kapacita sketche musí být kladné číslo.")
+        self.monthly_sums: Optional[pd.Series] = None
+        self.category_sums: Optional[pd.Series] = None
+        self.item_counts: Optional[pd.Series] = None
+        self.rows = 0
+        self.item_capacity = item_capacity
+        # Maximální podhodnocení počtu libovolné položky (0 = přesné počty)
+        self.item_error = 0
+        # Reprezentace sečtených částek ("float" nebo "haler", None = zatím žádná data)
+        self.money: Optional[str] = None
+        self.track_cube = track_cube
+        self.cube: Optional[ExpenseCube] = None
+
+    def _check_money(self, money: str):
+        """Ověří, že se nesčítají částky v korunách s částkami v haléřích, a zapamatuje si reprezentaci."""
+        if self.money is not None and self.money != money:
+            raise ValueError("Nelze sčítat částky v různých reprezentacích (koruny a haléře).")
+        self.money = money
+
+    def _reduce_items(self):
+        """
+        Omezí počet sledovaných položek na item_capacity (krok Misra-Gries):
+        od všech počtů se odečte (item_capacity + 1). největší počet a nekladné položky se zahodí.
+        """
+        if self.item_capacity is None or len(self.item_counts) <= self.item_capacity:
+            return
+        threshold = self.item_counts.nlargest(self.item_capacity + 1, keep="first").iloc[-1]
+        kept = self.item_counts[self.item_counts > threshold]
+        self.item_counts = kept - threshold
+        self.item_error += threshold
+
+    def update(self, chunk: pd.DataFrame) -> "AggregateState":
+        """
+        Započítá jeden validovaný blok dat do průběžných agregací.
+
+        :param chunk: Validovaný DataFrame (blok dat).
+        :return: Tento stav (pro řetězení volání).
+        """
+        self._check_money(money_mode(chunk))
+        prices = chunk["Celková cena"]
+        self.monthly_sums = _combine_sums(
+            self.monthly_sums, _grouped_sum(*_encode(chunk["Datum"]), prices, exact=True))
+        self.category_sums = _combine_sums(
+            self.category_sums, _plain(_grouped_sum(*_encode(chunk["Kategorie"]), prices, exact=True)))
+        self.item_counts = _combine_sums(
+            self.item_counts, _plain(chunk.groupby("Položka", observed=True)["Množství"].sum()))
+        self._reduce_items()
+        if self.track_cube and len(chunk):
+            part = ExpenseCube.from_frame(chunk)
+            self.cube = part if self.cube is None else self.cube.merge(part)
+        self.rows += len(chunk)
+        return self
+
+    def merge(self, other: "AggregateState") -> "AggregateState":
+        """
+        Přičte k tomuto stavu agregace jiného stavu.
+
+        :param other: Stav, jehož agregace se mají přičíst.
+        :return: Tento stav (pro řetězení volání).
+        """
+        if not other.is_empty():
+            self._check_money(other.money)
+        for attr in ("monthly_sums", "category_sums", "item_counts"):
+            part = getattr(other, attr)
+            if part is not None:
+                setattr(self, attr, _combine_sums(getattr(self, attr), part))
+        self.item_error += other.item_error
+        if other.item_capacity is not None:
+            self.item_capacity = min(self.item_capacity or other.item_capacity, other.item_capacity)
+        if self.item_counts is not None:
+            self._reduce_items()
+        if self.track_cube:
+            if not other.track_cube and not other.is_empty():
+                raise ValueError("Slučovaný stav nesleduje agregační kostku (track_cube).")
+            if other.cube is not None:
+                self.cube = other.cube if self.cube is None else self.cube.merge(other.cube)
+        self.rows += other.rows
+        return self
+
+    def item_count_bounds(self, n: int = 5) -> pd.DataFrame:
+        """
+        Vrátí n nejčastějších položek s dolním a horním odhadem jejich celkového počtu.
+        Při přesných počtech (bez sketche) jsou oba odhady shodné.
+
+        :param n: Počet položek (výchozí 5).
+        :return: DataFrame se sloupci "Položka", "Celkový počet" (dolní odhad) a "Horní odhad".
+        """
+        top_items = _top_items_frame(self.item_counts, n)
+        top_items["Horní odhad"] = top_items["Celkový počet"] + self.item_error
+        return top_items
+
+    def is_empty(self) -> bool:
+        """
+        :return: True, pokud do stavu zatím nebyla započítána žádná data.
+        """
+        return self.monthly_sums is None
+
 
 class Analyzer:
     """
@@ -7,13 +284,40 @@ class Analyzer:
     Poskytuje metody pro výpočet statistických a analytických hodnot.
     """
 
-    def __init__(self, data: pd.DataFrame):
+    def __init__(self, data: pd.DataFrame, row_filter: Optional[RowFilter] = None):
         """
         Inicializuje Analyzer s validovaným DataFrame.
 
         :param data: Validovaný DataFrame obsahující data k analýze.
+        :param row_filter: Filtr řádků (časové okno, kategorie, položky); analyzují se jen vyhovující řádky.
+        """
+        self.data = row_filter.apply(data) if row_filter is not None else data
+        # Reprezentace peněžních sloupců ("haler" = přesné součty v haléřích, viz DtypePlan)
+        self.money = money_mode(self.data)
+        self._codes: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+        self._cube: Optional[ExpenseCube] = None
+
+    def _encoded(self, column: str) -> Tuple[np.ndarray, pd.Index]:
+        """
+        Vrátí (a uloží pro další výpočty) celočíselné kódování sloupce.
+
+        :param column: Název sloupce.
+        :return: Dvojice (kódy, hodnoty klíčů).
         """
-        self.data = data
+        if column not in self._codes:
+            self._codes[column] = _encode(self.data[column])
+        return self._codes[column]
+
+    def _money_sums(self, column: str) -> pd.Series:
+        """
+        Přesné součty celkových cen podle sloupce (měsíce z "Datum", "Kategorie").
+        Float64 částky se sčítají bez zaokrouhlovacích chyb a výsledek se zaokrouhlí až při výstupu,
+        takže je shodný s math.fsum a se zpracováním po blocích (StreamingAnalyzer).
+
+        :param column: Sloupec se skupinami.
+        :return: Součty (celé haléře nebo Fraction) indexované klíči skupin.
+        """
+        return _grouped_sum(*self._encoded(column), self.data["Celková cena"], exact=True)
 
     def calculate_monthly_expenses(self) -> pd.DataFrame:
         """
@@ -21,14 +325,30 @@ class Analyzer:
 
         :return: DataFrame s měsíčními výdaji (měsíc a celkové výdaje).
         """
-        self.data["Month"] = self.data["Datum"].dt.to_period("M")
-        monthly_expenses = (self.data.groupby("Month")
-                            ["Celková cena"].sum()
-                            .reset_index()
-                            .rename(columns={"Celková cena": "Měsíční výdaje"}))
+        monthly_expenses = _monthly_frame(self._money_sums("Datum"), self.money)
         print("Měsíční výdaje byly vypočítány.")
         return monthly_expenses
 
+    @property
+    def cube(self) -> ExpenseCube:
+        """Denní agregační kostka (den × kategorie × položka), spočítaná při prvním použití."""
+        if self._cube is None:
+            self._cube = ExpenseCube.from_frame(self.data)
+        return self._cube
+
+    def calculate_expenses(self, granularity: str = "month", by_category: bool = False) -> pd.DataFrame:
+        """
+        Spočítá výdaje po dnech, týdnech, měsících, čtvrtletích nebo letech, volitelně po kategoriích.
+        Výsledek se odvodí z agregační kostky, řádky se tedy projdou jen jednou pro všechny granularity.
+
+        :param granularity: "day", "week", "month", "quarter" nebo "year" (výchozí "month").
+        :param by_category: Rozdělit výdaje podle kategorií.
+        :return: DataFrame se sloupci "Období", případně "Kategorie", "Výdaje", "Množství" a "Počet nákupů".
+        """
+        expenses = self.cube.totals(granularity, by=("Kategorie",) if by_category else ())
+        print(f"Výdaje ({granularity}) byly vypočítány.")
+        return expenses
+
     def get_top_items(self, n: int = 5) -> pd.DataFrame:
         """
         Získá nejčastěji nakupované položky.
@@ -36,12 +356,7 @@ class Analyzer:
         :param n: Počet nejčastějších položek (výchozí 5).
         :return: DataFrame s názvy položek a počtem jejich výskytů.
         """
-        top_items = (self.data.groupby("Položka")
-                     ["Množství"].sum()
-                     .sort_values(ascending=False)
-                     .head(n)
-                     .reset_index()
-                     .rename(columns={"Množství": "Celkový počet"}))
+        top_items = _top_items_frame(self.data.groupby("Položka", observed=True)["Množství"].sum(), n)
         print(f"Top {n} položek bylo identifikováno.")
         return top_items
 
@@ -51,36 +366,161 @@ class Analyzer:
 
         :return: DataFrame s kategoriemi a jejich celkovými výdaji.
         """
-        category_analysis = (self.data.groupby("Kategorie")
-                              ["Celková cena"].sum()
-                              .reset_index()
-                              .rename(columns={"Celková cena": "Celkové výdaje"}))
+        category_analysis = _category_frame(self._money_sums("Kategorie"), self.money)
         print("Výdaje podle kategorií byly analyzovány.")
         return category_analysis
 
-# Příklad použití
-if __name__ == "__main__":
-    from data_loader import DataLoader  # Import DataLoader z předchozího kódu
+    def compute_all(self, n: int = 5, metrics: Iterable[str] = METRICS) -> Dict[str, pd.DataFrame]:
+        """
+        Spočítá všechny požadované metriky najednou bez úpravy vstupních dat.
+        Sloupce se jednou zakódují na celá čísla (kategorické sloupce bez hashování) a součty
+        se počítají jedním průchodem (np.bincount) místo samostatného groupby pro každou metriku.
+        Součty částek jsou přesné (správně zaokrouhlený součet, viz exact_sums), a proto bitově shodné
+        s jednotlivými metodami i se StreamingAnalyzer; groupby (kompenzované sčítání) se od nich
+        může lišit nejvýše v poslední číslici.
+
+        :param n: Počet nejčastějších položek pro metriku "top_items" (výchozí 5).
+        :param metrics: Metriky k výpočtu (podmnožina METRICS, výchozí všechny).
+        :return: Slovník {název metriky: DataFrame} se stejnými výsledky jako jednotlivé metody.
+        """
+        metrics = _validate_metrics(metrics)
+        results = {}
+        if "monthly_expenses" in metrics:
+            results["monthly_expenses"] = _monthly_frame(self._money_sums("Datum"), self.money)
+        if "category_analysis" in metrics:
+            results["category_analysis"] = _category_frame(self._money_sums("Kategorie"), self.money)
+        if "top_items" in metrics:
+            results["top_items"] = _top_items_frame(
+                _grouped_sum(*self._encoded("Položka"), self.data["Množství"]), n)
+        print(f"Analýza byla provedena ({', '.join(metrics)}).")
+        return results
+
+
+class StreamingAnalyzer:
+    """
+    Analyzer pro data zpracovávaná po blocích (streaming).
+    Průběžně agreguje jednotlivé bloky a poskytuje stejné metody a výsledky jako Analyzer,
+    aniž by bylo nutné držet v paměti celý soubor.
+    """
+
+    def __init__(self, chunks: Optional[Iterable[pd.DataFrame]] = None, item_capacity: Optional[int] = None,
+                 track_cube: bool = False):
+        """
+        Inicializuje StreamingAnalyzer a případně rovnou zpracuje zadané bloky.
+
+        :param chunks: Iterátor validovaných bloků dat (např. z DataLoader.iter_chunks).
+        :param item_capacity: Kapacita sketche nejčastějších položek (None = přesné počty, viz AggregateState).
+        :param track_cube: Slučovat z bloků i agregační kostku pro přehledy po obdobích (vlastnost cube).
+        """
+        self.state = AggregateState(item_capacity=item_capacity, track_cube=track_cube)
+        if chunks is not None:
+            self.consume(chunks)
+
+    @classmethod
+    def from_state(cls, state: AggregateState) -> "StreamingAnalyzer":
+        """
+        Vytvoří StreamingAnalyzer nad již spočítanými agregacemi (např. načtenými z disku).
+
+        :param state: Stav průběžných agregací.
+        :return: StreamingAnalyzer nad zadaným stavem.
+        """
+        analyzer = cls()
+        analyzer.state = state
+        return analyzer
+
+    def consume(self, chunks: Iterable[pd.DataFrame]) -> "StreamingAnalyzer":
+        """
+        Započítá všechny bloky z iterátoru do průběžných agregací.
+
+        :param chunks: Iterátor validovaných bloků dat.
+        :return: Tento analyzer (pro řetězení volání).
+        """
+        for chunk in chunks:
+            self.state.update(chunk)
+        return self
 
-    # Načtení a validace dat
-    file_path = "nakupy.csv"  # Konkrétní název souboru (uložen ve složce data)
-    loader = DataLoader(file_path)
+    def _require_data(self):
+        if self.state.is_empty():
+            raise ValueError("Nebyla zpracována žádná data.")
+
+    @property
+    def cube(self) -> ExpenseCube:
+        """
+        Denní agregační kostka sloučená ze zpracovaných bloků.
+
+        :raises ValueError: Pokud nebyla zpracována žádná data nebo se kostka nesledovala (track_cube=False).
+        """
+        self._require_data()
+        if self.state.cube is None:
+            raise ValueError("Agregační kostka se při zpracování po blocích nesledovala (track_cube=True).")
+        return self.state.cube
+
+    def calculate_expenses(self, granularity: str = "month", by_category: bool = False) -> pd.DataFrame:
+        """
+        Vrátí výdaje po obdobích ze sloučené agregační kostky (stejné rozhraní jako Analyzer.calculate_expenses).
+
+        :param granularity: "day", "week", "month", "quarter" nebo "year" (výchozí "month").
+        :param by_category: Rozdělit výdaje podle kategorií.
+        :return: DataFrame se sloupci "Období", případně "Kategorie", "Výdaje", "Množství" a "Počet nákupů".
+        """
+        expenses = self.cube.totals(granularity, by=("Kategorie",) if by_category else ())
+        print(f"Výdaje ({granularity}) byly vypočítány.")
+        return expenses
+
+    def calculate_monthly_expenses(self) -> pd.DataFrame:
+        """
+        Vrátí celkové měsíční výdaje ze zpracovaných bloků.
+
+        :return: DataFrame s měsíčními výdaji (měsíc a celkové výdaje).
+        """
+        self._require_data()
+        monthly_expenses = _monthly_frame(self.state.monthly_sums, self.state.money)
+        print("Měsíční výdaje byly vypočítány.")
+        return monthly_expenses
 
-    try:
-        data = loader.load_data()
-        validated_data = loader.validate_data(data)
+    def get_top_items(self, n: int = 5) -> pd.DataFrame:
+        """
+        Vrátí nejčastěji nakupované položky ze zpracovaných bloků.
 
-        # Analýza dat
-        analyzer = Analyzer(validated_data)
+        :param n: Počet nejčastějších položek (výchozí 5).
+        :return: DataFrame s názvy položek a počtem jejich výskytů.
+        """
+        self._require_data()
+        top_items = _top_items_frame(self.state.item_counts, n)
+        if self.state.item_error:
+            print(f"Počty položek jsou přibližné (podhodnocení nejvýše o {self.state.item_error}).")
+        print(f"Top {n} položek bylo identifikováno.")
+        return top_items
 
-        monthly_expenses = analyzer.calculate_monthly_expenses()
-        print(monthly_expenses)
+    def analyze_categories(self) -> pd.DataFrame:
+        """
+        Vrátí rozložení výdajů podle kategorií ze zpracovaných bloků.
 
-        top_items = analyzer.get_top_items(n=5)
-        print(top_items)
+        :return: DataFrame s kategoriemi a jejich celkovými výdaji.
+        """
+        self._require_data()
+        category_analysis = _category_frame(self.state.category_sums, self.state.money)
+        print("Výdaje podle kategorií byly analyzovány.")
+        return category_analysis
 
-        category_analysis = analyzer.analyze_categories()
-        print(category_analysis)
+    def compute_all(self, n: int = 5, metrics: Iterable[str] = METRICS) -> Dict[str, pd.DataFrame]:
+        """
+        Vrátí všechny požadované metriky ze zpracovaných bloků najednou (stejné rozhraní jako Analyzer).
 
-    except Exception as e:
-        print(f"Chyba: {e}")
+        :param n: Počet nejčastějších položek pro metriku "top_items" (výchozí 5).
+        :param metrics: Metriky k výpočtu (podmnožina METRICS, výchozí všechny).
+        :return: Slovník {název metriky: DataFrame}.
+        """
+        metrics = _validate_metrics(metrics)
+        self._require_data()
+        results = {}
+        if "monthly_expenses" in metrics:
+            results["monthly_expenses"] = _monthly_frame(self.state.monthly_sums, self.state.money)
+        if "category_analysis" in metrics:
+            results["category_analysis"] = _category_frame(self.state.category_sums, self.state.money)
+        if "top_items" in metrics:
+            results["top_items"] = _top_items_frame(self.state.item_counts, n)
+            if self.state.item_error:
+                print(f"Počty položek jsou přibližné (podhodnocení nejvýše o {self.state.item_error}).")
+        print(f"Analýza byla provedena ({', '.join(metrics)}).")
+        return results
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import pickle
+from typing import List, Optional
+
+import pandas as pd
+
+from .filters import RowFilter
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Verze formátu cache - při změně validace nebo datových typů je nutné ji zvýšit,
+# aby se nepoužila data uložená starší verzí aplikace.
+CACHE_VERSION = 5
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "output", "cache", "data")
+
+# Textové sloupce s malým počtem různých hodnot, ukládané jako kategorie
+CATEGORICAL_COLUMNS = ["Položka", "Kategorie"]
+
+# Počet řádků v jednom bloku (record batch) souboru cache, pro který se ukládají statistiky
+BLOCK_ROWS = 100_000
+
+
+def block_stats(df: pd.DataFrame, block_rows: int) -> List[dict]:
+    """
+    Spočítá statistiky bloků po block_rows řádcích: rozsah dat a přítomné kategorie.
+
+    :param df: DataFrame v pořadí, v jakém se ukládá.
+    :param block_rows: Počet řádků v bloku.
+    :return: Seznam {"rows", "min_date", "max_date", "categories"} pro každý blok.
+    """
+    blocks = []
+    for offset in range(0, len(df), block_rows):
+        block = df.iloc[offset:offset + block_rows]
+        dates = block["Datum"]
+        blocks.append({
+            "rows": len(block),
+            "min_date": dates.min().isoformat() if dates.notna().any() else None,
+            "max_date": dates.max().isoformat() if dates.notna().any() else None,
+            "categories": sorted(str(value) for value in block["Kategorie"].dropna().unique()),
+        })
+    return blocks
+
+
+def file_digest(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Spočítá SHA-1 otisk obsahu souboru (po blocích, s omezenou pamětí).
+
+    :param file_path: Cesta k souboru.
+    :param block_size: Velikost čteného bloku v bajtech.
+    :return: Hexadecimální otisk obsahu.
+    """
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def to_cache_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Převede validovaný DataFrame na typy vhodné pro sloupcové uložení
+    (textové sloupce s opakujícími se hodnotami jako kategorie) a seřadí ho podle data,
+    aby bloky cache pokrývaly krátká časová období.
+
+    :param df: Validovaný DataFrame.
+    :return: DataFrame s kategorickými sloupci, seřazený podle data, s výchozím indexem.
+    """
+    if "Datum" in df.columns and not df["Datum"].is_monotonic_increasing:
+        df = df.sort_values("Datum", kind="stable")
+    df = df.reset_index(drop=True)
+    for col in CATEGORICAL_COLUMNS:
+        # Sloupce již převedené podle DtypePlan (kategorie nebo string[pyarrow]) se ponechají
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype("category")
+    return df
+
+
+class DataCache:
+    """
+    Třída pro ukládání validovaných dat do sloupcového formátu na disk.
+
+    Data se ukládají ve formátu Feather (Arrow IPC), který zachovává datové typy
+    (datetime64, kategorie) a při čtení využívá mapování souboru do paměti.
+    Data jsou seřazena podle data a rozdělena do bloků; pro každý blok se v metadatech ukládá
+    rozsah dat a přítomné kategorie, takže dotaz s filtrem (RowFilter) načte jen bloky,
+    které mohou obsahovat vyhovující řádky.
+    Pokud není k dispozici knihovna pyarrow, bloky se uloží za sebou jako samostatné pickle záznamy
+    a v metadatech se uloží jejich pozice v souboru; filtr pak také načte jen potřebné bloky.
+
+    Záznam v cache je platný, dokud se nezmění zdrojový soubor - podle velikosti a času
+    poslední změny, případně podle otisku obsahu (key_mode="hash").
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, key_mode: str = "mtime", block_rows: int = BLOCK_ROWS):
+        """
+        Inicializuje cache validovaných dat.
+
+        :param cache_dir: Adresář pro ukládání dat (výchozí: "output/cache/data").
+        :param key_mode: "mtime" (velikost a čas změny souboru) nebo "hash" (otisk obsahu souboru).
+        :param block_rows: Počet řádků v jednom bloku se statistikami (výchozí 100 000).
+        """
+        if block_rows <= 0:
+            raise ValueError("Velikost bloku musí být kladné číslo.")
+        if key_mode not in ("mtime", "hash"):
+            raise ValueError("key_mode musí být 'mtime' nebo 'hash'.")
+        self.cache_dir = cache_dir
+        self.key_mode = key_mode
+        self.block_rows = block_rows
+        self.format = "feather" if HAS_PYARROW else "pickle"
+        # Počet načtených a všech bloků při posledním volání load (pro výpis a testy)
+        self.blocks_read = 0
+        self.blocks_total = 0
+
+    def _paths(self, file_path: str) -> tuple:
+        name = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+        base = os.path.join(self.cache_dir, name)
+        return f"{base}.{self.format}", f"{base}.json"
+
+    def _source_key(self, file_path: str) -> dict:
+        stat = os.stat(file_path)
+        key = {"version": CACHE_VERSION, "format": self.format, "size": stat.st_size}
+        if self.key_mode == "hash":
+            key["sha1"] = file_digest(file_path)
+        else:
+            key["mtime_ns"] = stat.st_mtime_ns
+        return key
+
+    def load(self, file_path: str, row_filter: Optional[RowFilter] = None) -> Optional[pd.DataFrame]:
+        """
+        Načte validovaná data zdrojového souboru z cache.
+
+        :param file_path: Cesta ke zdrojovému CSV souboru.
+        :param row_filter: Filtr řádků; bloky, které mu nemohou vyhovět, se vůbec nenačtou.
+        :return: DataFrame z cache (vyfiltrovaný, je-li zadán filtr), nebo None, pokud záznam
+                 neexistuje nebo je zastaralý.
+        """
+        data_path, meta_path = self._paths(file_path)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        key = self._source_key(file_path)
+        if {name: meta.get(name) for name in key} != key:
+            return None
+        blocks = meta.get("blocks", [])
+        self.blocks_total = len(blocks)
+        if self.format == "feather":
+            with pa.memory_map(data_path) as source:
+                reader = pa.ipc.open_file(source)
+                if reader.num_record_batches != len(blocks):
+                    return None
+                selected = [index for index, block in enumerate(blocks)
+                            if row_filter is None or row_filter.may_match(block)]
+                self.blocks_read = len(selected)
+                table = pa.Table.from_batches([reader.get_batch(index) for index in selected], schema=reader.schema)
+                df = table.to_pandas()
+        else:
+            if any("offset" not in block for block in blocks):
+                return None
+            selected = [block for block in blocks if row_filter is None or row_filter.may_match(block)]
+            self.blocks_read = len(selected)
+            with open(data_path, "rb") as f:
+                # Na začátku souboru je prázdný DataFrame se schématem (pro případ, že se nevybere žádný blok)
+                frames = [pickle.load(f)]
+                for block in selected:
+                    f.seek(block["offset"])
+                    frames.append(pickle.load(f))
+            df = pd.concat(frames, ignore_index=True) if selected else frames[0]
+        return row_filter.apply(df) if row_filter is not None else df
+
+    def store(self, file_path: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Uloží validovaná data zdrojového souboru do cache.
+
+        :param file_path: Cesta ke zdrojovému CSV souboru.
+        :param df: Validovaný DataFrame.
+        :return: Uložený DataFrame (s kategorickými sloupci).
+        """
+        df = to_cache_dtypes(df)
+        data_path, meta_path = self._paths(file_path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if self.format == "feather":
+            # Soubor Feather (Arrow IPC) zapsaný po blocích - jeden record batch na blok statistik
+            table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+            with pa.OSFile(data_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                for batch in table.to_batches(max_chunksize=self.block_rows):
+                    writer.write_batch(batch)
+            offsets = None
+        else:
+            # Prázdné schéma a za ním bloky jako samostatné pickle záznamy; pozice bloků se uloží do metadat
+            offsets = []
+            with open(data_path, "wb") as f:
+                pickle.dump(df.iloc[:0], f, protocol=pickle.HIGHEST_PROTOCOL)
+                for offset in range(0, len(df), self.block_rows):
+                    offsets.append(f.tell())
+                    pickle.dump(df.iloc[offset:offset + self.block_rows], f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Metadata se zapisují až po datech, aby nedokončený zápis nebyl považován za platný záznam
+        meta = self._source_key(file_path)
+        meta["blocks"] = block_stats(df, self.block_rows)
+        if offsets is not None:
+            for block, offset in zip(meta["blocks"], offsets):
+                block["offset"] = offset
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return df
+
+    def clear(self, file_path: str):
+        """
+        Odstraní záznam zdrojového souboru z cache.
+
+        :param file_path: Cesta ke zdrojovému CSV souboru.
+        """
+        for path in self._paths(file_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,199 @@
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .money import bincount_sum, money_mode, to_crowns
+
+# Granularity časových period a odpovídající frekvence Pandas (týden začíná pondělím)
+GRANULARITIES = {"day": "D", "week": "W-SUN", "month": "M", "quarter": "Q-DEC", "year": "Y-DEC"}
+
+# Granularity, které lze z dané granularity odvodit bez návratu k jednotlivým řádkům
+# (týden není podmnožinou měsíce, proto se z týdnů dál neagreguje)
+ROLLUPS = {
+    "day": ("day", "week", "month", "quarter", "year"),
+    "week": ("week",),
+    "month": ("month", "quarter", "year"),
+    "quarter": ("quarter", "year"),
+    "year": ("year",),
+}
+
+# Dimenze kostky kromě časové periody
+DIMENSIONS = ("Kategorie", "Položka")
+
+# Uložené míry: součet výdajů, součet množství a počet nákupů (řádků)
+MEASURES = ("Výdaje", "Množství", "Počet nákupů")
+
+
+def _codes(keys: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Zakóduje textový nebo kategorický sloupec na celočíselné kódy (kategorie bez hashování)."""
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        return keys.cat.codes.to_numpy().astype(np.int64), keys.cat.categories
+    codes, uniques = pd.factorize(keys)
+    return codes.astype(np.int64), pd.Index(uniques)
+
+
+def _check_granularity(granularity: str):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Neznámá granularita '{granularity}'. Povolené hodnoty: {', '.join(GRANULARITIES)}.")
+
+
+class ExpenseCube:
+    """
+    Předpočítaná agregační kostka výdajů: časová perioda × kategorie × položka
+    se součtem výdajů, součtem množství a počtem nákupů v každé buňce.
+
+    Kostka se z řádků spočítá jednou (výchozí granularita je den) a hrubší granularity
+    (týden, měsíc, čtvrtletí, rok) i souhrny podle kategorií se odvozují z jejích buněk,
+    jejichž počet závisí jen na počtu různých kombinací dne, kategorie a položky, ne na počtu řádků.
+    Odvozené kostky se ukládají, takže opakovaný dotaz na stejnou granularitu je zdarma.
+    U dat s částkami v haléřích (money_mode "haler") drží buňky výdaje jako přesná celá čísla
+    a na koruny se převádějí až výsledky totals a pivot.
+    """
+
+    def __init__(self, cells: pd.DataFrame, granularity: str = "day", money: str = "float"):
+        """
+        Inicializuje kostku nad již agregovanými buňkami.
+
+        :param cells: DataFrame se sloupci "Období" (Period), "Kategorie", "Položka" a mírami MEASURES.
+        :param granularity: Granularita sloupce "Období" (klíč GRANULARITIES).
+        :param money: Reprezentace výdajů v buňkách - "float" (koruny) nebo "haler" (int64 haléře).
+        """
+        _check_granularity(granularity)
+        self.cells = cells
+        self.granularity = granularity
+        self.money = money
+        self._rollups: Dict[str, "ExpenseCube"] = {granularity: self}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ExpenseCube":
+        """
+        Spočítá denní kostku z validovaných řádků jedním průchodem.
+        Den, kategorie a položka se zakódují na jeden celočíselný klíč, ten se faktorizuje
+        a míry se sečtou přes np.bincount.
+
+        :param df: Validovaný DataFrame (sloupec 'Datum' jako datetime64).
+        :return: Kostka s denní granularitou.
+        """
+        money = money_mode(df)
+        days = df["Datum"].to_numpy().astype("datetime64[D]", copy=False).astype(np.int64)
+        category_codes, categories = _codes(df["Kategorie"])
+        item_codes, items = _codes(df["Položka"])
+        first_day = days.min() if len(days) else 0
+        n_categories, n_items = max(len(categories), 1), max(len(items), 1)
+        keys = ((days - first_day) * n_categories + category_codes) * n_items + item_codes
+        cell_codes, cell_keys = pd.factorize(keys, sort=True)
+
+        n_cells = len(cell_keys)
+        cell_keys = np.asarray(cell_keys, dtype=np.int64)
+        cells = pd.DataFrame({
+            "Období": pd.PeriodIndex.from_ordinals(cell_keys // (n_categories * n_items) + first_day, freq="D"),
+            "Kategorie": pd.Categorical.from_codes(cell_keys // n_items % n_categories, categories=categories),
+            "Položka": pd.Categorical.from_codes(cell_keys % n_items, categories=items),
+            "Výdaje": bincount_sum(cell_codes, df["Celková cena"].to_numpy(
+                dtype=np.int64 if money == "haler" else float), n_cells),
+            "Množství": np.bincount(cell_codes, weights=df["Množství"].to_numpy(dtype=float),
+                                    minlength=n_cells).astype(np.int64),
+            "Počet nákupů": np.bincount(cell_codes, minlength=n_cells).astype(np.int64),
+        })
+        return cls(cells, granularity="day", money=money)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]) -> "ExpenseCube":
+        """
+        Spočítá denní kostku z bloků dat (např. z DataLoader.iter_chunks) bez držení všech řádků v paměti.
+
+        :param chunks: Iterátor validovaných bloků.
+        :return: Kostka s denní granularitou.
+        :raises ValueError: Pokud iterátor neobsahuje žádná data.
+        """
+        cube = None
+        for chunk in chunks:
+            part = cls.from_frame(chunk)
+            cube = part if cube is None else cube.merge(part)
+        if cube is None:
+            raise ValueError("Nebyla zpracována žádná data.")
+        return cube
+
+    def merge(self, other: "ExpenseCube") -> "ExpenseCube":
+        """
+        Sečte buňky dvou kostek stejné granularity (např. kostek jednotlivých bloků nebo souborů).
+
+        :param other: Kostka k přičtení.
+        :return: Nová sloučená kostka.
+        """
+        if other.granularity != self.granularity:
+            raise ValueError("Slučovat lze jen kostky se stejnou granularitou.")
+        if other.money != self.money:
+            raise ValueError("Nelze sčítat částky v různých reprezentacích (koruny a haléře).")
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        for col in DIMENSIONS:
+            # Kategorie s různými číselníky se při concat změní na text - sjednotí se zpět
+            if not isinstance(cells[col].dtype, pd.CategoricalDtype):
+                cells[col] = cells[col].astype("category")
+        return ExpenseCube(self._group(cells, ["Období", *DIMENSIONS]), granularity=self.granularity,
+                           money=self.money)
+
+    @staticmethod
+    def _group(cells: pd.DataFrame, keys: Sequence[str]) -> pd.DataFrame:
+        """Sečte míry buněk podle zadaných klíčů (pouze obsazené kombinace, seřazeno podle klíčů)."""
+        return cells.groupby(list(keys), observed=True, sort=True)[list(MEASURES)].sum().reset_index()
+
+    def rollup(self, granularity: str) -> "ExpenseCube":
+        """
+        Vrátí kostku s hrubší granularitou odvozenou z buněk této kostky (výsledek se uloží).
+
+        :param granularity: Cílová granularita ("day", "week", "month", "quarter" nebo "year").
+        :return: Kostka s cílovou granularitou.
+        :raises ValueError: Pokud cílovou granularitu nelze z této kostky odvodit (např. měsíce z týdnů).
+        """
+        _check_granularity(granularity)
+        if granularity not in self._rollups:
+            if granularity not in ROLLUPS[self.granularity]:
+                raise ValueError(f"Granularitu '{granularity}' nelze odvodit z granularity '{self.granularity}'.")
+            cells = self.cells.assign(Období=self.cells["Období"].dt.asfreq(GRANULARITIES[granularity]))
+            self._rollups[granularity] = ExpenseCube(self._group(cells, ["Období", *DIMENSIONS]), granularity,
+                                                     self.money)
+        return self._rollups[granularity]
+
+    def totals(self, granularity: Optional[str] = None, by: Sequence[str] = ()) -> pd.DataFrame:
+        """
+        Vrátí souhrn výdajů po obdobích, volitelně rozdělený podle kategorií nebo položek.
+
+        :param granularity: Granularita období (výchozí: granularita kostky); "all" = souhrn za celé období.
+        :param by: Dimenze rozpadu, podmnožina ("Kategorie", "Položka") (výchozí: bez rozpadu).
+        :return: DataFrame se sloupci "Období" (není-li souhrn za celé období), dimenzemi z by a mírami
+                 (výdaje v korunách).
+        """
+        unknown = [dim for dim in by if dim not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Neznámé dimenze: {', '.join(unknown)}. Povolené dimenze: {', '.join(DIMENSIONS)}.")
+        if granularity == "all":
+            cube, keys = self, list(by)
+        else:
+            cube, keys = self.rollup(granularity or self.granularity), ["Období", *by]
+        if not keys:
+            result = pd.DataFrame({measure: [cube.cells[measure].sum()] for measure in MEASURES})
+        else:
+            result = self._group(cube.cells, keys)
+            for dim in by:
+                result[dim] = result[dim].astype(result[dim].cat.categories.dtype)
+        if self.money == "haler":
+            result["Výdaje"] = to_crowns(result["Výdaje"])
+        return result
+
+    def pivot(self, granularity: Optional[str] = None, dimension: str = "Kategorie",
+              measure: str = "Výdaje") -> pd.DataFrame:
+        """
+        Vrátí tabulku období × hodnoty dimenze (např. měsíční výdaje po kategoriích) pro přehledy.
+
+        :param granularity: Granularita období (výchozí: granularita kostky).
+        :param dimension: Dimenze sloupců tabulky ("Kategorie" nebo "Položka").
+        :param measure: Zobrazená míra (jedna z MEASURES).
+        :return: DataFrame indexovaný obdobími, chybějící kombinace jsou 0.
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Neznámá míra '{measure}'. Povolené míry: {', '.join(MEASURES)}.")
+        return (self.totals(granularity, by=[dimension])
+                .pivot(index="Období", columns=dimension, values=measure)
+                .fillna(0))
@@ -1,6 +1,39 @@
 import pandas as pd
+import io
 import os
-import chardet
+from typing import Iterator, Optional
+
+from .cache import DataCache
+from .encoding import EncodingDetector, DEFAULT_CACHE_FILE
+from .filters import RowFilter
+from .profiling import Instrumentation
+from .reader import CSV_ENGINES, FLOAT_PRECISION, MappedFile, read_csv_mapped
+from .schema import DtypePlan, format_memory, memory_usage
+from .utils import detect_date_format, format_row_indices
+from .validation import DEFAULT_TOLERANCE, ON_ERROR_MODES, ValidationReport, validate_frame
+
+
+class _FileRange(io.RawIOBase):
+    """
+    Čtení souboru od aktuální pozice pouze do zadaného bajtového offsetu (pro načítání části souboru).
+    """
+
+    def __init__(self, f, end: int):
+        self._f = f
+        self._remaining = max(end - f.tell(), 0)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._f.read(size)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
 
 class DataLoader:
     """
@@ -10,28 +43,98 @@ class DataLoader:
     1. Dynamicky sestavuje cestu k souboru relativní k adresáři 'data'.
     2. Automaticky detekuje kódování CSV souboru.
     3. Načítá data do Pandas DataFrame s kontrolou integrity souboru.
+    4. Umožňuje načítat velké soubory po blocích (streaming) s omezenou pamětí.
+    5. Ukládá validovaná data do sloupcové cache pro rychlé opakované načtení.
+    6. Zaznamenává čas jednotlivých fází, počty řádků a bajtů do objektu Instrumentation.
+    7. Validuje všechna pravidla najednou a chybné řádky buď nahlásí, nebo vyřadí do karantény.
+    8. Ukládá data v úsporných datových typech podle DtypePlan (kategorie, úzká celá čísla).
     """
 
-    def __init__(self, file_name: str):
+    def __init__(self, file_name: str, encoding_cache: Optional[str] = DEFAULT_CACHE_FILE,
+                 data_cache: Optional[DataCache] = None, instrumentation: Optional[Instrumentation] = None,
+                 on_error: str = "raise", quarantine_file: Optional[str] = None,
+                 tolerance: float = DEFAULT_TOLERANCE, dtype_plan: Optional[DtypePlan] = None,
+                 csv_engine: str = "auto"):
         """
         Inicializuje DataLoader s názvem souboru.
 
         :param file_name: Název CSV souboru s daty (soubor musí být uložen ve složce 'data').
+        :param encoding_cache: Cesta k souboru s cache detekovaných kódování (None = bez trvalé cache).
+        :param data_cache: Cache validovaných dat pro load_validated (výchozí: DataCache ve složce 'output/cache').
+        :param instrumentation: Sběr údajů o běhu (fáze "detect_encoding", "read_csv", "validate", "parse_dates").
+        :param on_error: "raise" = chybná data ukončí validaci s přehledem všech chyb,
+                         "quarantine" = chybné řádky se vyřadí a zpracování pokračuje.
+        :param quarantine_file: CSV soubor, do kterého se připisují vyřazené řádky se sloupcem 'Chyby'.
+        :param tolerance: Povolená odchylka 'Celková cena' od součinu množství a jednotkové ceny.
+        :param dtype_plan: Datové typy načtených dat (výchozí: DtypePlan() - kategorie a úzká celá čísla).
+        :param csv_engine: Parser pro load_data - "auto" (pyarrow, pokud je nainstalován, jinak Pandas),
+                           "pyarrow" nebo "pandas".
         """
+        if on_error not in ON_ERROR_MODES:
+            raise ValueError(f"on_error musí být jedna z hodnot: {', '.join(ON_ERROR_MODES)}.")
+        if csv_engine not in CSV_ENGINES:
+            raise ValueError(f"csv_engine musí být jedna z hodnot: {', '.join(CSV_ENGINES)}.")
         self.file_path = os.path.join(os.path.dirname(__file__), "../data", file_name)
+        self.encoding_detector = EncodingDetector(cache_file=encoding_cache)
+        self.data_cache = data_cache if data_cache is not None else DataCache()
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        # Formát data detekovaný při validaci a indexy řádků s neplatným datem
+        self.date_format: Optional[str] = None
+        self.invalid_date_rows: list = []
+        self.on_error = on_error
+        self.quarantine_file = quarantine_file
+        self.tolerance = tolerance
+        self.dtype_plan = dtype_plan if dtype_plan is not None else DtypePlan()
+        # Souhrn chyb ze všech dosud validovaných dat (při načítání po blocích se sčítá)
+        self.validation_report = ValidationReport()
+        self.separator: Optional[str] = None
+        self.csv_engine = csv_engine
 
-    def detect_encoding(self) -> str:
+    def detect_encoding(self, mapped: Optional[MappedFile] = None) -> str:
         """
         Detekuje kódování CSV souboru.
 
-        Pomocí knihovny chardet detekuje nejpravděpodobnější kódování souboru.
-        Tato metoda je užitečná při práci se soubory s různým nebo neznámým kódováním.
+        Kontroluje BOM, poté rychle ověří UTF-8 a teprve nakonec použije knihovnu chardet
+        na omezeném vzorku ze začátku, středu a konce souboru. Výsledek se ukládá do cache
+        podle cesty, velikosti a času změny souboru.
 
+        :param mapped: Soubor již namapovaný do paměti; vzorky se čtou z jeho bufferu.
         :return: Řetězec reprezentující detekované kódování (např. 'utf-8', 'windows-1250').
         """
-        with open(self.file_path, 'rb') as f:
-            result = chardet.detect(f.read())
-        return result['encoding']
+        with self.instrumentation.stage("detect_encoding"):
+            encoding = self.encoding_detector.detect(self.file_path, mapped.data if mapped is not None else None)
+        self.instrumentation.set_info("encoding", encoding)
+        return encoding
+
+    def detect_separator(self, encoding: str, mapped: Optional[MappedFile] = None) -> str:
+        """
+        Určí oddělovač sloupců podle hlavičky souboru.
+        České exporty (např. z Excelu) používají středník, protože čárka slouží jako desetinný oddělovač.
+
+        :param encoding: Kódování souboru.
+        :param mapped: Soubor již namapovaný do paměti; hlavička se čte z jeho bufferu.
+        :return: "," nebo ";".
+        """
+        if self.separator is None:
+            if mapped is not None:
+                header = mapped.header(encoding)
+            else:
+                with open(self.file_path, encoding=encoding, errors="replace") as f:
+                    header = f.readline()
+            self.separator = ";" if header.count(";") > header.count(",") else ","
+        return self.separator
+
+    def _invalid_encoding_error(self, encoding: str, error: UnicodeDecodeError) -> ValueError:
+        """
+        Zneplatní chybně detekované kódování v cache a vrátí výjimku s popisem chyby.
+
+        :param encoding: Použité (chybné) kódování.
+        :param error: Původní chyba dekódování.
+        :return: ValueError k vyhození.
+        """
+        self.encoding_detector.invalidate(self.file_path)
+        return ValueError(f"Soubor '{self.file_path}' obsahuje neplatné znaky pro kódování {encoding} "
+                          f"(bajt na pozici {error.start} v dekódovaném bloku).")
 
     def load_data(self) -> pd.DataFrame:
         """
@@ -39,78 +142,234 @@ class DataLoader:
         - Kontroluje existenci souboru.
         - Validuje obsah souboru (např. prázdné soubory nebo neplatné znaky).
         - Automaticky použije správné kódování pro dekódování textu.
+        - Soubor se jednou namapuje do paměti (mmap) a stejný buffer použije detekce kódování,
+          oddělovače i vícevláknový parser pyarrow; bez pyarrow (nebo pokud ho pyarrow nenačte)
+          se použije pd.read_csv se stejným výsledkem.
 
         :return: Pandas DataFrame obsahující načtená data.
         :raises FileNotFoundError: Pokud soubor neexistuje na dané cestě.
         :raises ValueError: Pokud soubor obsahuje neplatné znaky pro detekované kódování nebo je prázdný.
         :raises pd.errors.EmptyDataError: Pokud je soubor prázdný.
         """
-        encoding = self.detect_encoding()
         try:
-            data = pd.read_csv(self.file_path, encoding=encoding)
+            with MappedFile(self.file_path) as mapped:
+                encoding = self.detect_encoding(mapped)
+                separator = self.detect_separator(encoding, mapped)
+                with self.instrumentation.stage("read_csv"):
+                    data, engine = read_csv_mapped(mapped, encoding, separator, self.csv_engine)
+            self.instrumentation.set_info("csv_engine", engine)
+            self.instrumentation.count("bytes_read", mapped.size)
+            self.instrumentation.count("rows_read", len(data))
             print(f"Data úspěšně načtena z {self.file_path} s kódováním: {encoding}")
             return data
         except FileNotFoundError:
             raise FileNotFoundError(f"Soubor '{self.file_path}' nebyl nalezen.")
-        except UnicodeDecodeError:
-            raise ValueError(f"Soubor '{self.file_path}' obsahuje neplatné znaky pro kódování {encoding}.")
+        except UnicodeDecodeError as e:
+            raise self._invalid_encoding_error(encoding, e)
         except pd.errors.EmptyDataError:
             raise ValueError(f"Soubor '{self.file_path}' je prázdný.")
 
+    def load_validated(self, use_cache: bool = True, row_filter: Optional[RowFilter] = None) -> pd.DataFrame:
+        """
+        Načte a validuje data s využitím sloupcové cache.
+        Při prvním načtení (nebo po změně souboru) se data načtou z CSV, zvalidují a uloží do cache;
+        další načtení čtou přímo typovaná data z cache bez parsování a validace.
+        S filtrem se z cache načtou jen bloky, jejichž rozsah dat a kategorie mohou filtru vyhovět.
+
+        :param use_cache: Pokud je False, cache se nepoužije a data se načtou z CSV.
+        :param row_filter: Filtr řádků podle časového okna, kategorií a položek (None = všechna data).
+        :return: Validovaný DataFrame (datum jako datetime64, 'Položka' a 'Kategorie' jako kategorie).
+        :raises FileNotFoundError: Pokud soubor neexistuje na dané cestě.
+        :raises ValueError: Pokud soubor nelze načíst nebo neprojde validací.
+        """
+        # V režimu karantény se cache nepoužije, aby se vyřazené řádky nahlásily při každém běhu
+        use_cache = use_cache and self.on_error == "raise"
+        if use_cache:
+            if not os.path.exists(self.file_path):
+                raise FileNotFoundError(f"Soubor '{self.file_path}' nebyl nalezen.")
+            with self.instrumentation.stage("cache_load"):
+                cached = self.data_cache.load(self.file_path, row_filter)
+            self.instrumentation.set_info("cache", "hit" if cached is not None else "miss")
+            if cached is not None:
+                cached = self.dtype_plan.apply(cached)
+                self.instrumentation.count("cache_blocks_read", self.data_cache.blocks_read)
+                print(f"Data načtena z cache pro {self.file_path} "
+                      f"({self.data_cache.blocks_read} z {self.data_cache.blocks_total} bloků)")
+                return cached
+        if use_cache:
+            # Do cache se ukládají celá data, filtr se uplatní až na uložený výsledek
+            df = self.validate_data(self.load_data())
+            with self.instrumentation.stage("cache_store"):
+                df = self.data_cache.store(self.file_path, df)
+        else:
+            # Filtr se uplatní až po validaci, aby se chyby hlásily i v řádcích mimo filtr (stejně jako při plnění cache)
+            df = self.validate_data(self.load_data())
+        return row_filter.apply(df) if row_filter is not None else df
+
+    def iter_chunks(self, chunksize: int = 100_000, start: int = 0, end: Optional[int] = None,
+                    row_filter: Optional[RowFilter] = None, first_row: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Načítá data po blocích a každý blok validuje.
+        Paměťová náročnost je omezena velikostí bloku, nikoli velikostí souboru.
+
+        Volitelně lze načíst jen bajtový úsek souboru (např. nově připsané řádky). Úsek musí začínat
+        na začátku řádku; pokud nezačíná na začátku souboru, názvy sloupců se převezmou z hlavičky.
+        Indexy řádků (v blocích, validation_report i invalid_date_rows) se číslují od first_row, aby u úseku
+        odpovídaly pořadí řádku v celém souboru.
+
+        :param chunksize: Počet řádků v jednom bloku (výchozí 100 000).
+        :param start: Bajtový offset začátku načítaného úseku (výchozí 0 = celý soubor včetně hlavičky).
+        :param end: Bajtový offset konce načítaného úseku (výchozí None = konec souboru).
+        :param row_filter: Filtr řádků; každý blok se nejprve zvaliduje celý (chyby se hlásí i v řádcích
+                           mimo filtr) a nevyhovující řádky se vyřadí až potom, bloky bez vyhovujících
+                           řádků se vynechají.
+        :param first_row: Index prvního načteného řádku (počet datových řádků před bajtovým offsetem start).
+        :return: Iterátor validovaných DataFrame bloků.
+        :raises FileNotFoundError: Pokud soubor neexistuje na dané cestě.
+        :raises ValueError: Pokud soubor obsahuje neplatné znaky, je prázdný nebo blok neprojde validací.
+        """
+        if chunksize <= 0:
+            raise ValueError("Velikost bloku musí být kladné číslo.")
+        encoding = self.detect_encoding()
+        try:
+            size = os.path.getsize(self.file_path)
+            sep = self.detect_separator(encoding)
+            self.instrumentation.count("bytes_read", (end if end is not None else size) - start)
+            if start == 0 and end is None:
+                with pd.read_csv(self.file_path, encoding=encoding, sep=sep, chunksize=chunksize,
+                                 float_precision=FLOAT_PRECISION) as reader:
+                    yield from self._validated_chunks(reader, row_filter, first_row)
+            else:
+                names = None
+                if start > 0:
+                    names = list(pd.read_csv(self.file_path, encoding=encoding, sep=sep, nrows=0).columns)
+                with open(self.file_path, "rb") as f:
+                    f.seek(start)
+                    stream = io.BufferedReader(_FileRange(f, end if end is not None else size))
+                    with pd.read_csv(stream, encoding=encoding, sep=sep, chunksize=chunksize,
+                                     header=None if names else "infer", names=names,
+                                     float_precision=FLOAT_PRECISION) as reader:
+                        yield from self._validated_chunks(reader, row_filter, first_row)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Soubor '{self.file_path}' nebyl nalezen.")
+        except UnicodeDecodeError as e:
+            raise self._invalid_encoding_error(encoding, e)
+        except pd.errors.EmptyDataError:
+            if start > 0:
+                # Prázdný úsek za již zpracovanými daty není chyba
+                return
+            raise ValueError(f"Soubor '{self.file_path}' je prázdný.")
+        print(f"Data byla načtena a validována po blocích z {self.file_path} s kódováním: {encoding}")
+
+    def _validated_chunks(self, reader, row_filter: Optional[RowFilter], first_row: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Čte bloky z readeru, validuje je a uplatní filtr; prázdné bloky (po filtru) se vynechají.
+        Validuje se celý blok, takže chyby se hlásí i v řádcích, které filtr vyřadí.
+
+        :param reader: Iterátor bloků z pd.read_csv(chunksize=...).
+        :param row_filter: Filtr řádků nebo None.
+        :param first_row: Posun indexů řádků (index prvního řádku úseku v celém souboru).
+        :return: Iterátor validovaných a vyfiltrovaných bloků.
+        """
+        for chunk in self.instrumentation.timed_iter(reader, "read_csv"):
+            self.instrumentation.count("rows_read", len(chunk))
+            if first_row:
+                chunk.index += first_row
+            chunk = self._validate(chunk)
+            if row_filter is not None:
+                chunk = row_filter.apply(chunk)
+                if chunk.empty:
+                    continue
+            yield chunk
+
     def validate_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Validuje integritu datového rámce.
-        Kontroluje chybějící hodnoty a nesprávné datové typy.
+        Všechna pravidla (chybějící hodnoty, datum, číselné hodnoty včetně desetinné čárky a shoda
+        'Celková cena' se součinem množství a jednotkové ceny) se kontrolují najednou a chyby se
+        hlásí po řádcích v atributu validation_report.
+        Řádky s neplatným datem se vyřadí vždy a jejich indexy se uloží do atributu invalid_date_rows;
+        v režimu karantény (on_error="quarantine") se vyřadí všechny chybné řádky.
+        Při Instrumentation(track_memory=True) se navíc zaznamená paměť dat před a po převodu typů.
 
         :param df: DataFrame, který má být validován.
         :return: Validovaný DataFrame.
         :raises ValueError: Pokud jsou v datech závažné chyby.
         """
-        required_columns = ["Datum", "Položka", "Kategorie", "Množství", "Cena za jednotku", "Celková cena"]
-
-        # Kontrola přítomnosti požadovaných sloupců
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Chybějící sloupce: {', '.join(missing_columns)}")
-
-        # Kontrola na chybějící hodnoty
-        if df.isnull().any().any():
-            raise ValueError("Data obsahují chybějící hodnoty.")
-
-        # Kontrola a konverze datového typu sloupce "Datum"
-        if not pd.api.types.is_datetime64_any_dtype(df["Datum"]):
-            try:
-                # Pokus o konverzi s více formáty a preferencí DD.MM.YYYY
-                df["Datum"] = pd.to_datetime(
-                    df["Datum"],
-                    format=None,  # Automatická detekce formátu
-                    dayfirst=True,  # Upřednostnění formátu DD.MM.YYYY
-                    errors="coerce"  # Nahrazení neplatných hodnot NaT
-                )
-                if df["Datum"].isna().any():
-                    raise ValueError("Sloupec 'Datum' obsahuje neplatné hodnoty.")
-            except Exception:
-                raise ValueError("Sloupec 'Datum' neobsahuje validní datové hodnoty.")
-
-        # Kontrola číselného typu ve sloupcích "Množství", "Cena za jednotku" a "Celková cena"
-        numeric_columns = ["Množství", "Cena za jednotku", "Celková cena"]
-        for col in numeric_columns:
-            if not pd.api.types.is_numeric_dtype(df[col]):
-                raise ValueError(f"Sloupec '{col}' musí obsahovat číselné hodnoty.")
-        # Zamyslet se nad desetinnými čísly (formát '6.1' nebo '6,1' a zvážit zaokrouhlení na celá čísla pro dašlí výpočty)
-
-        print("Data byla úspěšně validována.")
+        if not self.instrumentation.track_memory:
+            df = self._validate(df)
+            print("Data byla úspěšně validována.")
+            return df
+        # Paměť dat se měří jen na vyžádání (Instrumentation(track_memory=True), např. --profile) -
+        # memory_usage(deep=True) prochází všechny textové hodnoty a je stejně drahé jako samotná validace
+        memory_before = memory_usage(df)
+        df = self._validate(df)
+        memory_after = memory_usage(df)
+        self.instrumentation.set_info("memory_before_mb", round(memory_before / 2 ** 20, 1))
+        self.instrumentation.set_info("memory_after_mb", round(memory_after / 2 ** 20, 1))
+        print(f"Data byla úspěšně validována. Paměť dat: {format_memory(memory_before)} po načtení, "
+              f"{format_memory(memory_after)} po převodu typů.")
         return df
 
+    def _validate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Provede samotnou validaci (bez výpisu), sdílenou mezi validate_data a iter_chunks.
+
+        :param df: DataFrame, který má být validován.
+        :return: Validovaný DataFrame.
+        :raises ValueError: Pokud jsou v datech závažné chyby.
+        """
+        with self.instrumentation.stage("validate"):
+            # Převládající formát se detekuje jednou ze vzorku a použije se i pro další bloky
+            if self.date_format is None and "Datum" in df.columns \
+                    and not pd.api.types.is_datetime64_any_dtype(df["Datum"]):
+                self.date_format = detect_date_format(df["Datum"].dropna())
+                self.instrumentation.set_info("date_format", self.date_format)
+            df, report = validate_frame(df, self.date_format, self.tolerance, self.instrumentation)
+            self.validation_report.merge(report)
 
-# Příklad použití
-if __name__ == "__main__":
-    file_path = "nakupy.csv"  # Konkrétní název souboru (uložen ve složce data)
-    loader = DataLoader(file_path)
+            invalid_dates = report.errors.get("invalid_date", [])
+            self.invalid_date_rows.extend(invalid_dates)
+            self.instrumentation.count("invalid_date_rows", len(invalid_dates))
 
-    try:
-        data = loader.load_data()
-        validated_data = loader.validate_data(data)
-        print(validated_data.head())
-    except Exception as e:
-        print(f"Chyba: {e}")
+            if self.on_error == "raise":
+                fatal_rules = report.fatal_rules()
+                if fatal_rules:
+                    raise ValueError(f"Data neprošla validací:\n{report.summary(fatal_rules)}")
+                if invalid_dates and len(invalid_dates) == len(df):
+                    raise ValueError("Sloupec 'Datum' neobsahuje validní datové hodnoty.")
+                if invalid_dates:
+                    # Neplatné řádky se vyřadí a nahlásí, zbytek souboru se zpracuje
+                    print(f"Varování: sloupec 'Datum' obsahuje neplatné hodnoty v řádcích: "
+                          f"{format_row_indices(invalid_dates)}. Tyto řádky byly vyřazeny.")
+                    df = df.drop(index=invalid_dates)
+            elif not report.is_valid:
+                df = self._quarantine(df, report)
+            df = self.dtype_plan.apply(df)
+
+        self.instrumentation.count("rows", len(df))
+        return df
+
+    def _quarantine(self, df: pd.DataFrame, report: ValidationReport) -> pd.DataFrame:
+        """
+        Vyřadí chybné řádky, nahlásí je a případně je připíše do souboru karantény.
+
+        :param df: Validovaný DataFrame včetně chybných řádků.
+        :param report: Report validace tohoto DataFrame.
+        :return: DataFrame bez chybných řádků.
+        """
+        invalid_rows = report.invalid_rows()
+        self.instrumentation.count("quarantined_rows", len(invalid_rows))
+        print(f"Varování: {len(invalid_rows)} řádků neprošlo validací a bylo vyřazeno do karantény:\n"
+              f"{report.summary()}")
+        if self.quarantine_file:
+            rejected = df.loc[invalid_rows].copy()
+            rejected.insert(0, "Řádek", rejected.index)
+            rejected["Chyby"] = ""
+            for rule, rows in report.errors.items():
+                rejected.loc[rows, "Chyby"] += rule + ";"
+            rejected["Chyby"] = rejected["Chyby"].str.rstrip(";")
+            write_header = not os.path.exists(self.quarantine_file)
+            os.makedirs(os.path.dirname(os.path.abspath(self.quarantine_file)), exist_ok=True)
+            rejected.to_csv(self.quarantine_file, mode="a", header=write_header, index=False, encoding="utf-8")
+        return df.drop(index=invalid_rows)
@@ -0,0 +1,257 @@
+import codecs
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import chardet
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Znaky české abecedy s diakritikou - slouží k rozlišení windows-1250 od podobných kódování
+CZECH_LETTERS = set("áčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ")
+
+# BOM (byte order mark) a jim odpovídající kódování; delší značky musí být kontrolovány dříve
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# Kódování, mezi kterými se rozhoduje, pokud data nejsou v UTF-8
+SINGLE_BYTE_CANDIDATES = ["windows-1250", "iso-8859-2"]
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "output", "cache", "encodings.json")
+
+
+@contextmanager
+def _file_lock(lock_path: str):
+    """
+    Exkluzivní zámek souboru sdílený mezi procesy (fcntl.flock, ve Windows msvcrt.locking).
+
+    :param lock_path: Cesta k zámkovému souboru (vytvoří se, pokud neexistuje).
+    """
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _czech_score(text: str) -> int:
+    """
+    Ohodnotí, jak dobře dekódovaný text odpovídá češtině.
+    Každý znak české abecedy s diakritikou přičte bod, každý jiný ne-ASCII znak bod odečte.
+
+    :param text: Dekódovaný text.
+    :return: Skóre (vyšší = pravděpodobnější české kódování).
+    """
+    score = 0
+    for char in text:
+        if ord(char) > 127:
+            score += 1 if char in CZECH_LETTERS else -1
+    return score
+
+
+def _is_utf8(window: bytes, at_start: bool, at_end: bool) -> bool:
+    """
+    Ověří, zda je okno bajtů platné UTF-8.
+    Okna uprostřed souboru mohou začínat nebo končit uprostřed vícebajtového znaku, proto se
+    neúplné sekvence na okrajích okna ignorují.
+
+    :param window: Vzorek bajtů ze souboru.
+    :param at_start: True, pokud okno začíná na začátku souboru.
+    :param at_end: True, pokud okno končí na konci souboru.
+    :return: True, pokud okno lze dekódovat jako UTF-8.
+    """
+    if not at_start:
+        # Přeskočení nejvýše 3 pokračovacích bajtů (0b10xxxxxx) useknutého znaku
+        skip = 0
+        while skip < 3 and skip < len(window) and 0x80 <= window[skip] <= 0xBF:
+            skip += 1
+        window = window[skip:]
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(window, final=at_end)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+class EncodingDetector:
+    """
+    Třída pro rychlou detekci kódování souborů.
+
+    Postup detekce:
+    1. Kontrola BOM (byte order mark).
+    2. Rychlá cesta pro UTF-8 - ověření vzorků souboru striktním dekodérem.
+    3. Detekce pomocí chardet na omezeném vzorku (okna ze začátku, středu a konce souboru),
+       s opravou častých chybných odhadů pro česká data (např. Windows-1252 místo windows-1250).
+
+    Výsledky se ukládají do cache podle cesty, velikosti a času poslední změny souboru,
+    takže opakovaná spuštění nad nezměněným souborem detekci přeskočí.
+    """
+
+    def __init__(self, cache_file: Optional[str] = DEFAULT_CACHE_FILE, window_size: int = 64 * 1024,
+                 windows: int = 3):
+        """
+        Inicializuje detektor kódování.
+
+        :param cache_file: Cesta k JSON souboru s cache detekovaných kódování (None = pouze cache v paměti).
+        :param window_size: Velikost jednoho vzorku v bajtech (výchozí 64 KiB).
+        :param windows: Počet vzorků rozložených rovnoměrně od začátku do konce souboru (výchozí 3).
+        """
+        if window_size <= 0 or windows <= 0:
+            raise ValueError("Velikost a počet vzorků musí být kladná čísla.")
+        self.cache_file = cache_file
+        self.window_size = window_size
+        self.windows = windows
+        self._cache: Optional[Dict[str, dict]] = None
+
+    def detect(self, file_path: str, data=None) -> str:
+        """
+        Detekuje kódování souboru (s využitím cache).
+
+        :param file_path: Cesta k souboru.
+        :param data: Obsah souboru již namapovaný do paměti (mmap); vzorky se pak čtou z něj.
+        :return: Název kódování (např. 'utf-8', 'windows-1250').
+        :raises FileNotFoundError: Pokud soubor neexistuje.
+        """
+        stat = os.stat(file_path)
+        key = os.path.abspath(file_path)
+        entry = self._load_cache().get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["encoding"]
+
+        encoding = self._detect_uncached(file_path, stat.st_size, data)
+        self._save_cache(key, {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "encoding": encoding})
+        return encoding
+
+    def invalidate(self, file_path: str):
+        """
+        Odstraní soubor z cache (např. pokud se detekované kódování ukázalo jako chybné).
+
+        :param file_path: Cesta k souboru.
+        """
+        key = os.path.abspath(file_path)
+        if key in self._load_cache():
+            self._save_cache(key, None)
+
+    def read_samples(self, file_path: str, size: int, data=None) -> List[bytes]:
+        """
+        Načte omezený počet vzorků bajtů rovnoměrně rozložených po souboru.
+        Malé soubory se načtou celé jako jediný vzorek.
+
+        :param file_path: Cesta k souboru.
+        :param size: Velikost souboru v bajtech.
+        :param data: Obsah souboru namapovaný do paměti (None = vzorky se čtou ze souboru).
+        :return: Seznam vzorků bajtů.
+        """
+        if data is not None:
+            if size <= self.window_size * self.windows:
+                return [bytes(data[:size])]
+            last_offset = size - self.window_size
+            offsets = [last_offset * i // max(self.windows - 1, 1) for i in range(self.windows)]
+            return [bytes(data[offset:offset + self.window_size]) for offset in offsets]
+        with open(file_path, "rb") as f:
+            if size <= self.window_size * self.windows:
+                return [f.read()]
+            samples = []
+            last_offset = size - self.window_size
+            for i in range(self.windows):
+                offset = last_offset * i // max(self.windows - 1, 1)
+                f.seek(offset)
+                samples.append(f.read(self.window_size))
+            return samples
+
+    def _detect_uncached(self, file_path: str, size: int, data=None) -> str:
+        samples = self.read_samples(file_path, size, data)
+        head = samples[0]
+
+        for bom, encoding in BOMS:
+            if head.startswith(bom):
+                return encoding
+
+        last = len(samples) - 1
+        if all(_is_utf8(sample, i == 0, i == last) for i, sample in enumerate(samples)):
+            return "utf-8"
+
+        sample = b"\n".join(samples)
+        guess = chardet.detect(sample)["encoding"]
+        candidates = list(SINGLE_BYTE_CANDIDATES)
+        if guess and guess.lower() not in candidates and guess.lower() not in ("ascii", "utf-8"):
+            candidates.append(guess.lower())
+
+        scores = {}
+        for candidate in candidates:
+            try:
+                scores[candidate] = _czech_score(sample.decode(candidate))
+            except (UnicodeDecodeError, LookupError):
+                continue
+        if not scores:
+            raise ValueError(f"Kódování souboru '{file_path}' se nepodařilo detekovat.")
+
+        encoding = max(scores, key=scores.get)
+        if guess and guess.lower() != encoding:
+            print(f"Odhad kódování {guess} byl pro soubor '{file_path}' opraven na {encoding}.")
+        return encoding
+
+    def _read_cache_file(self) -> Dict[str, dict]:
+        if self.cache_file and os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                # Poškozená cache se ignoruje a bude přepsána
+                pass
+        return {}
+
+    def _load_cache(self) -> Dict[str, dict]:
+        if self._cache is None:
+            self._cache = self._read_cache_file()
+        return self._cache
+
+    def _save_cache(self, key: str, entry: Optional[dict]):
+        """
+        Uloží jeden záznam cache (None = odstranění záznamu).
+        Souběžně běžící procesy (např. paralelní načítání více souborů) zapisují do stejného souboru:
+        pod zámkem se cache znovu načte z disku, změní se jen tento záznam a soubor se atomicky nahradí,
+        takže se záznamy ostatních procesů neztratí.
+
+        :param key: Absolutní cesta k souboru.
+        :param entry: Záznam {"size", "mtime_ns", "encoding"} nebo None.
+        """
+        if not self.cache_file:
+            self._apply(self._load_cache(), key, entry)
+            return
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        with _file_lock(f"{self.cache_file}.lock"):
+            cache = self._apply(self._read_cache_file(), key, entry)
+            # Zápis přes dočasný soubor, aby souběžně běžící procesy nikdy nečetly nedokončenou cache
+            temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, self.cache_file)
+        self._cache = cache
+
+    @staticmethod
+    def _apply(cache: Dict[str, dict], key: str, entry: Optional[dict]) -> Dict[str, dict]:
+        if entry is None:
+            cache.pop(key, None)
+        else:
+            cache[key] = entry
+        return cache
@@ -0,0 +1,119 @@
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def parse_date_bound(value) -> Optional[pd.Timestamp]:
+    """
+    Převede hranici časového okna na Timestamp (ISO formát YYYY-MM-DD nebo český DD.MM.YYYY).
+
+    :param value: Datum jako text, date/datetime nebo None.
+    :return: Timestamp, nebo None, pokud hranice není zadána.
+    :raises ValueError: Pokud hodnotu nelze převést na datum.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and "." in value:
+        parsed = pd.to_datetime(value, dayfirst=True, errors="coerce")
+    else:
+        parsed = pd.to_datetime(value, errors="coerce")
+    if pd.isna(parsed):
+        raise ValueError(f"Neplatné datum '{value}' (očekáván formát YYYY-MM-DD nebo DD.MM.YYYY).")
+    return pd.Timestamp(parsed)
+
+
+class RowFilter:
+    """
+    Filtr řádků podle časového okna, kategorií a položek, který lze předat do načítání dat.
+
+    Filtr se uplatní co nejdříve: při čtení z cache se přeskočí celé bloky, jejichž rozsah dat
+    nebo kategorie s filtrem nemohou mít průnik. Při čtení CSV se řádky vyřadí až po validaci
+    bloku, aby se chyby v datech hlásily bez ohledu na filtr.
+    """
+
+    def __init__(self, start=None, end=None, categories: Optional[Iterable[str]] = None,
+                 items: Optional[Iterable[str]] = None):
+        """
+        Inicializuje filtr; nezadané podmínky se neuplatní.
+
+        :param start: První den okna (včetně).
+        :param end: Poslední den okna (včetně; bez času zahrnuje celý den).
+        :param categories: Povolené kategorie.
+        :param items: Povolené položky.
+        :raises ValueError: Pokud je začátek okna po jeho konci nebo datum nelze převést.
+        """
+        self.start = parse_date_bound(start)
+        end = parse_date_bound(end)
+        if end is not None and end == end.normalize():
+            # Konec bez času zahrnuje celý den
+            end = end + pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns")
+        self.end = end
+        if self.start is not None and self.end is not None and self.start > self.end:
+            raise ValueError("Začátek časového okna musí předcházet jeho konci.")
+        self.categories = frozenset(categories) if categories else None
+        self.items = frozenset(items) if items else None
+
+    @property
+    def is_empty(self) -> bool:
+        """True, pokud filtr nemá žádnou podmínku (propustí všechny řádky)."""
+        return self.start is None and self.end is None and self.categories is None and self.items is None
+
+    def describe(self) -> str:
+        """Vrátí popis filtru pro výpis."""
+        parts = []
+        if self.start is not None or self.end is not None:
+            start = self.start.strftime("%d.%m.%Y") if self.start is not None else "…"
+            end = self.end.strftime("%d.%m.%Y") if self.end is not None else "…"
+            parts.append(f"období {start} - {end}")
+        if self.categories:
+            parts.append(f"kategorie {', '.join(sorted(self.categories))}")
+        if self.items:
+            parts.append(f"položky {', '.join(sorted(self.items))}")
+        return "; ".join(parts) if parts else "bez filtru"
+
+    def may_match(self, block: dict) -> bool:
+        """
+        Rozhodne podle statistik bloku, zda blok může obsahovat vyhovující řádky.
+
+        :param block: Statistiky bloku {"min_date", "max_date", "categories"} (chybějící klíč = neznámé).
+        :return: False, pokud blok určitě žádný vyhovující řádek neobsahuje.
+        """
+        if self.start is not None and block.get("max_date") and pd.Timestamp(block["max_date"]) < self.start:
+            return False
+        if self.end is not None and block.get("min_date") and pd.Timestamp(block["min_date"]) > self.end:
+            return False
+        if self.categories is not None and block.get("categories") is not None \
+                and self.categories.isdisjoint(block["categories"]):
+            return False
+        return True
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Vyhodnotí filtr vektorizovaně nad validovanými daty.
+
+        :param df: Validovaný DataFrame (sloupec 'Datum' jako datetime64).
+        :return: Pole bool, True pro vyhovující řádky.
+        """
+        mask = np.ones(len(df), dtype=bool)
+        if self.start is not None:
+            mask &= (df["Datum"] >= self.start).to_numpy()
+        if self.end is not None:
+            mask &= (df["Datum"] <= self.end).to_numpy()
+        if self.categories is not None:
+            mask &= df["Kategorie"].isin(self.categories).to_numpy()
+        if self.items is not None:
+            mask &= df["Položka"].isin(self.items).to_numpy()
+        return mask
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vrátí pouze řádky vyhovující filtru.
+
+        :param df: Validovaný DataFrame.
+        :return: Vyfiltrovaný DataFrame (původní DataFrame, pokud filtr nic nevyřadí).
+        """
+        if self.is_empty:
+            return df
+        mask = self.mask(df)
+        return df if mask.all() else df[mask]
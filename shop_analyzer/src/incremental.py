@@ -0,0 +1,186 @@
+import hashlib
+import os
+import pickle
+from typing import Dict, Iterable, Optional
+
+from .analyzer import AggregateState, StreamingAnalyzer
+from .data_loader import DataLoader
+
+# Verze formátu uloženého stavu - při změně AggregateState je nutné ji zvýšit
+STATE_VERSION = 5
+
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "output", "cache", "aggregates")
+
+# Velikost bloku čteného při výpočtu otisku zpracovaných dat
+DIGEST_BLOCK_SIZE = 1024 * 1024
+
+# Kódování, u kterých není znak nového řádku jediným bajtem b"\n"
+UNSUPPORTED_ENCODINGS = ("utf-16", "utf-32")
+
+
+def _range_digests(file_path: str, lengths: Iterable[int]) -> Dict[int, str]:
+    """
+    Spočítá SHA-1 prvních `length` bajtů souboru pro každou ze zadaných délek jedním průchodem souborem.
+
+    :param file_path: Cesta k souboru.
+    :param lengths: Délky úseků od začátku souboru (nesmí přesahovat velikost souboru).
+    :return: Slovník délka -> hexadecimální otisk.
+    """
+    digests = {}
+    sha1 = hashlib.sha1()
+    position = 0
+    with open(file_path, "rb") as f:
+        for length in sorted(set(lengths)):
+            while position < length:
+                block = f.read(min(DIGEST_BLOCK_SIZE, length - position))
+                if not block:
+                    raise ValueError(f"Soubor '{file_path}' je kratší než {length} bajtů.")
+                sha1.update(block)
+                position += len(block)
+            digests[length] = sha1.hexdigest()
+    return digests
+
+
+def _last_line_end(file_path: str, size: int, block_size: int = 64 * 1024) -> int:
+    """
+    Najde konec posledního úplného řádku (pozici za posledním znakem nového řádku).
+    Neúplný poslední řádek (např. právě zapisovaný) se tak zpracuje až při dalším běhu.
+
+    :param file_path: Cesta k souboru.
+    :param size: Velikost souboru v bajtech.
+    :param block_size: Velikost bloku čteného od konce souboru.
+    :return: Bajtový offset konce posledního úplného řádku (0, pokud soubor žádný neobsahuje).
+    """
+    with open(file_path, "rb") as f:
+        position = size
+        while position > 0:
+            start = max(position - block_size, 0)
+            f.seek(start)
+            block = f.read(position - start)
+            index = block.rfind(b"\n")
+            if index >= 0:
+                return start + index + 1
+            position = start
+    return 0
+
+
+class IncrementalAnalyzer:
+    """
+    Třída pro přírůstkovou analýzu souborů, do kterých se data pouze připisují (např. denní nákupy).
+
+    Agregace (měsíční výdaje, výdaje podle kategorií a počty položek) se spolu s bajtovým offsetem
+    již zpracovaných dat ukládají na disk. Další běh načte jen nově připsané řádky a přičte je
+    k uloženým agregacím, takže parsování a validace závisí na objemu nových dat, ne na celé historii.
+    Připsání se ověří otiskem (SHA-1) celého již zpracovaného úseku - pokud byl soubor kdekoli přepsán
+    nebo zkrácen, agregace se spočítají znovu od začátku.
+    S track_cube=True se ukládá a přírůstkově slučuje i denní agregační kostka pro přehledy po obdobích.
+    """
+
+    def __init__(self, file_name: str, state_dir: str = DEFAULT_STATE_DIR, chunksize: int = 100_000,
+                 loader: Optional[DataLoader] = None, track_cube: bool = False):
+        """
+        Inicializuje IncrementalAnalyzer pro zadaný soubor.
+
+        :param file_name: Název CSV souboru s daty (soubor musí být uložen ve složce 'data').
+        :param state_dir: Adresář pro ukládání agregací (výchozí: "output/cache/aggregates").
+        :param chunksize: Počet řádků v jednom bloku při načítání nových dat.
+        :param loader: Vlastní DataLoader (výchozí: DataLoader pro zadaný soubor).
+        :param track_cube: Ukládat a aktualizovat i denní agregační kostku (pro přehledy po obdobích).
+        """
+        self.loader = loader if loader is not None else DataLoader(file_name)
+        self.chunksize = chunksize
+        self.track_cube = track_cube
+        name = hashlib.sha1(os.path.abspath(self.loader.file_path).encode("utf-8")).hexdigest()[:16]
+        self.state_path = os.path.join(state_dir, f"{name}.pkl")
+        # Počet řádků zpracovaných při posledním volání refresh
+        self.new_rows = 0
+
+    def _load_saved(self) -> Optional[dict]:
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, "rb") as f:
+                saved = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if saved.get("version") != STATE_VERSION:
+            return None
+        return saved
+
+
+    def refresh(self) -> StreamingAnalyzer:
+        """
+        Zpracuje nově připsané řádky a vrátí analyzer nad aktualizovanými agregacemi.
+
+        :return: StreamingAnalyzer nad agregacemi celého souboru.
+        :raises FileNotFoundError: Pokud soubor neexistuje na dané cestě.
+        :raises ValueError: Pokud soubor nelze načíst, neprojde validací nebo má nepodporované kódování.
+        """
+        if not os.path.exists(self.loader.file_path):
+            raise FileNotFoundError(f"Soubor '{self.loader.file_path}' nebyl nalezen.")
+        size = os.path.getsize(self.loader.file_path)
+        saved = self._load_saved()
+
+        if saved is not None and saved["state"]["money"] not in (None, self.loader.dtype_plan.money):
+            # Uložené součty jsou v jiné reprezentaci částek (koruny / haléře), než jakou načte loader
+            print(f"Změnila se reprezentace částek, agregace souboru '{self.loader.file_path}' se spočítají znovu.")
+            saved = None
+        if saved is not None and self.track_cube and not saved["state"]["track_cube"]:
+            # Uložené agregace neobsahují kostku, kterou nelze doplnit bez zpracování celého souboru
+            print(f"Agregace souboru '{self.loader.file_path}' se spočítají znovu i s agregační kostkou.")
+            saved = None
+        end = _last_line_end(self.loader.file_path, size)
+        # Otisk dříve zpracovaného úseku (pro ověření připsání) i celého úseku po tomto běhu jedním průchodem
+        saved_offset = saved["offset"] if saved is not None and saved["offset"] <= size else None
+        digests = _range_digests(self.loader.file_path, [end] if saved_offset is None else [end, saved_offset])
+        if saved_offset is not None and digests[saved_offset] == saved["sha1"]:
+            state, start, rows_read = AggregateState(), saved_offset, saved["rows_read"]
+            vars(state).update(saved["state"])
+            self.loader.date_format = saved["date_format"]
+        else:
+            if saved is not None:
+                print(f"Soubor '{self.loader.file_path}' byl změněn jinak než připsáním, agregace se spočítají znovu.")
+            state, start, rows_read = AggregateState(track_cube=self.track_cube), 0, 0
+
+        encoding = self.loader.detect_encoding()
+        if encoding.lower().startswith(UNSUPPORTED_ENCODINGS):
+            raise ValueError(f"Přírůstková analýza nepodporuje kódování {encoding}.")
+
+        rows_before = state.rows
+        read_before = self.loader.instrumentation.counters.get("rows_read", 0)
+        if end > start:
+            # Indexy řádků v hlášení chyb se číslují od začátku souboru, ne od začátku nově připsaného úseku
+            for chunk in self.loader.iter_chunks(self.chunksize, start=start, end=end, first_row=rows_read):
+                state.update(chunk)
+        self.new_rows = state.rows - rows_before
+        rows_read += self.loader.instrumentation.counters.get("rows_read", 0) - read_before
+
+        if state.is_empty():
+            raise ValueError(f"Soubor '{self.loader.file_path}' neobsahuje žádná data.")
+        self._save(state, end, digests[end], rows_read)
+        print(f"Přírůstková analýza: zpracováno {self.new_rows} nových řádků (celkem {state.rows}).")
+        return StreamingAnalyzer.from_state(state)
+
+    def _save(self, state: AggregateState, offset: int, sha1: str, rows_read: int):
+        saved = {
+            "version": STATE_VERSION,
+            "offset": offset,
+            # Otisk bajtů [0, offset) a počet v nich načtených datových řádků (včetně vyřazených)
+            "sha1": sha1,
+            "rows_read": rows_read,
+            "date_format": self.loader.date_format,
+            # Ukládají se jen atributy stavu (Series a počet řádků), ne samotná třída
+            "state": dict(vars(state)),
+        }
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(saved, f)
+        os.replace(temp_path, self.state_path)
+
+    def reset(self):
+        """
+        Odstraní uložené agregace - další volání refresh zpracuje celý soubor.
+        """
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
@@ -0,0 +1,218 @@
+from decimal import Decimal
+from fractions import Fraction
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Peněžní sloupce validovaných dat
+MONEY_COLUMNS = ("Cena za jednotku", "Celková cena")
+
+# Reprezentace peněžních sloupců: "float" = koruny jako float64, "haler" = celé haléře jako int64
+MONEY_MODES = ("float", "haler")
+
+# Klíč v DataFrame.attrs, pod kterým je uložena reprezentace peněžních sloupců
+# (atributy se zachovávají při filtrování, spojování i v cache Arrow)
+MONEY_ATTR = "money"
+
+HALER_PER_CROWN = 100
+
+# Největší částka v korunách, jejíž haléře float64 reprezentuje přesně (2 ** 53 haléřů)
+MAX_EXACT_CROWNS = 2 ** 53 // HALER_PER_CROWN
+
+# Počet řádků sčítaných jedním np.bincount v exact_sums: každá polovina mantisy má nejvýše 27 bitů,
+# součet 2 ** 26 takových čísel je ve float64 stále přesné celé číslo
+EXACT_SUM_BLOCK = 2 ** 26
+
+# Povolená odchylka násobku 100 od celého čísla v jednotkách ULP (nepřesnost binární reprezentace desetinných čísel):
+# float64 částky se dvěma desetinnými místy vynásobený 100 se od celého čísla liší nejvýše o jednu ULP.
+# Odchylka je absolutní - částky s přesností pod haléř se odmítnou i u velkých částek.
+HALER_TOLERANCE_ULPS = 4
+
+
+def split_haler(crowns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Zaokrouhlí částky v korunách na celé haléře a označí částky, které celé haléře skutečně jsou.
+
+    :param crowns: Pole float64 s částkami v korunách.
+    :return: Dvojice (haléře jako celočíselné float64, maska částek v celých haléřích).
+    """
+    scaled = crowns * HALER_PER_CROWN
+    haler = np.rint(scaled)
+    return haler, np.abs(scaled - haler) <= HALER_TOLERANCE_ULPS * np.spacing(np.abs(scaled))
+
+
+def money_mode(df: pd.DataFrame) -> str:
+    """
+    Vrátí reprezentaci peněžních sloupců DataFrame.
+
+    :param df: Validovaný DataFrame.
+    :return: "haler", pokud jsou částky uloženy v celých haléřích, jinak "float".
+    """
+    return df.attrs.get(MONEY_ATTR, "float")
+
+
+def to_haler(values: pd.Series) -> pd.Series:
+    """
+    Převede částky v korunách na celé haléře (int64).
+
+    :param values: Číselný sloupec s částkami v korunách (nejvýše dvě desetinná místa).
+    :return: Sloupec int64 s částkami v haléřích.
+    :raises ValueError: Pokud sloupec obsahuje chybějící hodnoty, částky s přesností pod haléř
+                        nebo částky mimo přesně reprezentovatelný rozsah.
+    """
+    if pd.api.types.is_integer_dtype(values.dtype):
+        if len(values) and values.abs().max() > MAX_EXACT_CROWNS:
+            raise ValueError(f"Sloupec '{values.name}' obsahuje částky mimo rozsah ±{MAX_EXACT_CROWNS} Kč.")
+        return values.astype(np.int64) * HALER_PER_CROWN
+    crowns = values.to_numpy(dtype=float)
+    if np.isnan(crowns).any():
+        raise ValueError(f"Sloupec '{values.name}' obsahuje chybějící hodnoty, nelze ho převést na haléře.")
+    if len(crowns) and np.abs(crowns).max() > MAX_EXACT_CROWNS:
+        raise ValueError(f"Sloupec '{values.name}' obsahuje částky mimo rozsah ±{MAX_EXACT_CROWNS} Kč.")
+    haler, whole = split_haler(crowns)
+    if not whole.all():
+        raise ValueError(f"Sloupec '{values.name}' obsahuje částky s přesností pod jeden haléř.")
+    return pd.Series(haler.astype(np.int64), index=values.index, name=values.name)
+
+
+def to_crowns(values):
+    """
+    Převede haléře na koruny (float64) pro zobrazení a grafy.
+    Součty se počítají přesně v haléřích, převod je až posledním krokem a dává nejbližší float64.
+
+    :param values: Částky v haléřích (Series nebo pole int64).
+    :return: Částky v korunách.
+    """
+    return values / HALER_PER_CROWN
+
+
+def to_decimal(haler: int) -> Decimal:
+    """
+    Převede částku v haléřích na přesnou částku v korunách.
+
+    :param haler: Částka v haléřích.
+    :return: Decimal se dvěma desetinnými místy, např. Decimal("12.50").
+    """
+    return Decimal(int(haler)).scaleb(-2)
+
+
+def convert_money(df: pd.DataFrame, mode: str) -> pd.DataFrame:
+    """
+    Převede peněžní sloupce validovaného DataFrame na zadanou reprezentaci (na místě).
+    Převod je idempotentní - DataFrame již v cílové reprezentaci (např. načtený z cache) se nemění.
+
+    :param df: Validovaný DataFrame.
+    :param mode: "float" (koruny) nebo "haler" (celé haléře).
+    :return: DataFrame s převedenými peněžními sloupci.
+    """
+    if mode not in MONEY_MODES:
+        raise ValueError(f"Reprezentace částek musí být jedna z hodnot: {', '.join(MONEY_MODES)}.")
+    if money_mode(df) == mode:
+        return df
+    convert = to_haler if mode == "haler" else to_crowns
+    for col in MONEY_COLUMNS:
+        if col in df.columns:
+            df[col] = convert(df[col])
+    df.attrs[MONEY_ATTR] = mode
+    return df
+
+
+def bincount_sum(codes: np.ndarray, values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Sečte hodnoty podle celočíselných kódů skupin jedním průchodem.
+    Celočíselné hodnoty (např. haléře) se sčítají přesně v int64 - np.bincount by je převedl na float64.
+
+    :param codes: Kódy skupin (0 .. length - 1).
+    :param values: Hodnoty ke sečtení.
+    :param length: Počet skupin.
+    :return: Pole součtů (int64 pro celočíselné hodnoty, jinak float64).
+    """
+    if np.issubdtype(values.dtype, np.integer):
+        sums = np.zeros(length, dtype=np.int64)
+        np.add.at(sums, codes, values.astype(np.int64, copy=False))
+        return sums
+    return np.bincount(codes, weights=values, minlength=length)
+
+
+def exact_sums(codes: np.ndarray, values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Sečte float64 hodnoty podle celočíselných kódů skupin přesně, bez zaokrouhlovacích chyb.
+    Každá hodnota se rozloží na celočíselnou mantisu a exponent (np.frexp), mantisy se rozdělí na dvě poloviny
+    a sečtou se podle dvojic (skupina, exponent) přes np.bincount - součty celých čísel do 2 ** 53 jsou ve float64 přesné.
+    Výsledek nezávisí na pořadí sčítání, součty bloků dat lze tedy libovolně slučovat (součet zlomků je opět přesný).
+
+    :param codes: Kódy skupin (0 .. length - 1).
+    :param values: Hodnoty ke sečtení (float64, konečné).
+    :param length: Počet skupin.
+    :return: Pole objektů Fraction s přesnými součty skupin (na float je převede round_sums).
+    :raises ValueError: Pokud hodnoty obsahují NaN nebo nekonečno.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not np.isfinite(values).all():
+        raise ValueError("Přesný součet nelze spočítat z chybějících nebo nekonečných hodnot.")
+    sums = np.array([Fraction(0)] * length, dtype=object)
+    if not len(values):
+        return sums
+    # values = mantissa * 2 ** exponent, celočíselná mantisa má nejvýše 53 bitů
+    mantissa, exponent = np.frexp(values)
+    integer = mantissa * 2.0 ** 53
+    high = np.floor(integer / 2.0 ** 26)
+    low = integer - high * 2.0 ** 26
+    min_exponent = int(exponent.min())
+    width = int(exponent.max()) - min_exponent + 1
+    keys = codes.astype(np.int64) * width + (exponent - min_exponent)
+    high_sums = np.zeros(length * width, dtype=object)
+    low_sums = np.zeros(length * width, dtype=object)
+    for start in range(0, len(values), EXACT_SUM_BLOCK):
+        block = slice(start, start + EXACT_SUM_BLOCK)
+        high_sums += np.bincount(keys[block], weights=high[block], minlength=length * width).astype(np.int64).astype(object)
+        low_sums += np.bincount(keys[block], weights=low[block], minlength=length * width).astype(np.int64).astype(object)
+    # Součet skupiny v celých násobcích 2 ** (min_exponent - 53) (celá čísla Pythonu jsou neomezená)
+    for key in np.flatnonzero((high_sums != 0) | (low_sums != 0)):
+        group, offset = divmod(int(key), width)
+        sums[group] += (high_sums[key] * 2 ** 26 + low_sums[key]) * 2 ** offset
+    scale = Fraction(2) ** (min_exponent - 53)
+    return np.array([Fraction(total) * scale for total in sums], dtype=object)
+
+
+def round_sums(sums) -> np.ndarray:
+    """
+    Převede přesné součty (Fraction z exact_sums) na nejbližší float64.
+
+    :param sums: Přesné součty (pole nebo Series objektů Fraction).
+    :return: Pole float64 se správně zaokrouhlenými součty (stejné jako math.fsum sčítaných hodnot).
+    """
+    return np.array([float(total) for total in sums], dtype=np.float64)
+
+
+def decimal_sums(df: pd.DataFrame, by: str, column: str = "Celková cena") -> Dict[object, Decimal]:
+    """
+    Referenční součty částek podle skupin v aritmetice Decimal (pomalé, pro kontrolu přesných součtů).
+    Každá částka se převede přes svůj nejkratší desetinný zápis, tedy přesně tak, jak byla v souboru.
+
+    :param df: Validovaný DataFrame (částky v korunách nebo v haléřích).
+    :param by: Sloupec se skupinami (např. "Kategorie").
+    :param column: Peněžní sloupec (výchozí "Celková cena").
+    :return: Slovník {skupina: součet v korunách}.
+    """
+    in_haler = money_mode(df) == "haler"
+    sums: Dict[object, Decimal] = {}
+    for key, value in zip(df[by].tolist(), df[column].tolist()):
+        amount = to_decimal(value) if in_haler else Decimal(repr(value))
+        sums[key] = sums.get(key, Decimal(0)) + amount
+    return sums
+
+
+def check_sums(sums: pd.Series, reference: Dict[object, Decimal]) -> Sequence:
+    """
+    Porovná součty v haléřích s referenčními součty Decimal.
+
+    :param sums: Součty v haléřích indexované skupinami.
+    :param reference: Referenční součty v korunách (z decimal_sums).
+    :return: Seznam skupin, jejichž součet se liší (prázdný = všechny součty jsou přesné).
+    """
+    keys = set(sums.index) | set(reference)
+    return sorted((key for key in keys
+                   if key not in reference or key not in sums.index or to_decimal(sums[key]) != reference[key]),
+                  key=str)
@@ -0,0 +1,94 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from .analyzer import AggregateState, StreamingAnalyzer
+from .data_loader import DataLoader
+from .filters import RowFilter
+from .encoding import DEFAULT_CACHE_FILE
+from .paths import DATA_DIR
+from .schema import DtypePlan
+
+
+def resolve_files(pattern: str) -> List[str]:
+    """
+    Najde CSV soubory podle glob vzoru nebo adresáře.
+
+    :param pattern: Glob vzor (např. "pobocky/*.csv") nebo adresář (relativně ke složce 'data').
+    :return: Seřazený seznam absolutních cest k souborům.
+    :raises FileNotFoundError: Pokud vzoru neodpovídá žádný soubor.
+    """
+    path = os.path.join(DATA_DIR, pattern)
+    if os.path.isdir(path):
+        path = os.path.join(path, "*.csv")
+    files = sorted(os.path.abspath(file) for file in glob.glob(path) if os.path.isfile(file))
+    if not files:
+        raise FileNotFoundError(f"Vzoru '{pattern}' neodpovídá žádný soubor.")
+    return files
+
+
+def aggregate_file(file_path: str, chunksize: int = 100_000,
+                   encoding_cache: Optional[str] = DEFAULT_CACHE_FILE, on_error: str = "raise",
+                   row_filter: Optional[RowFilter] = None, dtype_plan: Optional[DtypePlan] = None,
+                   track_cube: bool = False) -> AggregateState:
+    """
+    Načte, zvaliduje a zagreguje jeden soubor (fáze "map"). Spouští se v samostatném procesu.
+
+    :param file_path: Absolutní cesta k CSV souboru.
+    :param chunksize: Počet řádků v jednom bloku.
+    :param encoding_cache: Cesta k cache detekovaných kódování.
+    :param on_error: "raise" nebo "quarantine" (chybné řádky se vyřadí), viz DataLoader.
+    :param row_filter: Filtr řádků uplatněný při načítání (None = všechna data).
+    :param dtype_plan: Datové typy načtených dat, např. částky v haléřích (výchozí: DtypePlan()).
+    :param track_cube: Agregovat i denní agregační kostku (viz AggregateState).
+    :return: Částečné agregace souboru.
+    :raises ValueError: Pokud soubor nelze načíst nebo neprojde validací (s názvem souboru ve zprávě).
+    """
+    loader = DataLoader(file_path, encoding_cache=encoding_cache, on_error=on_error, dtype_plan=dtype_plan)
+    state = AggregateState(track_cube=track_cube)
+    try:
+        for chunk in loader.iter_chunks(chunksize, row_filter=row_filter):
+            state.update(chunk)
+        return state
+    except ValueError as e:
+        raise ValueError(f"{os.path.basename(file_path)}: {e}") from e
+
+
+def analyze_files(pattern: str, workers: Optional[int] = None, chunksize: int = 100_000,
+                  encoding_cache: Optional[str] = DEFAULT_CACHE_FILE, on_error: str = "raise",
+                  row_filter: Optional[RowFilter] = None, dtype_plan: Optional[DtypePlan] = None,
+                  track_cube: bool = False) -> StreamingAnalyzer:
+    """
+    Paralelně zpracuje více souborů v poolu procesů (map-reduce nad agregacemi).
+
+    Každý proces načte a zagreguje celý soubor a vrátí pouze částečné agregace; ty se sloučí
+    v hlavním procesu. Surové řádky se tak nikdy nespojují do jednoho DataFrame.
+    Agregace se slučují v pořadí souborů, takže výsledek nezávisí na počtu procesů.
+
+    :param pattern: Glob vzor nebo adresář (relativně ke složce 'data').
+    :param workers: Počet procesů (výchozí: počet jader CPU).
+    :param chunksize: Počet řádků v jednom bloku při načítání souborů.
+    :param encoding_cache: Cesta k cache detekovaných kódování.
+    :param on_error: "raise" nebo "quarantine" (chybné řádky se vyřadí), viz DataLoader.
+    :param row_filter: Filtr řádků uplatněný při načítání (None = všechna data).
+    :param dtype_plan: Datové typy načtených dat (výchozí: DtypePlan()).
+    :param track_cube: Sloučit i agregační kostky souborů (pro přehledy po obdobích, viz StreamingAnalyzer.cube).
+    :return: StreamingAnalyzer nad sloučenými agregacemi všech souborů.
+    """
+    files = resolve_files(pattern)
+    state = AggregateState(track_cube=track_cube)
+    if workers == 1 or len(files) == 1:
+        for file_path in files:
+            state.merge(aggregate_file(file_path, chunksize, encoding_cache, on_error, row_filter, dtype_plan,
+                                       track_cube))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = executor.map(aggregate_file, files, [chunksize] * len(files),
+                                    [encoding_cache] * len(files), [on_error] * len(files),
+                                    [row_filter] * len(files), [dtype_plan] * len(files),
+                                    [track_cube] * len(files))
+            for partial in partials:
+                state.merge(partial)
+    print(f"Zpracováno {len(files)} souborů ({state.rows} řádků).")
+    return StreamingAnalyzer.from_state(state)
@@ -0,0 +1,26 @@
+import glob
+import os
+
+# Modul nesmí importovat Pandas ani jiné těžké knihovny - používá ho main.py ještě před načtením dat
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def data_path(file_name: str) -> str:
+    """
+    Sestaví cestu k souboru ve složce 'data' (absolutní cesta se použije beze změny).
+
+    :param file_name: Název souboru relativně ke složce 'data'.
+    :return: Cesta k souboru.
+    """
+    return os.path.join(DATA_DIR, file_name)
+
+
+def is_multi_file_pattern(pattern: str) -> bool:
+    """
+    Zjistí, zda zadání odkazuje na více souborů (glob vzor nebo adresář).
+
+    :param pattern: Název souboru, glob vzor nebo adresář (relativně ke složce 'data').
+    :return: True, pokud jde o glob vzor nebo adresář.
+    """
+    return glob.has_magic(pattern) or os.path.isdir(data_path(pattern))
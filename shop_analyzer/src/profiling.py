@@ -0,0 +1,241 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Verze formátu reportu - při nekompatibilní změně struktury je nutné ji zvýšit
+REPORT_VERSION = 1
+
+# Signatura posluchače: (událost, data); události jsou "stage_start", "stage_end" a "info"
+Hook = Callable[[str, dict], None]
+
+
+def current_rss() -> Optional[int]:
+    """
+    Vrátí aktuální velikost rezidentní paměti procesu v bajtech.
+
+    :return: RSS v bajtech, nebo None, pokud ji na dané platformě nelze zjistit.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def max_rss() -> Optional[int]:
+    """
+    Vrátí nejvyšší dosaženou rezidentní paměť procesu od jeho spuštění v bajtech.
+
+    :return: Špičková RSS v bajtech, nebo None, pokud ji na dané platformě nelze zjistit.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux uvádí hodnotu v KiB, macOS v bajtech
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _to_mb(size: Optional[int]) -> Optional[float]:
+    return None if size is None else round(size / 2 ** 20, 1)
+
+
+class PeakMemory:
+    """
+    Měření špičkové paměti (RSS) během bloku kódu pomocí vlákna, které paměť pravidelně vzorkuje.
+    Krátké špičky mezi vzorky nemusí být zachyceny; pro fáze trvající desítky milisekund a déle
+    je výsledek dostatečně přesný.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.start: Optional[int] = None
+        self.peak: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None:
+            self.peak = max(self.peak or 0, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "PeakMemory":
+        self.start = current_rss()
+        self.peak = self.start
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+class Instrumentation:
+    """
+    Třída pro sběr strukturovaných údajů o běhu aplikace.
+
+    Zaznamenává:
+    1. Fáze zpracování (např. detekce kódování, načtení CSV, převod data, analýza, grafy) - celkový čas,
+       počet volání a volitelně špičkovou paměť. Fáze se mohou vnořovat a opakovat (např. pro každý blok).
+    2. Údaje o běhu (detekované kódování, formát data, ...) a čítače (počet řádků, načtené bajty).
+
+    Posluchači registrovaní přes add_hook dostávají události průběžně, report() vrací souhrn
+    vhodný pro uložení jako JSON.
+    """
+
+    def __init__(self, track_memory: bool = False, hooks: Iterable[Hook] = ()):
+        """
+        Inicializuje sběr údajů o běhu.
+
+        :param track_memory: Měřit špičkovou paměť každé fáze (spouští vzorkovací vlákno, výchozí False).
+        :param hooks: Posluchači událostí volaní jako hook(událost, data).
+        """
+        self.track_memory = track_memory
+        self.hooks: List[Hook] = list(hooks)
+        self.stages: Dict[str, dict] = {}
+        self.info: Dict[str, object] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = datetime.now()
+        self._start_time = time.perf_counter()
+
+    def add_hook(self, hook: Hook) -> Hook:
+        """
+        Zaregistruje posluchače událostí (lze použít i jako dekorátor).
+
+        :param hook: Funkce volaná jako hook(událost, data).
+        :return: Zaregistrovaná funkce.
+        """
+        self.hooks.append(hook)
+        return hook
+
+    def _emit(self, event: str, data: dict):
+        for hook in self.hooks:
+            hook(event, data)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Změří fázi zpracování; opakovaná měření stejné fáze se sčítají.
+
+        :param name: Název fáze (např. "detect_encoding", "parse_dates").
+        """
+        self._emit("stage_start", {"stage": name})
+        memory = PeakMemory() if self.track_memory else None
+        if memory:
+            memory.__enter__()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if memory:
+                memory.__exit__(None, None, None)
+            stats = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            stats["seconds"] += elapsed
+            stats["calls"] += 1
+            peak = _to_mb(memory.peak) if memory else None
+            if peak is not None:
+                stats["peak_rss_mb"] = max(stats.get("peak_rss_mb", 0.0), peak)
+            self._emit("stage_end", {"stage": name, "seconds": elapsed, "peak_rss_mb": peak})
+
+    def timed_iter(self, iterable: Iterable, name: str) -> Iterator:
+        """
+        Prochází iterátor a čas získání každé položky započítá do fáze (např. čtení bloků CSV).
+
+        :param iterable: Iterovatelný objekt.
+        :param name: Název fáze.
+        :return: Iterátor se stejnými položkami.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def set_info(self, key: str, value):
+        """
+        Zaznamená údaj o běhu (např. detekované kódování).
+
+        :param key: Název údaje.
+        :param value: Hodnota serializovatelná do JSON.
+        """
+        self.info[key] = value
+        self._emit("info", {"key": key, "value": value})
+
+    def count(self, key: str, value: int):
+        """
+        Přičte hodnotu k čítači (např. počet řádků nebo načtených bajtů).
+
+        :param key: Název čítače.
+        :param value: Přičítaná hodnota.
+        """
+        self.counters[key] = self.counters.get(key, 0) + int(value)
+
+    def report(self) -> dict:
+        """
+        Vrátí souhrn běhu ve formátu vhodném pro uložení jako JSON.
+
+        :return: Slovník s celkovým časem, špičkovou pamětí procesu, údaji, čítači a fázemi.
+        """
+        return {
+            "version": REPORT_VERSION,
+            "started": self.started.isoformat(timespec="seconds"),
+            "total_seconds": time.perf_counter() - self._start_time,
+            "peak_rss_mb": _to_mb(max_rss()),
+            "info": dict(self.info),
+            "counters": dict(self.counters),
+            "stages": {name: dict(stats) for name, stats in self.stages.items()},
+        }
+
+    def write_report(self, file_path: str) -> str:
+        """
+        Uloží souhrn běhu jako JSON.
+
+        :param file_path: Cesta k výstupnímu souboru.
+        :return: Cesta k uloženému souboru.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2, default=str)
+        return file_path
+
+
+@contextmanager
+def cprofile_to(file_path: Optional[str]) -> Iterator[Optional[cProfile.Profile]]:
+    """
+    Spustí cProfile pro blok kódu a výsledek uloží do souboru (čitelného např. modulem pstats).
+
+    :param file_path: Cesta k výstupnímu souboru; None = profilování vypnuto.
+    """
+    if not file_path:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        profiler.dump_stats(file_path)
@@ -0,0 +1,210 @@
+import mmap
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW_CSV = True
+except ImportError:
+    HAS_PYARROW_CSV = False
+
+CSV_ENGINES = ("auto", "pyarrow", "pandas")
+
+# Hodnoty, které pd.read_csv ve výchozím nastavení považuje za chybějící - parser pyarrow je používá také,
+# aby obě cesty načetly soubor stejně
+NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+             "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+# Velikost úvodního bloku, ze kterého se čte hlavička (názvy sloupců, oddělovač)
+HEADER_BLOCK_SIZE = 64 * 1024
+
+
+class MappedFile:
+    """
+    Soubor namapovaný do paměti (mmap) jen pro čtení.
+
+    Stejný buffer sdílí detekce kódování (vzorky), detekce oddělovače (hlavička) i parser pyarrow,
+    takže se soubor neotevírá a nekopíruje přes Python pro každou fázi zvlášť.
+    Prázdný soubor (který nelze namapovat) je reprezentován prázdným bufferem.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        :param file_path: Cesta k souboru.
+        :raises FileNotFoundError: Pokud soubor neexistuje.
+        """
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    def header(self, encoding: str) -> str:
+        """
+        Vrátí první řádek souboru dekódovaný zadaným kódováním (neplatné znaky se nahradí).
+
+        :param encoding: Kódování souboru.
+        :return: Text hlavičky bez znaku konce řádku.
+        """
+        text = self.data[:HEADER_BLOCK_SIZE].decode(encoding, errors="replace")
+        return text.split("\n", 1)[0].rstrip("\r")
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            try:
+                self.data.close()
+            except BufferError:
+                # Na buffer ještě odkazuje jiný objekt (např. traceback výjimky) - uvolní ho garbage collector
+                pass
+        self._file.close()
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _arrow_encoding(encoding: str) -> str:
+    # Jen přesně "utf8" čte pyarrow přímo bez překódování přes Python kodek
+    return "utf8" if encoding.lower().replace("-", "").replace("_", "") == "utf8" else encoding
+
+
+# Přesnost převodu textu na float v pd.read_csv - výchozí parser pandas se v posledním bitu odchyluje od
+# správně zaokrouhlené hodnoty, kterou vrací pyarrow (i float() v Pythonu)
+FLOAT_PRECISION = "round_trip"
+
+# Počet úvodních hodnot, na kterých se převod typu vyzkouší před převodem celého sloupce
+INFER_SAMPLE_ROWS = 1000
+
+# Hodnoty, které pd.read_csv převádí na int64 a float64 (mezery okolo čísla ignoruje)
+INT_PATTERN = r"^\s*[+-]?[0-9]+\s*$"
+FLOAT_PATTERN = r"^\s*[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?\s*$"
+# Hodnoty, které by pd.read_csv mohl převést na číslo nebo bool (včetně nekonečen) - sloupec s jinou
+# hodnotou zůstane v pd.read_csv textový
+CONVERTIBLE_PATTERN = r"(?i)^\s*([+-]?([0-9]*\.?[0-9]*(e[+-]?[0-9]+)?|inf|infinity)|true|false)\s*$"
+
+
+def _all(values: "pa.ChunkedArray") -> bool:
+    # Chybějící hodnoty podmínku nesplňují ani neporušují
+    return pc.all(values).as_py() is not False
+
+
+def _try_cast(values: "pa.ChunkedArray", target: "pa.DataType") -> Optional["pa.ChunkedArray"]:
+    try:
+        return pc.cast(values, target)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+
+
+def _same_as_pandas(column: "pa.ChunkedArray", converted: "pa.ChunkedArray") -> bool:
+    """Ověří, že přímý převod pyarrow nepřijal hodnoty, které pd.read_csv nechá jako text."""
+    if pa.types.is_integer(converted.type):
+        # Šestnáctková čísla ("0x10") převádí na celé číslo jen pyarrow
+        return not any(pc.any(pc.match_substring(column, x)).as_py() for x in "xX")
+    # Přetečení ("1e400") je v pyarrow nekonečno, v pd.read_csv text
+    return _all(pc.is_finite(converted))
+
+
+def _infer_column(column: "pa.ChunkedArray") -> "pa.ChunkedArray":
+    """
+    Převede textový sloupec na int64 nebo float64 stejně jako odvození typů v pd.read_csv:
+    celá čísla -> int64, čísla -> float64, jinak text (mezery okolo čísla a znaménko "+" se ignorují).
+    Převod se nejprve zkusí na úvodních hodnotách - pokud selže na nich, selhal by i na celém
+    sloupci; textový sloupec se tak pozná bez procházení všech hodnot.
+
+    :raises pa.ArrowInvalid: Pokud by pd.read_csv sloupec převedl jinak (bool, nekonečna, celá čísla mimo
+                             rozsah int64, ...) - volající pak soubor načte přes pd.read_csv.
+    """
+    sample = column.slice(0, INFER_SAMPLE_ROWS)
+    if not _all(pc.match_substring_regex(sample, CONVERTIBLE_PATTERN)):
+        return column
+    for target in (pa.int64(), pa.float64()):
+        if _try_cast(sample, target) is None:
+            continue
+        converted = _try_cast(column, target)
+        if converted is None or not _same_as_pandas(column, converted):
+            break
+        if pa.types.is_integer(target) or not _all(pc.equal(pc.floor(converted), converted)):
+            return converted
+        # Samá celá čísla, která pyarrow nepřevedl na int64 (znaménko "+", mezery, přetečení),
+        # jsou v pd.read_csv int64 nebo text
+        break
+    # Mezery okolo čísel, znaménko "+" nebo hodnoty, které pyarrow převádí jinak než pd.read_csv
+    for target, pattern in ((pa.int64(), INT_PATTERN), (pa.float64(), FLOAT_PATTERN)):
+        if _all(pc.match_substring_regex(column, pattern)):
+            numbers = pc.replace_substring_regex(pc.utf8_trim_whitespace(column), r"^\+", "")
+            converted = _try_cast(numbers, target)
+            if converted is None or not _same_as_pandas(numbers, converted):
+                raise pa.ArrowInvalid("Čísla mimo rozsah int64 nebo float64.")
+            return converted
+    if not _all(pc.match_substring_regex(column, CONVERTIBLE_PATTERN)):
+        return column
+    raise pa.ArrowInvalid("Typ sloupce odvodí jen pd.read_csv.")
+
+
+def read_csv_arrow(data, encoding: str, sep: str) -> pd.DataFrame:
+    """
+    Načte CSV z bufferu vícevláknovým parserem pyarrow bez kopírování vstupních bajtů.
+    Všechny sloupce se nejprve načtou jako text a číselné typy se odvodí stejně jako v pd.read_csv,
+    aby výsledek nezávisel na zvoleném parseru (pyarrow by jinak např. sám převáděl ISO data).
+
+    :param data: Buffer se souborem (mmap nebo bytes).
+    :param encoding: Kódování souboru.
+    :param sep: Oddělovač sloupců.
+    :return: DataFrame se stejnými sloupci, typy a hodnotami jako pd.read_csv.
+    :raises pa.ArrowInvalid: Pokud soubor nelze načíst (volající přejde na pd.read_csv).
+    """
+    buffer = pa.py_buffer(data)
+    read_options = pa_csv.ReadOptions(encoding=_arrow_encoding(encoding), use_threads=True)
+    parse_options = pa_csv.ParseOptions(delimiter=sep)
+    # Názvy sloupců z prvního bloku (pro vynucení textových typů)
+    with pa_csv.open_csv(pa.BufferReader(buffer), parse_options=parse_options,
+                         read_options=pa_csv.ReadOptions(encoding=read_options.encoding,
+                                                         block_size=HEADER_BLOCK_SIZE)) as reader:
+        names = reader.schema.names
+    if len(set(names)) != len(names):
+        # Duplicitní názvy sloupců přejmenovává jen pd.read_csv
+        raise pa.ArrowInvalid("Duplicitní názvy sloupců.")
+    convert_options = pa_csv.ConvertOptions(column_types={name: pa.string() for name in names},
+                                            null_values=NA_VALUES, strings_can_be_null=True)
+    table = pa_csv.read_csv(pa.BufferReader(buffer), read_options=read_options, parse_options=parse_options,
+                            convert_options=convert_options)
+    if table.num_rows:
+        # Soubor jen s hlavičkou má v pd.read_csv textové (object) sloupce
+        table = pa.table({name: _infer_column(table[name]) for name in names})
+    df = table.to_pandas()
+    for name in names:
+        if pa.types.is_string(table.schema.field(name).type) and table[name].null_count:
+            # Chybějící text je v pd.read_csv NaN, pyarrow vrací None
+            df[name] = df[name].where(df[name].notna(), np.nan)
+    return df
+
+
+def read_csv_mapped(mapped: MappedFile, encoding: str, sep: str, engine: str = "auto") -> Tuple[pd.DataFrame, str]:
+    """
+    Načte namapovaný CSV soubor parserem pyarrow, nebo (bez pyarrow či při chybě) přes pd.read_csv.
+
+    :param mapped: Namapovaný soubor.
+    :param encoding: Kódování souboru.
+    :param sep: Oddělovač sloupců.
+    :param engine: "auto" (pyarrow, pokud je k dispozici), "pyarrow" nebo "pandas".
+    :return: Dvojice (DataFrame, použitý parser "pyarrow" nebo "pandas").
+    :raises pd.errors.EmptyDataError: Pokud je soubor prázdný.
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"engine musí být jedna z hodnot: {', '.join(CSV_ENGINES)}.")
+    if mapped.size == 0:
+        raise pd.errors.EmptyDataError("No columns to parse from file")
+    if engine != "pandas" and HAS_PYARROW_CSV:
+        try:
+            return read_csv_arrow(mapped.data, encoding, sep), "pyarrow"
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, UnicodeDecodeError):
+            # Soubory, které pyarrow nenačte stejně (chybné řádky, neplatné znaky, ...), zpracuje
+            # pd.read_csv se stejnými chybami a hlášeními jako dosud
+            pass
+    return pd.read_csv(mapped.file_path, encoding=encoding, sep=sep, float_precision=FLOAT_PRECISION), "pandas"
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from .cache import HAS_PYARROW
+from .money import MONEY_MODES, convert_money
+
+# Textové sloupce s malým počtem různých hodnot (kategorie a názvy položek)
+TEXT_COLUMNS = ["Položka", "Kategorie"]
+
+# Celočíselné sloupce a nejužší typ, do kterého se běžná data vejdou
+INTEGER_COLUMNS = {"Množství": "int16"}
+
+TEXT_DTYPES = ("category", "string[pyarrow]", "object")
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """
+    Vrátí skutečnou paměťovou náročnost DataFrame v bajtech (včetně textových hodnot).
+
+    :param df: DataFrame.
+    :return: Počet bajtů.
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+
+def format_memory(size: int) -> str:
+    """Naformátuje počet bajtů jako kB nebo MB s jedním desetinným místem."""
+    if size < 2 ** 20:
+        return f"{size / 2 ** 10:.1f} kB"
+    return f"{size / 2 ** 20:.1f} MB"
+
+
+class DtypePlan:
+    """
+    Deklarované datové typy načítaných dat pro úsporu paměti.
+
+    - Textové sloupce ('Položka', 'Kategorie') se po validaci převedou na kategorie (jeden malý celočíselný
+      kód na řádek místo Python objektu), případně na řetězce uložené v Arrow (string[pyarrow]).
+      Převod až po načtení je záměrný - parser Pandas s dtype="category" má vyšší špičku paměti
+      než čtení objektových řetězců.
+    - Celočíselné sloupce ('Množství') se po validaci zúží (int16), pokud se hodnoty do typu vejdou.
+    - Peněžní sloupce zůstávají float64 - float32 má jen asi 7 platných číslic a součty by nebyly přesné
+      na haléře. V režimu money="haler" se uloží jako celé haléře (int64), takže všechny součty jsou přesné
+      a na koruny se převádějí až výsledky pro zobrazení.
+    """
+
+    def __init__(self, text_dtype: str = "category", narrow_integers: bool = True, money: str = "float"):
+        """
+        Inicializuje plán datových typů.
+
+        :param text_dtype: "category" (výchozí), "string[pyarrow]" (vyžaduje pyarrow) nebo "object" (bez úspory).
+        :param narrow_integers: Zúžit celočíselné sloupce podle INTEGER_COLUMNS.
+        :param money: Reprezentace peněžních sloupců - "float" (koruny, výchozí) nebo "haler" (int64 haléře).
+        """
+        if text_dtype not in TEXT_DTYPES:
+            raise ValueError(f"text_dtype musí být jedna z hodnot: {', '.join(TEXT_DTYPES)}.")
+        if money not in MONEY_MODES:
+            raise ValueError(f"money musí být jedna z hodnot: {', '.join(MONEY_MODES)}.")
+        if text_dtype == "string[pyarrow]" and not HAS_PYARROW:
+            print("Varování: knihovna pyarrow není nainstalována, textové sloupce se uloží jako kategorie.")
+            text_dtype = "category"
+        self.text_dtype = text_dtype
+        self.narrow_integers = narrow_integers
+        self.money = money
+
+    @classmethod
+    def unoptimized(cls) -> "DtypePlan":
+        """Vrátí plán bez úprav typů (výchozí typy Pandas, např. pro porovnání paměti)."""
+        return cls(text_dtype="object", narrow_integers=False)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Převede sloupce validovaného DataFrame na deklarované typy.
+
+        :param df: Validovaný DataFrame.
+        :return: DataFrame s úspornými typy (sloupce se mění na místě).
+        """
+        if self.text_dtype != "object":
+            for col in TEXT_COLUMNS:
+                if col in df.columns and str(df[col].dtype) != self.text_dtype:
+                    df[col] = df[col].astype(self.text_dtype)
+        if self.narrow_integers:
+            for col, dtype in INTEGER_COLUMNS.items():
+                if col not in df.columns or not pd.api.types.is_integer_dtype(df[col]) or df[col].empty:
+                    continue
+                limits = np.iinfo(dtype)
+                # Hodnoty mimo rozsah úzkého typu se ponechají v původním typu
+                if limits.min <= df[col].min() and df[col].max() <= limits.max:
+                    df[col] = df[col].astype(dtype)
+        return convert_money(df, self.money)
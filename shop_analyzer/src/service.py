@@ -0,0 +1,455 @@
+"""
+Dlouhodobě běžící služba Shop Analyzer: validovaná data a jejich agregace zůstávají v paměti
+a dotazy (metriky Analyzer, výdaje po obdobích, grafy) se obsluhují přes lokální HTTP
+nebo Unix socket bez opakovaného importu knihoven, detekce kódování a parsování CSV.
+
+Spuštění (ze složky shop_analyzer):
+    python -m src.service --port 8765
+    python -m src.service --socket /tmp/shop_analyzer.sock
+
+Dotazy:
+    GET /datasets                                  seznam CSV souborů a načtených datových sad
+    GET /datasets/<soubor>/<metrika>?n=5           monthly_expenses, category_analysis, top_items
+    GET /datasets/<soubor>/expenses?granularity=quarter&by_category=1
+    GET /datasets/<soubor>/charts/<graf>.png       monthly_expenses, category_analysis, top_items
+    GET /stats                                     zásahy cache výsledků a verze datových sad
+Všechny dotazy na data přijímají filtr from, to, category a item (category a item i opakovaně).
+"""
+import argparse
+import json
+import os
+import socketserver
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pandas as pd
+
+from .analyzer import Analyzer, METRICS
+from .cube import GRANULARITIES
+from .data_loader import DataLoader
+from .filters import RowFilter
+from .visualizer import CHARTS, content_hash, render_png
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+# Výchozí počet výsledků držených v LRU cache služby
+DEFAULT_CACHE_SIZE = 256
+
+# Interval kontroly změn souborů v adresáři s daty (v sekundách)
+DEFAULT_WATCH_INTERVAL = 2.0
+
+
+class LRUCache:
+    """
+    Cache výsledků s omezeným počtem položek; při zaplnění se zahodí nejdéle nepoužitá položka.
+    Bezpečná pro souběžné použití z více vláken.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CACHE_SIZE):
+        """
+        :param capacity: Maximální počet uložených výsledků.
+        """
+        if capacity <= 0:
+            raise ValueError("Kapacita cache musí být kladné číslo.")
+        self.capacity = capacity
+        self._items: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        """
+        Vrátí uložený výsledek pro klíč, nebo ho spočítá a uloží.
+        Výpočet probíhá mimo zámek, takže pomalý dotaz neblokuje ostatní.
+
+        :param key: Klíč výsledku (musí zahrnovat verzi dat, aby se po změně souboru nepoužil starý výsledek).
+        :param compute: Funkce bez parametrů, která výsledek spočítá.
+        :return: Výsledek.
+        """
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        return {"size": len(self), "capacity": self.capacity, "hits": self.hits, "misses": self.misses}
+
+
+def _file_signature(file_path: str) -> Tuple[int, int]:
+    """Vrátí (velikost, čas změny v ns) souboru, podle kterých se pozná jeho změna."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class Dataset:
+    """Validovaná data jednoho souboru držená v paměti spolu s Analyzer (a jeho agregační kostkou)."""
+
+    def __init__(self, name: str, file_path: str, version: int, use_cache: bool = True):
+        """
+        Načte a zvaliduje soubor.
+
+        :param name: Název souboru relativní k adresáři s daty.
+        :param file_path: Absolutní cesta k souboru.
+        :param version: Pořadové číslo načtení (zvyšuje se při každém znovunačtení souboru).
+        :param use_cache: Použít sloupcovou cache validovaných dat.
+        """
+        self.name = name
+        self.version = version
+        self.signature = _file_signature(file_path)
+        self.loader = DataLoader(file_path)
+        self.analyzer = Analyzer(self.loader.load_validated(use_cache=use_cache))
+
+    @property
+    def rows(self) -> int:
+        return len(self.analyzer.data)
+
+    def analyzer_for(self, row_filter: Optional[RowFilter]) -> Analyzer:
+        """Vrátí Analyzer nad všemi daty, nebo nad řádky vyhovujícími filtru."""
+        if row_filter is None or row_filter.is_empty:
+            return self.analyzer
+        return Analyzer(self.analyzer.data, row_filter=row_filter)
+
+
+class DatasetRegistry:
+    """
+    Datové sady načtené z adresáře s daty. Soubor se načte při prvním dotazu a zůstává v paměti;
+    metoda refresh znovu načte změněné soubory a zapomene smazané.
+
+    Načítání probíhá mimo zámek registru, takže pomalé první načtení jednoho souboru neblokuje dotazy
+    na ostatní (již načtené) datové sady. Souběžné dotazy na stejný soubor počkají na jediné načtení.
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, use_cache: bool = True):
+        """
+        :param data_dir: Adresář s CSV soubory.
+        :param use_cache: Použít sloupcovou cache validovaných dat při načítání.
+        """
+        self.data_dir = os.path.abspath(data_dir)
+        self.use_cache = use_cache
+        self._datasets: Dict[str, Dataset] = {}
+        self._versions: Dict[str, int] = {}
+        # Rozpracovaná první načtení {název: Future s datovou sadou}
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+
+    def _path(self, name: str) -> str:
+        file_path = os.path.abspath(os.path.join(self.data_dir, name))
+        if os.path.commonpath([file_path, self.data_dir]) != self.data_dir:
+            raise ValueError(f"Soubor '{name}' leží mimo adresář s daty.")
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"Soubor '{name}' nebyl nalezen.")
+        return file_path
+
+    def available(self) -> list:
+        """Vrátí seřazené názvy CSV souborů v adresáři s daty."""
+        return sorted(name for name in os.listdir(self.data_dir) if name.lower().endswith(".csv"))
+
+    def get(self, name: str) -> Dataset:
+        """
+        Vrátí datovou sadu; při prvním dotazu soubor načte a zvaliduje.
+
+        :param name: Název CSV souboru v adresáři s daty.
+        :raises FileNotFoundError: Pokud soubor neexistuje.
+        :raises ValueError: Pokud cesta vede mimo adresář s daty nebo data neprojdou validací.
+        """
+        with self._lock:
+            dataset = self._datasets.get(name)
+            if dataset is not None:
+                return dataset
+            future = self._loading.get(name)
+            loading_elsewhere = future is not None
+            if not loading_elsewhere:
+                future = self._loading[name] = Future()
+                version = self._versions.get(name, 0) + 1
+        if loading_elsewhere:
+            # Soubor právě načítá jiné vlákno - počká se na jeho výsledek
+            return future.result()
+        return self._load(name, version, future)
+
+    def _load(self, name: str, version: int, future: Future) -> Dataset:
+        """Načte datovou sadu mimo zámek a výsledek (nebo chybu) předá i čekajícím dotazům."""
+        try:
+            dataset = Dataset(name, self._path(name), version, use_cache=self.use_cache)
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(name, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._versions[name] = max(self._versions.get(name, 0), version)
+            self._datasets[name] = dataset
+            self._loading.pop(name, None)
+        future.set_result(dataset)
+        return dataset
+
+    def refresh(self) -> list:
+        """
+        Zkontroluje načtené soubory: změněné znovu načte, smazané zapomene.
+        Do dokončení načtení se dotazy obsluhují z předchozí verze dat.
+
+        :return: Názvy znovu načtených nebo zapomenutých datových sad.
+        """
+        with self._lock:
+            loaded = list(self._datasets.items())
+        changed = []
+        for name, dataset in loaded:
+            file_path = os.path.join(self.data_dir, name)
+            if not os.path.exists(file_path):
+                with self._lock:
+                    self._datasets.pop(name, None)
+                print(f"Soubor '{name}' byl odstraněn, data byla uvolněna.")
+                changed.append(name)
+                continue
+            if _file_signature(file_path) == dataset.signature:
+                continue
+            try:
+                reloaded = Dataset(name, file_path, dataset.version + 1, use_cache=self.use_cache)
+            except (FileNotFoundError, ValueError) as e:
+                # Rozpracovaný nebo chybný soubor - ponechají se poslední platná data
+                print(f"Soubor '{name}' se změnil, ale nelze ho načíst: {e}")
+                continue
+            with self._lock:
+                self._versions[name] = max(self._versions.get(name, 0), reloaded.version)
+                self._datasets[name] = reloaded
+            print(f"Soubor '{name}' se změnil, data byla znovu načtena (verze {reloaded.version}).")
+            changed.append(name)
+        return changed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: {"version": dataset.version, "rows": dataset.rows}
+                    for name, dataset in self._datasets.items()}
+
+
+class DirectoryWatcher:
+    """Vlákno, které v pravidelném intervalu volá DatasetRegistry.refresh (kontrola velikosti a času změny)."""
+
+    def __init__(self, registry: DatasetRegistry, interval: float = DEFAULT_WATCH_INTERVAL):
+        self.registry = registry
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="shop-analyzer-watcher", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.registry.refresh()
+
+    def start(self) -> "DirectoryWatcher":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _frame_to_records(df: pd.DataFrame) -> list:
+    """Převede výsledný DataFrame na seznam záznamů pro JSON (období a kategorie jako text)."""
+    records = df.copy()
+    for col in records.columns:
+        if not pd.api.types.is_numeric_dtype(records[col]):
+            records[col] = records[col].astype(str)
+    return records.to_dict(orient="records")
+
+
+class AnalyzerService:
+    """
+    Dotazy nad datovými sadami v paměti s LRU cache výsledků.
+    Klíč výsledku obsahuje verzi datové sady, takže po znovunačtení souboru se staré výsledky nepoužijí.
+    """
+
+    def __init__(self, registry: DatasetRegistry, cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        :param registry: Datové sady v paměti.
+        :param cache_size: Maximální počet výsledků v LRU cache.
+        """
+        self.registry = registry
+        self.cache = LRUCache(cache_size)
+
+    @staticmethod
+    def _filter(params: Dict[str, list]) -> Tuple[Optional[RowFilter], tuple]:
+        """Sestaví filtr řádků z parametrů dotazu a jeho klíč pro cache."""
+        start = params.get("from", [None])[-1]
+        end = params.get("to", [None])[-1]
+        categories = tuple(sorted(params.get("category", [])))
+        items = tuple(sorted(params.get("item", [])))
+        row_filter = RowFilter(start, end, categories, items)
+        if row_filter.is_empty:
+            return None, ()
+        return row_filter, (str(row_filter.start), str(row_filter.end), categories, items)
+
+    def query(self, name: str, metric: str, params: Optional[Dict[str, list]] = None) -> pd.DataFrame:
+        """
+        Vrátí výsledek metriky pro datovou sadu (z cache, pokud byl již spočítán).
+
+        :param name: Název CSV souboru v adresáři s daty.
+        :param metric: Jedna z METRICS nebo "expenses" (výdaje po obdobích z agregační kostky).
+        :param params: Parametry dotazu ve formátu parse_qs (n, granularity, by_category, from, to, category, item).
+        :return: DataFrame s výsledkem.
+        :raises ValueError: Pokud metrika nebo parametry nejsou platné.
+        """
+        params = params or {}
+        if metric not in METRICS and metric != "expenses":
+            raise ValueError(f"Neznámá metrika '{metric}'. Povolené metriky: {', '.join(METRICS)}, expenses.")
+        n = int(params.get("n", ["5"])[-1])
+        granularity = params.get("granularity", ["month"])[-1]
+        if metric == "expenses" and granularity not in GRANULARITIES:
+            raise ValueError(f"Neznámá granularita '{granularity}'. Povolené hodnoty: {', '.join(GRANULARITIES)}.")
+        by_category = params.get("by_category", ["0"])[-1].lower() in ("1", "true", "yes")
+        row_filter, filter_key = self._filter(params)
+        dataset = self.registry.get(name)
+
+        def compute() -> pd.DataFrame:
+            analyzer = dataset.analyzer_for(row_filter)
+            if metric == "expenses":
+                return analyzer.calculate_expenses(granularity, by_category=by_category)
+            return analyzer.compute_all(n=n, metrics=[metric])[metric]
+
+        options = (granularity, by_category) if metric == "expenses" else (n,)
+        return self.cache.get_or_compute((name, dataset.version, metric, options, filter_key), compute)
+
+    def chart(self, name: str, chart: str, params: Optional[Dict[str, list]] = None) -> bytes:
+        """
+        Vrátí PNG graf metriky. Graf se vykreslí do paměti (nic se nezapisuje na disk)
+        a drží se jen v LRU cache výsledků.
+
+        :param name: Název CSV souboru v adresáři s daty.
+        :param chart: Typ grafu (klíč CHARTS).
+        :param params: Parametry dotazu jako u query.
+        :return: Obsah PNG souboru.
+        """
+        if chart not in CHARTS:
+            raise ValueError(f"Neznámý graf '{chart}'. Povolené grafy: {', '.join(CHARTS)}.")
+        result = self.query(name, chart, params)
+
+        # Klíčem je otisk agregace - stejná data dávají stejný graf i po znovunačtení souboru
+        return self.cache.get_or_compute(("chart", chart, content_hash(result)), lambda: render_png(chart, result))
+
+    def stats(self) -> dict:
+        return {"cache": self.cache.stats(), "datasets": self.registry.stats()}
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """Obsluha HTTP požadavků služby; instance AnalyzerService je atributem serveru."""
+
+    server_version = "ShopAnalyzer/1.0"
+
+    def address_string(self) -> str:
+        # Unix socket nemá adresu klienta
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload, status: HTTPStatus = HTTPStatus.OK):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def do_GET(self):
+        service: AnalyzerService = self.server.service
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        try:
+            if parts == ["datasets"]:
+                self._send_json({"available": service.registry.available(), "loaded": service.registry.stats()})
+            elif parts == ["stats"]:
+                self._send_json(service.stats())
+            elif len(parts) == 4 and parts[0] == "datasets" and parts[2] == "charts":
+                chart = parts[3][:-4] if parts[3].endswith(".png") else parts[3]
+                self._send(HTTPStatus.OK, service.chart(parts[1], chart, params), "image/png")
+            elif len(parts) == 3 and parts[0] == "datasets":
+                self._send_json(_frame_to_records(service.query(parts[1], parts[2], params)))
+            else:
+                self._send_json({"error": f"Neznámá cesta '{url.path}'."}, HTTPStatus.NOT_FOUND)
+        except FileNotFoundError as e:
+            self._send_json({"error": str(e)}, HTTPStatus.NOT_FOUND)
+        except ValueError as e:
+            self._send_json({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+        except Exception as e:
+            # Neočekávaná chyba nesmí ukončit spojení bez odpovědi - zaloguje se a klient dostane 500
+            self.log_error("Chyba při zpracování %s:\n%s", self.path, traceback.format_exc())
+            self._send_json({"error": f"Interní chyba služby: {e}"}, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server naslouchající na Unix socketu (každý požadavek ve vlastním vlákně)."""
+
+    daemon_threads = True
+
+
+def create_server(service: AnalyzerService, host: str = "127.0.0.1", port: int = 8765,
+                  socket_path: Optional[str] = None) -> socketserver.BaseServer:
+    """
+    Vytvoří server služby na TCP portu, nebo na Unix socketu, je-li zadán socket_path.
+
+    :param service: Služba obsluhující dotazy.
+    :param host: Adresa pro TCP (výchozí jen lokální 127.0.0.1).
+    :param port: TCP port (0 = libovolný volný port).
+    :param socket_path: Cesta k Unix socketu (existující soubor socketu se nahradí).
+    :return: Server připravený pro serve_forever().
+    """
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, ServiceRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shop Analyzer - služba s daty v paměti.")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresa pro TCP (výchozí 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (výchozí 8765).")
+    parser.add_argument("--socket", default=None, metavar="CESTA", help="Naslouchat na Unix socketu místo TCP.")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Adresář s CSV soubory.")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Maximální počet výsledků v LRU cache.")
+    parser.add_argument("--watch-interval", type=float, default=DEFAULT_WATCH_INTERVAL,
+                        help="Interval kontroly změn souborů v sekundách (0 = nesledovat).")
+    parser.add_argument("--preload", nargs="*", default=(), metavar="SOUBOR",
+                        help="Soubory, které se načtou hned při spuštění.")
+    args = parser.parse_args()
+
+    registry = DatasetRegistry(args.data_dir)
+    for name in args.preload:
+        registry.get(name)
+    service = AnalyzerService(registry, cache_size=args.cache_size)
+    server = create_server(service, args.host, args.port, args.socket)
+    watcher = DirectoryWatcher(registry, args.watch_interval).start() if args.watch_interval > 0 else None
+    print(f"Služba naslouchá na {args.socket or f'http://{args.host}:{server.server_address[1]}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
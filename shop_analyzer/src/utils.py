@@ -0,0 +1,101 @@
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Podporované formáty data seřazené podle priority (při shodném počtu úspěšně převedených hodnot vyhrává dřívější)
+DATE_FORMATS = [
+    "%d.%m.%Y",
+    "%d. %m. %Y",
+    "%d.%m.%y",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+]
+
+
+def detect_date_format(values: pd.Series, sample_size: int = 1000,
+                       formats: Sequence[str] = DATE_FORMATS) -> Optional[str]:
+    """
+    Detekuje převládající formát data ze vzorku hodnot.
+
+    Vzorek je rovnoměrně rozložen po celém sloupci, takže zachytí i data seřazená podle času.
+
+    :param values: Sloupec s textovými hodnotami data.
+    :param sample_size: Maximální počet hodnot ve vzorku (výchozí 1000).
+    :param formats: Kandidátní formáty (výchozí DATE_FORMATS).
+    :return: Formát, který převede nejvíce hodnot ze vzorku, nebo None, pokud žádný nevyhovuje.
+    """
+    if values.empty:
+        return None
+    positions = np.unique(np.linspace(0, len(values) - 1, min(sample_size, len(values))).astype(int))
+    sample = values.iloc[positions].dropna().astype(str).str.strip()
+    if sample.empty:
+        return None
+
+    best_format, best_count = None, 0
+    for fmt in formats:
+        count = pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum()
+        if count > best_count:
+            best_format, best_count = fmt, count
+            if count == len(sample):
+                break
+    return best_format
+
+
+def parse_dates(values: pd.Series, date_format: Optional[str] = None) -> Tuple[pd.Series, pd.Index]:
+    """
+    Převede sloupec s daty na datetime64 s explicitním formátem (vektorizovaně).
+
+    Hodnoty, které převládajícímu formátu neodpovídají, se zkusí převést obecným parserem
+    (s preferencí DD.MM.YYYY) - ten se tak spouští jen na malé části dat.
+
+    :param values: Sloupec s textovými hodnotami data.
+    :param date_format: Formát data; pokud není zadán, detekuje se pomocí detect_date_format.
+    :return: Dvojice (převedený sloupec s NaT u neplatných hodnot, index neplatných řádků).
+    """
+    if date_format is None:
+        date_format = detect_date_format(values)
+    if date_format is not None:
+        parsed = pd.to_datetime(values, format=date_format, errors="coerce")
+    else:
+        parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+
+    failed = parsed.isna()
+    if failed.any():
+        parsed.loc[failed] = pd.to_datetime(values[failed], format="mixed", dayfirst=True, errors="coerce")
+        failed = parsed.isna()
+    return parsed, values.index[failed.to_numpy()]
+
+
+def parse_decimal(values: pd.Series) -> pd.Series:
+    """
+    Převede sloupec na čísla včetně českého zápisu s desetinnou čárkou a mezerami mezi tisíci
+    (např. "1 234,50"). Číselné sloupce se vrátí beze změny.
+
+    :param values: Sloupec s čísly nebo jejich textovým zápisem.
+    :return: Číselný sloupec s NaN u hodnot, které nejsou číslem.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values
+    text = values.astype(str).str.replace(r"[\s\u00a0]", "", regex=True).str.replace(",", ".", regex=False)
+    return pd.to_numeric(text.where(values.notna()), errors="coerce")
+
+
+def format_row_indices(indices: Sequence, limit: int = 10) -> str:
+    """
+    Naformátuje seznam indexů řádků pro chybové hlášení (nejvýše limit hodnot).
+
+    :param indices: Indexy řádků.
+    :param limit: Maximální počet vypsaných indexů.
+    :return: Text se seznamem indexů, např. "3, 17, 42 (a dalších 5)".
+    """
+    indices = list(indices)
+    text = ", ".join(str(i) for i in indices[:limit])
+    if len(indices) > limit:
+        text += f" (a dalších {len(indices) - limit})"
+    return text
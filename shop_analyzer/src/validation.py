@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .profiling import Instrumentation
+from .utils import parse_dates, parse_decimal, format_row_indices
+
+REQUIRED_COLUMNS = ["Datum", "Položka", "Kategorie", "Množství", "Cena za jednotku", "Celková cena"]
+NUMERIC_COLUMNS = ["Množství", "Cena za jednotku", "Celková cena"]
+
+# Povolená odchylka celkové ceny od součinu množství a jednotkové ceny (zaokrouhlení na haléře)
+DEFAULT_TOLERANCE = 0.01
+
+# Pravidla, jejichž porušení neukončí validaci ani v režimu "raise" - řádky se pouze vyřadí
+NON_FATAL_RULES = ("invalid_date",)
+
+ON_ERROR_MODES = ("raise", "quarantine")
+
+
+def describe_rule(rule: str) -> str:
+    """
+    Vrátí český popis pravidla pro chybová hlášení.
+
+    :param rule: Název pravidla, např. "missing_value:Položka" nebo "total_mismatch".
+    :return: Popis pravidla.
+    """
+    name, _, column = rule.partition(":")
+    descriptions = {
+        "missing_value": f"chybějící hodnota ve sloupci '{column}'",
+        "invalid_number": f"sloupec '{column}' musí obsahovat číselné hodnoty",
+        "invalid_date": "neplatná hodnota ve sloupci 'Datum'",
+        "total_mismatch": "'Celková cena' neodpovídá součinu 'Množství' a 'Cena za jednotku'",
+    }
+    return descriptions.get(name, rule)
+
+
+class ValidationReport:
+    """
+    Souhrn validace: indexy řádků porušujících jednotlivá pravidla.
+    Reporty jednotlivých bloků lze slučovat metodou merge.
+    """
+
+    def __init__(self):
+        self.errors: Dict[str, List] = {}
+        self.rows_checked = 0
+
+    def add(self, rule: str, rows: pd.Index):
+        """
+        Zaznamená řádky porušující pravidlo.
+
+        :param rule: Název pravidla.
+        :param rows: Indexy chybných řádků (prázdný index se ignoruje).
+        """
+        if len(rows):
+            self.errors.setdefault(rule, []).extend(rows.tolist())
+
+    def merge(self, other: "ValidationReport") -> "ValidationReport":
+        """
+        Přičte report jiného bloku dat.
+
+        :param other: Report k přičtení.
+        :return: Tento report (pro řetězení volání).
+        """
+        for rule, rows in other.errors.items():
+            self.errors.setdefault(rule, []).extend(rows)
+        self.rows_checked += other.rows_checked
+        return self
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    def invalid_rows(self, rules: Optional[List[str]] = None) -> List:
+        """
+        Vrátí seřazené indexy řádků porušujících alespoň jedno z pravidel.
+
+        :param rules: Uvažovaná pravidla (výchozí: všechna).
+        :return: Seznam indexů řádků bez duplicit.
+        """
+        rows = set()
+        for rule, indices in self.errors.items():
+            if rules is None or rule in rules:
+                rows.update(indices)
+        return sorted(rows)
+
+    def fatal_rules(self) -> List[str]:
+        """Vrátí porušená pravidla, která v režimu "raise" ukončí validaci."""
+        return [rule for rule in self.errors if rule.partition(":")[0] not in NON_FATAL_RULES]
+
+    def summary(self, rules: Optional[List[str]] = None, limit: int = 10) -> str:
+        """
+        Naformátuje přehled porušených pravidel (jeden řádek na pravidlo).
+
+        :param rules: Vypsaná pravidla (výchozí: všechna).
+        :param limit: Maximální počet vypsaných indexů u každého pravidla.
+        :return: Text přehledu.
+        """
+        return "\n".join(f"- {describe_rule(rule)}: {len(rows)} řádků ({format_row_indices(rows, limit)})"
+                         for rule, rows in self.errors.items() if rules is None or rule in rules)
+
+    def to_dict(self, limit: int = 100) -> dict:
+        """
+        Vrátí kompaktní podobu reportu vhodnou pro JSON (nejvýše limit indexů na pravidlo).
+
+        :param limit: Maximální počet uložených indexů u každého pravidla.
+        :return: Slovník s počtem kontrolovaných a chybných řádků a přehledem pravidel.
+        """
+        return {
+            "rows_checked": self.rows_checked,
+            "invalid_rows": len(self.invalid_rows()),
+            "rules": {rule: {"count": len(rows), "rows": [int(row) for row in rows[:limit]]}
+                      for rule, rows in self.errors.items()},
+        }
+
+
+def validate_frame(df: pd.DataFrame, date_format: Optional[str] = None, tolerance: float = DEFAULT_TOLERANCE,
+                   instrumentation: Optional[Instrumentation] = None) -> Tuple[pd.DataFrame, ValidationReport]:
+    """
+    Zkontroluje všechna pravidla vektorizovaně v jednom průchodu a převede sloupce na cílové typy.
+    Na rozdíl od kontroly po jednotlivých pravidlech se zaznamenají všechny chyby, nejen první.
+
+    Pravidla:
+    - missing_value:<sloupec> - chybějící hodnota,
+    - invalid_date - hodnotu 'Datum' nelze převést na datum,
+    - invalid_number:<sloupec> - hodnota číselného sloupce není číslo (desetinná čárka je povolena),
+    - total_mismatch - |Celková cena - Množství * Cena za jednotku| > tolerance.
+
+    :param df: DataFrame k validaci (sloupce se převádějí na místě).
+    :param date_format: Formát data (None = detekce ze vzorku).
+    :param tolerance: Povolená odchylka celkové ceny (výchozí 0.01).
+    :param instrumentation: Sběr údajů o běhu (fáze "parse_dates").
+    :return: Dvojice (DataFrame s převedenými sloupci, report chyb). Chybné řádky nejsou odstraněny.
+    :raises ValueError: Pokud chybí povinné sloupce.
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Chybějící sloupce: {', '.join(missing_columns)}")
+
+    report = ValidationReport()
+    report.rows_checked = len(df)
+    missing = df[REQUIRED_COLUMNS].isna()
+    for col in REQUIRED_COLUMNS:
+        report.add(f"missing_value:{col}", df.index[missing[col].to_numpy()])
+
+    # Kontrola a konverze datového typu sloupce "Datum"
+    if not pd.api.types.is_datetime64_any_dtype(df["Datum"]):
+        instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        with instrumentation.stage("parse_dates"):
+            df["Datum"], invalid_dates = parse_dates(df["Datum"], date_format)
+        report.add("invalid_date", invalid_dates.difference(df.index[missing["Datum"].to_numpy()], sort=False))
+
+    # Převod číselných sloupců (včetně desetinné čárky) a kontrola nečíselných hodnot
+    valid_numbers = np.ones(len(df), dtype=bool)
+    for col in NUMERIC_COLUMNS:
+        df[col] = parse_decimal(df[col])
+        not_number = df[col].isna().to_numpy()
+        report.add(f"invalid_number:{col}", df.index[not_number & ~missing[col].to_numpy()])
+        valid_numbers &= ~not_number
+
+    expected = df["Množství"].to_numpy(dtype=float) * df["Cena za jednotku"].to_numpy(dtype=float)
+    # Malá rezerva pro nepřesnost binární reprezentace desetinných čísel
+    mismatch = np.abs(df["Celková cena"].to_numpy(dtype=float) - expected) > tolerance + 1e-9
+    report.add("total_mismatch", df.index[mismatch & valid_numbers])
+    return df, report
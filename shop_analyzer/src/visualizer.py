@@ -1,7 +1,128 @@
-import matplotlib.pyplot as plt
-import pandas as pd
+import hashlib
+import io
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import BinaryIO, Dict, Union
+
+import matplotlib
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Verze vzhledu grafů - při změně vykreslovacích funkcí je nutné ji zvýšit, aby se grafy vykreslily znovu
+RENDER_VERSION = 1
+
+
+def _new_figure(figsize: tuple) -> Figure:
+    """Vytvoří samostatný Figure s Agg plátnem (bez globálního stavu pyplot)."""
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _save_figure(figure: Figure, file_path: Union[str, BinaryIO]):
+    """
+    Uloží graf jako PNG. Soubor na disku se zapisuje přes dočasný soubor, aby nedokončený zápis
+    nebyl považován za hotový graf; binární objekt (např. io.BytesIO) se zapíše přímo.
+    """
+    if not isinstance(file_path, str):
+        figure.savefig(file_path, format="png")
+        return
+    temp_path = f"{file_path}.{os.getpid()}.tmp.png"
+    figure.savefig(temp_path)
+    os.replace(temp_path, file_path)
+
+
+def render_monthly_expenses(monthly_expenses: pd.DataFrame, file_path: Union[str, BinaryIO]):
+    """
+    Vykreslí sloupcový graf měsíčních výdajů do souboru.
+
+    :param monthly_expenses: DataFrame s měsíčními výdaji (obsahuje sloupce "Month" a "Měsíční výdaje").
+    :param file_path: Cesta k výstupnímu PNG souboru nebo binární objekt (např. io.BytesIO).
+    """
+    figure = _new_figure((10, 6))
+    ax = figure.add_subplot()
+    ax.bar(monthly_expenses["Month"].astype(str), monthly_expenses["Měsíční výdaje"], color="skyblue")
+    ax.set_title("Měsíční výdaje", fontsize=16)
+    ax.set_xlabel("Měsíc", fontsize=12)
+    ax.set_ylabel("Výdaje (Kč)", fontsize=12)
+    ax.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+    _save_figure(figure, file_path)
+
+
+def render_category_distribution(category_analysis: pd.DataFrame, file_path: Union[str, BinaryIO]):
+    """
+    Vykreslí koláčový graf rozdělení výdajů podle kategorií do souboru.
+
+    :param category_analysis: DataFrame s kategoriemi a jejich výdaji (obsahuje sloupce "Kategorie" a "Celkové výdaje").
+    :param file_path: Cesta k výstupnímu PNG souboru nebo binární objekt (např. io.BytesIO).
+    """
+    figure = _new_figure((8, 8))
+    ax = figure.add_subplot()
+    ax.pie(category_analysis["Celkové výdaje"], labels=category_analysis["Kategorie"],
+           autopct="%1.1f%%", startangle=90, colors=matplotlib.colormaps["Paired"].colors)
+    ax.set_title("Rozložení výdajů podle kategorií", fontsize=16)
+    figure.tight_layout()
+    _save_figure(figure, file_path)
+
+
+def render_top_items(top_items: pd.DataFrame, file_path: Union[str, BinaryIO]):
+    """
+    Vykreslí sloupcový graf nejčastěji nakupovaných položek do souboru.
+
+    :param top_items: DataFrame s nejčastějšími položkami (obsahuje sloupce "Položka" a "Celkový počet").
+    :param file_path: Cesta k výstupnímu PNG souboru nebo binární objekt (např. io.BytesIO).
+    """
+    figure = _new_figure((10, 6))
+    ax = figure.add_subplot()
+    ax.bar(top_items["Položka"].astype(str), top_items["Celkový počet"], color="lightgreen")
+    ax.set_title("Top položky podle množství", fontsize=16)
+    ax.set_xlabel("Položka", fontsize=12)
+    ax.set_ylabel("Počet", fontsize=12)
+    ax.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+    _save_figure(figure, file_path)
+
+
+# Typy grafů: klíč výsledku Analyzer.compute_all -> (základní název souboru, vykreslovací funkce, popis)
+CHARTS = {
+    "monthly_expenses": ("monthly_expenses", render_monthly_expenses, "Graf měsíčních výdajů"),
+    "category_analysis": ("category_distribution", render_category_distribution,
+                          "Koláčový graf výdajů podle kategorií"),
+    "top_items": ("top_items", render_top_items, "Graf nejčastěji nakupovaných položek"),
+}
+
+
+def render_png(chart: str, data: pd.DataFrame) -> bytes:
+    """
+    Vykreslí graf do paměti bez zápisu na disk (např. pro odpověď služby).
+
+    :param chart: Typ grafu (klíč CHARTS).
+    :param data: Agregace ve formátu Analyzer.compute_all.
+    :return: Obsah PNG souboru.
+    :raises ValueError: Pokud typ grafu není známý.
+    """
+    if chart not in CHARTS:
+        raise ValueError(f"Neznámý graf '{chart}'. Povolené grafy: {', '.join(CHARTS)}.")
+    buffer = io.BytesIO()
+    CHARTS[chart][1](data, buffer)
+    return buffer.getvalue()
+
+
+def content_hash(data: pd.DataFrame) -> str:
+    """
+    Spočítá otisk obsahu agregace (hodnoty, index i názvy sloupců) pro rozpoznání nezměněných grafů.
+
+    :param data: Agregovaný DataFrame.
+    :return: Hexadecimální otisk.
+    """
+    digest = hashlib.sha1(f"{RENDER_VERSION}|{list(data.columns)}".encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data.astype(str), index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
 
 class Visualizer:
     """
@@ -28,24 +149,19 @@ class Visualizer:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         return f"{base_name}_{timestamp}.png"
 
+    def _plot(self, chart: str, data: pd.DataFrame):
+        base_name, render, description = CHARTS[chart]
+        file_path = os.path.join(self.output_dir, self._generate_file_name(base_name))
+        render(data, file_path)
+        print(f"{description} byl uložen do {file_path}.")
+
     def plot_monthly_expenses(self, monthly_expenses: pd.DataFrame):
         """
         Vytvoří a uloží sloupcový graf měsíčních výdajů.
 
         :param monthly_expenses: DataFrame s měsíčními výdaji (obsahuje sloupce "Month" a "Měsíční výdaje").
         """
-        plt.figure(figsize=(10, 6))
-        plt.bar(monthly_expenses["Month"].astype(str), monthly_expenses["Měsíční výdaje"], color="skyblue")
-        plt.title("Měsíční výdaje", fontsize=16)
-        plt.xlabel("Měsíc", fontsize=12)
-        plt.ylabel("Výdaje (Kč)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        file_name = self._generate_file_name("monthly_expenses")
-        file_path = os.path.join(self.output_dir, file_name)
-        plt.savefig(file_path)
-        plt.close()
-        print(f"Graf měsíčních výdajů byl uložen do {file_path}.")
+        self._plot("monthly_expenses", monthly_expenses)
 
     def plot_category_distribution(self, category_analysis: pd.DataFrame):
         """
@@ -53,16 +169,7 @@ class Visualizer:
 
         :param category_analysis: DataFrame s kategoriemi a jejich výdaji (obsahuje sloupce "Kategorie" a "Celkové výdaje").
         """
-        plt.figure(figsize=(8, 8))
-        plt.pie(category_analysis["Celkové výdaje"], labels=category_analysis["Kategorie"],
-                autopct="%1.1f%%", startangle=90, colors=plt.cm.Paired.colors)
-        plt.title("Rozložení výdajů podle kategorií", fontsize=16)
-        plt.tight_layout()
-        file_name = self._generate_file_name("category_distribution")
-        file_path = os.path.join(self.output_dir, file_name)
-        plt.savefig(file_path)
-        plt.close()
-        print(f"Koláčový graf výdajů podle kategorií byl uložen do {file_path}.")
+        self._plot("category_analysis", category_analysis)
 
     def plot_top_items(self, top_items: pd.DataFrame):
         """
@@ -70,43 +177,61 @@ class Visualizer:
 
         :param top_items: DataFrame s nejčastějšími položkami (obsahuje sloupce "Položka" a "Celkový počet").
         """
-        plt.figure(figsize=(10, 6))
-        plt.bar(top_items["Položka"], top_items["Celkový počet"], color="lightgreen")
-        plt.title("Top položky podle množství", fontsize=16)
-        plt.xlabel("Položka", fontsize=12)
-        plt.ylabel("Počet", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        file_name = self._generate_file_name("top_items")
-        file_path = os.path.join(self.output_dir, file_name)
-        plt.savefig(file_path)
-        plt.close()
-        print(f"Graf nejčastěji nakupovaných položek byl uložen do {file_path}.")
-
-# Příklad použití
-if __name__ == "__main__":
-    from data_loader import DataLoader
-    from analyzer import Analyzer
-
-    # Načtení a validace dat
-    file_path = "nakupy.csv"  # Konkrétní název souboru (uložen ve složce data)
-    loader = DataLoader(file_path)
-
-    try:
-        data = loader.load_data()
-        validated_data = loader.validate_data(data)
-
-        # Analýza dat
-        analyzer = Analyzer(validated_data)
-        monthly_expenses = analyzer.calculate_monthly_expenses()
-        category_analysis = analyzer.analyze_categories()
-        top_items = analyzer.get_top_items(n=5)
-
-        # Vizualizace dat
-        visualizer = Visualizer()
-        visualizer.plot_monthly_expenses(monthly_expenses)
-        visualizer.plot_category_distribution(category_analysis)
-        visualizer.plot_top_items(top_items)
-
-    except Exception as e:
-        print(f"Chyba: {e}")
+        self._plot("top_items", top_items)
+
+    def render_all(self, results: Dict[str, pd.DataFrame]) -> Dict[str, str]:
+        """
+        Vykreslí grafy pro všechny zadané agregace (chybějící grafy souběžně ve vláknech).
+
+        Název souboru obsahuje otisk obsahu agregace místo časové značky; pokud graf se stejným
+        obsahem již existuje (agregace se od posledního běhu nezměnila), znovu se nevykresluje.
+        Starší verze téhož grafu (soubory s jiným otiskem) se po vykreslení odstraní, takže
+        ve výstupním adresáři zůstává od každého typu grafu jen aktuální soubor.
+
+        :param results: Slovník agregací ve formátu Analyzer.compute_all (klíče podle CHARTS).
+        :return: Slovník {název agregace: cesta k souboru s grafem}.
+        """
+        unknown = [chart for chart in results if chart not in CHARTS]
+        if unknown:
+            raise ValueError(f"Neznámé typy grafů: {', '.join(unknown)}.")
+
+        paths, pending = {}, []
+        for chart, data in results.items():
+            base_name, _, description = CHARTS[chart]
+            file_path = os.path.join(self.output_dir, f"{base_name}_{content_hash(data)[:12]}.png")
+            paths[chart] = file_path
+            if os.path.exists(file_path):
+                print(f"{description} se nezměnil, použit existující soubor {file_path}.")
+            else:
+                pending.append((chart, data, file_path))
+
+        # Každý graf má vlastní Figure s Agg plátnem (bez globálního stavu pyplot), takže se mohou vykreslovat
+        # ve vláknech současně; odstranění starších verzí následuje až po dokončení všech grafů
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                futures = [(chart, file_path, executor.submit(CHARTS[chart][1], data, file_path))
+                           for chart, data, file_path in pending]
+                for chart, file_path, future in futures:
+                    future.result()
+                    print(f"{CHARTS[chart][2]} byl uložen do {file_path}.")
+
+        for chart, file_path in paths.items():
+            self._prune(CHARTS[chart][0], file_path)
+        return paths
+
+    def _prune(self, base_name: str, keep_path: str):
+        """
+        Odstraní zastaralé grafy daného typu pojmenované otiskem obsahu (grafy s časovou značkou z plot_* zůstávají).
+
+        :param base_name: Základní název souboru grafu.
+        :param keep_path: Cesta k aktuálnímu grafu, který se neodstraňuje.
+        """
+        pattern = re.compile(rf"{re.escape(base_name)}_[0-9a-f]{{12}}\.png")
+        for name in os.listdir(self.output_dir):
+            path = os.path.join(self.output_dir, name)
+            if pattern.fullmatch(name) and path != keep_path:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Soubor mezitím odstranil jiný souběžně běžící proces
+                    pass
@@ -1,35 +1,212 @@
-import csv
-import random
+import argparse
 import os
-from datetime import datetime, timedelta
-
-
-# Funkce pro generování náhodného data v požadovaném rozsahu měsíců
-def generate_date(start_date, months_range):
-    # Vytvoří náhodný měsíc v rámci zadaného rozsahu
-    delta = timedelta(days=random.randint(0, months_range * 30))
-    return start_date - delta
-
-
-# Funkce pro generování položky a kategorie
-def generate_item(category):
-    items = items = {
-        "Potraviny": ["chleba", "banány", "rajčata", "mléko", "jogurt", "plísňový sýr", "káva", "těstoviny", "rýže", "mrkev", "máslo", "uzený sýr", "vejce", "kukuřice"],
-        "Drogerie": ["deodorant", "šampon", "toaletní papír", "holící žiletky", "mycí gel", "zubní pasta", "kosmetické tampony", "prací prášek", "ústní voda", "krém na ruce"],
-        "Zábava": ["dárky", "vstupné na koncert", "vstupné do kina", "předplatné časopisu", "deskovky", "hudební nástroje", "vstupné do zoo", "knížky", "hračky"],
-        "Elektro": ["sluchátka", "USB kabel", "nabíječka", "powerbanka", "světelný zdroj", "televize", "mobilní telefon", "počítačová myš", "klávesnice", "elektrický zubní kartáček"],
-        "Oblečení": ["tričko", "džíny", "svetr", "ponožky", "boty", "kapsáče", "mikina", "šaty", "kabela", "kravata"],
-        "Sport a fitness": ["běžecké boty", "joggingové kalhoty", "posilovací činky", "cvičební podložka", "kolo", "sportovní láhev", "fitness náramek", "proteinový prášek", "tenisová raketa", "basketbalový míč"],
-        "Zahrada a DIY": ["zahradní hadice", "zahradní nářadí", "květiny", "hnojivo", "pletivo", "rýč", "zahradní lopata", "gril", "lopatka na sázení", "zahradní židle"],
-        "Cestování": ["cestovní kufr", "cestovní taška", "lístek na vlak", "lístek na let", "mapy", "fotoaparát", "cestovní polštář", "sluneční brýle", "opalovací krém", "plavky"],
-        "Domácí potřeby": ["čisticí prostředky", "vysavač", "televize", "mikrovlnná trouba", "kávovar", "pračka", "lednice", "žehlička", "lampa", "osušky"],
-        "Kancelářské potřeby": ["tiskárna", "papíry", "tužky", "sešívačka", "závěsy na okna", "kalkulačka", "desky na dokumenty", "obálky", "lepící páska", "nástěnné hodiny"]
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ITEMS = {
+    "Potraviny": ["chleba", "banány", "rajčata", "mléko", "jogurt", "plísňový sýr", "káva", "těstoviny", "rýže", "mrkev", "máslo", "uzený sýr", "vejce", "kukuřice"],
+    "Drogerie": ["deodorant", "šampon", "toaletní papír", "holící žiletky", "mycí gel", "zubní pasta", "kosmetické tampony", "prací prášek", "ústní voda", "krém na ruce"],
+    "Zábava": ["dárky", "vstupné na koncert", "vstupné do kina", "předplatné časopisu", "deskovky", "hudební nástroje", "vstupné do zoo", "knížky", "hračky"],
+    "Elektro": ["sluchátka", "USB kabel", "nabíječka", "powerbanka", "světelný zdroj", "televize", "mobilní telefon", "počítačová myš", "klávesnice", "elektrický zubní kartáček"],
+    "Oblečení": ["tričko", "džíny", "svetr", "ponožky", "boty", "kapsáče", "mikina", "šaty", "kabela", "kravata"],
+    "Sport a fitness": ["běžecké boty", "joggingové kalhoty", "posilovací činky", "cvičební podložka", "kolo", "sportovní láhev", "fitness náramek", "proteinový prášek", "tenisová raketa", "basketbalový míč"],
+    "Zahrada a DIY": ["zahradní hadice", "zahradní nářadí", "květiny", "hnojivo", "pletivo", "rýč", "zahradní lopata", "gril", "lopatka na sázení", "zahradní židle"],
+    "Cestování": ["cestovní kufr", "cestovní taška", "lístek na vlak", "lístek na let", "mapy", "fotoaparát", "cestovní polštář", "sluneční brýle", "opalovací krém", "plavky"],
+    "Domácí potřeby": ["čisticí prostředky", "vysavač", "televize", "mikrovlnná trouba", "kávovar", "pračka", "lednice", "žehlička", "lampa", "osušky"],
+    "Kancelářské potřeby": ["tiskárna", "papíry", "tužky", "sešívačka", "závěsy na okna", "kalkulačka", "desky na dokumenty", "obálky", "lepící páska", "nástěnné hodiny"]
+}
+
+CATEGORIES = list(ITEMS)
+
+COLUMNS = ["Datum", "Položka", "Kategorie", "Množství", "Cena za jednotku", "Celková cena"]
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'test', 'nakupy-test.csv')
+
+
+# Rozsah jednotkových cen v haléřích (50 až 500 Kč) a množství
+MIN_PRICE_CENTS, MAX_PRICE_CENTS = 5000, 50000
+MAX_QUANTITY = 5
+
+
+@lru_cache(maxsize=1)
+def _quantity_price_table() -> np.ndarray:
+    """
+    Předem naformátuje konce řádků "množství,jednotková cena,celková cena" (včetně CRLF) pro všechny
+    kombinace množství a ceny. Ceny se formátují stejně jako float zaokrouhlený na 2 desetinná místa (např. 64.1, 150.36).
+    """
+    cents = range(MIN_PRICE_CENTS, MAX_PRICE_CENTS + 1)
+    return np.array([f"{quantity},{cent / 100!r},{quantity * cent / 100!r}\r\n"
+                     for quantity in range(1, MAX_QUANTITY + 1) for cent in cents], dtype=object)
+
+
+def _sample_codes(rows: int, rng: np.random.Generator, start_date: date, end_date: date,
+                  category_weights: Dict[str, float]) -> dict:
+    """
+    Vektorizovaně vylosuje kódy (indexy do tabulek hodnot) pro blok náhodných nákupů.
+
+    :return: Slovník s kódy a tabulkami hodnot ("days", "categories", "items", ...).
+    """
+    categories = list(category_weights)
+    weights = np.array([category_weights[category] for category in categories], dtype=float)
+    category_codes = rng.choice(len(categories), size=rows, p=weights / weights.sum())
+
+    # Položky všech vybraných kategorií v jednom poli; položka se vybírá posunem v rámci kategorie
+    item_categories = [(item, category) for category in categories for item in ITEMS[category]]
+    lengths = np.array([len(ITEMS[category]) for category in categories])
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    item_codes = offsets[category_codes] + (rng.random(rows) * lengths[category_codes]).astype(np.int64)
+
+    quantity = rng.integers(1, MAX_QUANTITY + 1, size=rows)
+    price_cents = rng.integers(MIN_PRICE_CENTS, MAX_PRICE_CENTS + 1, size=rows)
+
+    # Každý den rozsahu se naformátuje jen jednou a řádky na něj odkazují indexem
+    days = pd.date_range(start_date, end_date, freq="D").strftime("%d.%m.%Y").to_numpy(dtype=object)
+    day_codes = rng.integers(0, len(days), size=rows)
+
+    return {
+        "days": days, "day_codes": day_codes,
+        "item_categories": item_categories, "item_codes": item_codes,
+        "quantity": quantity, "price_cents": price_cents,
     }
-    item = random.choice(items.get(category, []))
-    return item
 
 
-# Hlavní skript pro generování CSV souboru
+def generate_frame(rows: int, rng: np.random.Generator, start_date: date, end_date: date,
+                   category_weights: Dict[str, float]) -> pd.DataFrame:
+    """
+    Vektorizovaně vygeneruje blok náhodných nákupů (stejné schéma jako data/nakupy.csv).
+
+    :param rows: Počet řádků.
+    :param rng: Generátor náhodných čísel NumPy.
+    :param start_date: První možné datum nákupu.
+    :param end_date: Poslední možné datum nákupu.
+    :param category_weights: Relativní četnosti kategorií {kategorie: váha}.
+    :return: DataFrame se sloupci COLUMNS (datum jako text DD.MM.YYYY).
+    """
+    codes = _sample_codes(rows, rng, start_date, end_date, category_weights)
+    item_categories = np.array(codes["item_categories"], dtype=object).reshape(-1, 2)
+    return pd.DataFrame({
+        "Datum": codes["days"][codes["day_codes"]],
+        "Položka": item_categories[codes["item_codes"], 0],
+        "Kategorie": item_categories[codes["item_codes"], 1],
+        "Množství": codes["quantity"],
+        "Cena za jednotku": codes["price_cents"] / 100,
+        "Celková cena": codes["quantity"] * codes["price_cents"] / 100,
+    }, columns=COLUMNS)
+
+
+def _format_lines(codes: dict) -> str:
+    """
+    Sestaví řádky CSV z kódů vektorizovaně: hodnoty se formátují jen jednou v malých tabulkách
+    a řádky vzniknou indexací tabulek a spojením celých sloupců (np.add nad poli řetězců).
+    Pokud je kombinací den × položka méně než řádků, předem se spojí i ony.
+    """
+    days = codes["days"] + ","
+    item_categories = np.array([f"{item},{category}," for item, category in codes["item_categories"]], dtype=object)
+    quantity_price = _quantity_price_table()[
+        (codes["quantity"] - 1) * (MAX_PRICE_CENTS - MIN_PRICE_CENTS + 1) + codes["price_cents"] - MIN_PRICE_CENTS]
+    if len(days) * len(item_categories) <= len(quantity_price):
+        prefixes = np.add.outer(days, item_categories).ravel()[
+            codes["day_codes"] * len(item_categories) + codes["item_codes"]]
+    else:
+        prefixes = days[codes["day_codes"]] + item_categories[codes["item_codes"]]
+    return "".join((prefixes + quantity_price).tolist())
+
+
+def write_csv(file_path: str, rows: int, seed: int = 0, start_date: date = date(2024, 1, 1),
+              end_date: date = date(2024, 12, 31), category_weights: Optional[Dict[str, float]] = None,
+              encoding: str = "utf-8", chunksize: int = 1_000_000) -> str:
+    """
+    Vygeneruje CSV soubor s náhodnými nákupy a zapisuje ho po blocích (s omezenou pamětí).
+    Stejné parametry (včetně semínka a velikosti bloku) vždy vytvoří stejný soubor.
+
+    :param file_path: Cesta k výstupnímu souboru.
+    :param rows: Počet řádků.
+    :param seed: Semínko generátoru.
+    :param start_date: První možné datum nákupu.
+    :param end_date: Poslední možné datum nákupu.
+    :param category_weights: Relativní četnosti kategorií (výchozí: všechny kategorie se stejnou vahou).
+    :param encoding: Kódování výstupu ("utf-8" nebo "windows-1250").
+    :param chunksize: Počet řádků generovaných a zapisovaných najednou.
+    :return: Cesta k vygenerovanému souboru.
+    """
+    if rows < 0 or chunksize <= 0:
+        raise ValueError("Počet řádků nesmí být záporný a velikost bloku musí být kladná.")
+    if start_date > end_date:
+        raise ValueError("Počáteční datum musí předcházet koncovému datu.")
+    category_weights = category_weights or {category: 1.0 for category in CATEGORIES}
+    unknown = [category for category in category_weights if category not in ITEMS]
+    if unknown:
+        raise ValueError(f"Neznámé kategorie: {', '.join(unknown)}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    chunk_count = max((rows + chunksize - 1) // chunksize, 1)
+    seeds = np.random.SeedSequence(seed).spawn(chunk_count)
+    with open(file_path, mode='w', newline='', encoding=encoding) as file:
+        file.write(",".join(COLUMNS) + "\r\n")
+        for index, chunk_seed in enumerate(seeds):
+            chunk_rows = min(chunksize, rows - index * chunksize)
+            if chunk_rows <= 0:
+                break
+            codes = _sample_codes(chunk_rows, np.random.default_rng(chunk_seed), start_date, end_date,
+                                  category_weights)
+            file.write(_format_lines(codes))
+    return file_path
+
+
+def _write_shard(arguments: tuple) -> str:
+    return write_csv(*arguments)
+
+
+def write_shards(output_path: str, rows: int, shards: int, seed: int = 0, start_date: date = date(2024, 1, 1),
+                 end_date: date = date(2024, 12, 31), category_weights: Optional[Dict[str, float]] = None,
+                 encoding: str = "utf-8", chunksize: int = 1_000_000, workers: Optional[int] = None) -> List[str]:
+    """
+    Vygeneruje data rozdělená do více souborů (např. exporty poboček) paralelně v poolu procesů.
+
+    :param output_path: Cesta k výstupnímu souboru; soubory dostanou příponu _000, _001, ...
+    :param rows: Celkový počet řádků (rozdělí se rovnoměrně mezi soubory).
+    :param shards: Počet souborů.
+    :param workers: Počet procesů (výchozí: počet jader CPU).
+    :return: Seznam cest k vygenerovaným souborům.
+
+    Ostatní parametry odpovídají funkci write_csv.
+    """
+    if shards <= 0:
+        raise ValueError("Počet souborů musí být kladné číslo.")
+    base, extension = os.path.splitext(output_path)
+    shard_seeds = np.random.SeedSequence(seed).spawn(shards)
+    tasks = []
+    for index in range(shards):
+        shard_rows = rows // shards + (1 if index < rows % shards else 0)
+        shard_seed = int(shard_seeds[index].generate_state(1)[0])
+        tasks.append((f"{base}_{index:03d}{extension}", shard_rows, shard_seed, start_date, end_date,
+                      category_weights, encoding, chunksize))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_write_shard, tasks))
+
+
+def parse_weights(text: str) -> Dict[str, float]:
+    """
+    Převede zadání četností kategorií z příkazové řádky na slovník.
+
+    :param text: Text ve tvaru "Potraviny=5,Drogerie=2".
+    :return: Slovník {kategorie: váha}.
+    """
+    weights = {}
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        weights[name.strip()] = float(value) if value else 1.0
+    return weights
+
+
+# Hlavní skript pro generování CSV souboru (interaktivní režim)
 def generate_csv():
     # Dotazy na uživatele
     num_records = int(input("Zadejte počet záznamů, které chcete generovat: "))
@@ -38,46 +215,50 @@ def generate_csv():
     num_categories = int(input("Zadejte počet kategorií, které chcete přiřazovat (1-10): "))
 
     # Výběr kategorií
-    categories = ["Potraviny", "Drogerie", "Zábava", "Elektro", "Oblečení", "Sport a fitness", "Zahrada a DIY",
-                  "Cestování", "Domácí potřeby", "Kancelářské potřeby"]
-    selected_categories = random.sample(categories, num_categories)
-
-    # Stanovení počátečního data
-    start_date = datetime(2024, 12, 31)  # Začátek období (leden 2024)
-
-    # Cesta k nové složce pro uložení souboru
-    folder_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'test')
+    selected_categories = random.sample(CATEGORIES, num_categories)
 
-    # Pokud složka neexistuje, vytvoříme ji
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
+    # Stanovení koncového data a rozsahu
+    end_date = date(2024, 12, 31)
+    start_date = end_date - timedelta(days=months_range * 30)
 
-    # Cesta pro CSV soubor
-    file_path = os.path.join(folder_path, 'nakupy-test.csv')
-
-    # Vytvoření CSV souboru
-    with open(file_path, mode='w', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-
-        # Zápis hlavičky do souboru
-        writer.writerow(["Datum", "Položka", "Kategorie", "Množství", "Cena za jednotku", "Celková cena"])
-
-        # Generování záznamů
-        for _ in range(num_records):
-            category = random.choice(selected_categories)
-            item = generate_item(category)
-            quantity = random.randint(1, 5)
-            unit_price = round(random.uniform(50, 500), 2)
-            total_price = round(quantity * unit_price, 2)
+    file_path = write_csv(DEFAULT_OUTPUT, num_records, seed=random.randrange(2 ** 32), start_date=start_date,
+                          end_date=end_date, category_weights={category: 1.0 for category in selected_categories})
+    print(f"CSV soubor byl úspěšně vygenerován do složky: {file_path}")
 
-            # Generování náhodného data v rámci zadaného rozsahu měsíců
-            date = generate_date(start_date, months_range).strftime("%d.%m.%Y")
 
-            # Zápis záznamu
-            writer.writerow([date, item, category, quantity, unit_price, total_price])
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generátor náhodných nákupů pro testování Shop Analyzeru. Bez parametrů běží interaktivně.")
+    parser.add_argument("--rows", type=int, required=True, help="Počet řádků.")
+    parser.add_argument("--seed", type=int, default=0, help="Semínko generátoru (výchozí 0).")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 1, 1),
+                        help="První datum ve tvaru YYYY-MM-DD (výchozí 2024-01-01).")
+    parser.add_argument("--end", type=date.fromisoformat, default=date(2024, 12, 31),
+                        help="Poslední datum ve tvaru YYYY-MM-DD (výchozí 2024-12-31).")
+    parser.add_argument("--weights", type=parse_weights, default=None,
+                        help='Četnosti kategorií, např. "Potraviny=5,Drogerie=2" (výchozí: všechny stejně).')
+    parser.add_argument("--encoding", choices=["utf-8", "windows-1250"], default="utf-8",
+                        help="Kódování výstupu (výchozí utf-8).")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Cesta k výstupnímu souboru.")
+    parser.add_argument("--chunksize", type=int, default=1_000_000, help="Počet řádků zapisovaných najednou.")
+    parser.add_argument("--shards", type=int, default=1, help="Počet výstupních souborů generovaných paralelně.")
+    parser.add_argument("--workers", type=int, default=None, help="Počet procesů pro --shards.")
+    args = parser.parse_args()
 
-    print(f"CSV soubor byl úspěšně vygenerován do složky: {file_path}")
+    started = datetime.now()
+    if args.shards > 1:
+        paths = write_shards(args.output, args.rows, args.shards, args.seed, args.start, args.end, args.weights,
+                             args.encoding, args.chunksize, args.workers)
+    else:
+        paths = [write_csv(args.output, args.rows, args.seed, args.start, args.end, args.weights, args.encoding,
+                           args.chunksize)]
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"Vygenerováno {args.rows} řádků do {len(paths)} souborů za {elapsed:.1f} s: {', '.join(paths)}")
 
 
 # Spuštění generování
-generate_csv()
+if __name__ == "__main__":
+    if len(sys.argv) == 1:
+        generate_csv()
+    else:
+        main()
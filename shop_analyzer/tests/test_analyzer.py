@@ -0,0 +1,184 @@
+import math
+import unittest
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from shop_analyzer.src.data_loader import DataLoader
+from shop_analyzer.src.analyzer import Analyzer, StreamingAnalyzer, AggregateState, sketch_capacity
+from shop_analyzer.src.money import exact_sums, round_sums
+from shop_analyzer.tests.generator import CATEGORIES, generate_frame
+
+
+class TestStreamingAnalyzer(unittest.TestCase):
+    def setUp(self):
+        """Nastavení prostředí pro testování."""
+        self.loader = DataLoader("nakupy.csv")
+        self.analyzer = Analyzer(self.loader.validate_data(self.loader.load_data()))
+
+    def test_streaming_matches_in_memory(self):
+        """Test, že zpracování po blocích dává stejné výsledky jako zpracování v paměti."""
+        streaming = StreamingAnalyzer(self.loader.iter_chunks(chunksize=7))
+        pd.testing.assert_frame_equal(streaming.calculate_monthly_expenses(),
+                                      self.analyzer.calculate_monthly_expenses(), check_exact=True)
+        pd.testing.assert_frame_equal(streaming.analyze_categories(),
+                                      self.analyzer.analyze_categories(), check_exact=True)
+        pd.testing.assert_frame_equal(streaming.get_top_items(n=5),
+                                      self.analyzer.get_top_items(n=5), check_exact=True)
+
+    def test_merge_states(self):
+        """Test sloučení dvou částečných stavů agregací."""
+        chunks = list(self.loader.iter_chunks(chunksize=100))
+        first = AggregateState().update(chunks[0])
+        second = AggregateState()
+        for chunk in chunks[1:]:
+            second.update(chunk)
+        merged = first.merge(second)
+        self.assertEqual(merged.rows, sum(len(chunk) for chunk in chunks))
+        self.assertEqual(merged.item_counts.sum(), self.analyzer.data["Množství"].sum())
+
+    def test_streaming_without_data(self):
+        """Test, že analýza bez zpracovaných dat vyhodí ValueError."""
+        with self.assertRaises(ValueError):
+            StreamingAnalyzer().calculate_monthly_expenses()
+
+    def test_invalid_chunksize(self):
+        """Test zachycení neplatné velikosti bloku."""
+        with self.assertRaises(ValueError):
+            list(self.loader.iter_chunks(chunksize=0))
+
+
+class TestComputeAll(unittest.TestCase):
+    def setUp(self):
+        """Nastavení prostředí pro testování."""
+        loader = DataLoader("nakupy.csv")
+        self.data = loader.validate_data(loader.load_data())
+
+    def test_compute_all_matches_methods(self):
+        """Test, že compute_all vrací stejné výsledky jako jednotlivé metody."""
+        analyzer = Analyzer(self.data)
+        results = analyzer.compute_all(n=5)
+        pd.testing.assert_frame_equal(results["monthly_expenses"], analyzer.calculate_monthly_expenses(),
+                                      check_exact=True)
+        pd.testing.assert_frame_equal(results["category_analysis"], analyzer.analyze_categories(), check_exact=True)
+        pd.testing.assert_frame_equal(results["top_items"], analyzer.get_top_items(n=5), check_exact=True)
+
+    def test_compute_all_does_not_mutate_input(self):
+        """Test, že výpočet metrik neupravuje vstupní DataFrame."""
+        columns = list(self.data.columns)
+        analyzer = Analyzer(self.data)
+        analyzer.compute_all()
+        analyzer.calculate_monthly_expenses()
+        self.assertEqual(list(self.data.columns), columns)
+
+    def test_compute_all_categorical_columns(self):
+        """Test, že kategorické sloupce (včetně nepoužitých kategorií) dávají stejné součty."""
+        expected = Analyzer(self.data).compute_all()
+        categorical = self.data.astype({"Položka": "category", "Kategorie": "category"})
+        categorical["Kategorie"] = categorical["Kategorie"].cat.add_categories(["Nepoužitá"])
+        results = Analyzer(categorical).compute_all()
+        for name in ("category_analysis", "top_items"):
+            pd.testing.assert_frame_equal(results[name], expected[name])
+
+    def test_compute_all_subset_and_unknown_metric(self):
+        """Test výběru podmnožiny metrik a zachycení neznámé metriky."""
+        analyzer = Analyzer(self.data)
+        self.assertEqual(list(analyzer.compute_all(metrics=["top_items"])), ["top_items"])
+        with self.assertRaises(ValueError):
+            analyzer.compute_all(metrics=["unknown"])
+
+
+class TestExactSums(unittest.TestCase):
+    def setUp(self):
+        """Nastavení velkého vygenerovaného souboru, jehož float64 součty závisí na pořadí sčítání."""
+        self.data = generate_frame(300_000, np.random.default_rng(3), date(2024, 1, 1), date(2024, 12, 31),
+                                   dict.fromkeys(CATEGORIES, 1.0))
+        self.data["Datum"] = pd.to_datetime(self.data["Datum"], format="%d.%m.%Y")
+
+    def test_chunked_sums_are_bit_identical(self):
+        """Test, že součty po blocích jsou bitově shodné se součty v paměti (bez tolerance)."""
+        expected = Analyzer(self.data).compute_all()
+        for chunksize in (10_000, 7_777, 300_000):
+            chunks = (self.data.iloc[start:start + chunksize] for start in range(0, len(self.data), chunksize))
+            results = StreamingAnalyzer(chunks).compute_all()
+            for name in ("monthly_expenses", "category_analysis", "top_items"):
+                pd.testing.assert_frame_equal(results[name], expected[name], check_exact=True)
+
+    def test_sums_are_correctly_rounded(self):
+        """Test, že součty odpovídají správně zaokrouhlenému součtu (math.fsum) a nezávisí na pořadí řádků."""
+        categories = Analyzer(self.data).analyze_categories().set_index("Kategorie")["Celkové výdaje"]
+        for category, total in categories.items():
+            prices = self.data.loc[self.data["Kategorie"] == category, "Celková cena"]
+            self.assertEqual(total, math.fsum(prices))
+        shuffled = Analyzer(self.data.sample(frac=1, random_state=1)).compute_all()
+        pd.testing.assert_frame_equal(shuffled["category_analysis"], Analyzer(self.data).analyze_categories(),
+                                      check_exact=True)
+
+    def test_groupby_difference_is_within_rounding(self):
+        """
+        Test, že se součty compute_all od groupby (kompenzované sčítání Pandas, které compute_all nahradil)
+        liší nejvýše o zaokrouhlení - řádově ULP součtu, ne o chybu prostého sčítání.
+        """
+        results = Analyzer(self.data).compute_all()
+        expected = self.data.groupby("Kategorie")["Celková cena"].sum()
+        categories = results["category_analysis"].set_index("Kategorie")["Celkové výdaje"]
+        pd.testing.assert_series_equal(categories, expected, check_names=False, check_exact=False,
+                                       rtol=4 * np.finfo(np.float64).eps, atol=0)
+        months = self.data.groupby(self.data["Datum"].dt.to_period("M"))["Celková cena"].sum()
+        monthly = results["monthly_expenses"].set_index("Month")["Měsíční výdaje"]
+        np.testing.assert_allclose(monthly.to_numpy(), months.to_numpy(), rtol=4 * np.finfo(np.float64).eps, atol=0)
+
+    def test_exact_sums_cancellation(self):
+        """Test přesného součtu hodnot velmi různých řádů (prosté sčítání by ztratilo malé hodnoty)."""
+        values = np.array([1e16, 1.0, -1e16, 0.1, 1e-300, -0.1])
+        sums = round_sums(exact_sums(np.array([0, 0, 0, 1, 1, 1]), values, 3))
+        self.assertEqual(sums.tolist(), [1.0, 1e-300, 0.0])
+        with self.assertRaises(ValueError):
+            exact_sums(np.array([0]), np.array([np.nan]), 1)
+
+
+class TestTopItems(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dat s několika častými a mnoha řídkými položkami."""
+        items = ["Jablka"] * 400 + ["Banány"] * 250 + ["Mléko"] * 150 + [f"SKU {i}" for i in range(600)]
+        self.data = pd.DataFrame({
+            "Datum": pd.Timestamp(2024, 1, 1) + pd.to_timedelta([i % 60 for i in range(len(items))], unit="D"),
+            "Položka": items,
+            "Kategorie": "Potraviny",
+            "Množství": 1,
+            "Celková cena": 10.0,
+        }).sample(frac=1, random_state=7).reset_index(drop=True)
+
+    def test_exact_top_items_ties(self):
+        """Test, že při shodných počtech rozhoduje pořadí položek a výsledek je deterministický."""
+        top_items = Analyzer(self.data).get_top_items(n=5)
+        self.assertEqual(list(top_items["Položka"]), ["Jablka", "Banány", "Mléko", "SKU 0", "SKU 1"])
+
+    def test_sketch_finds_heavy_hitters_within_bound(self):
+        """Test, že sketch s omezenou kapacitou najde časté položky s chybou v garantované mezi."""
+        chunks = [self.data.iloc[i:i + 100] for i in range(0, len(self.data), 100)]
+        analyzer = StreamingAnalyzer(chunks, item_capacity=sketch_capacity(0.05))
+        state = analyzer.state
+        self.assertLessEqual(len(state.item_counts), state.item_capacity)
+        self.assertLessEqual(state.item_error, len(self.data) / (state.item_capacity + 1))
+
+        bounds = state.item_count_bounds(n=3)
+        self.assertEqual(list(bounds["Položka"]), ["Jablka", "Banány", "Mléko"])
+        for item, true_count in (("Jablka", 400), ("Banány", 250), ("Mléko", 150)):
+            row = bounds[bounds["Položka"] == item].iloc[0]
+            self.assertLessEqual(row["Celkový počet"], true_count)
+            self.assertGreaterEqual(row["Horní odhad"], true_count)
+
+    def test_merged_sketches_keep_bound(self):
+        """Test, že sloučení dvou sketchí zachová kapacitu i garantovanou chybu."""
+        half = len(self.data) // 2
+        first = AggregateState(item_capacity=10).update(self.data.iloc[:half])
+        second = AggregateState(item_capacity=10).update(self.data.iloc[half:])
+        merged = first.merge(second)
+        self.assertLessEqual(len(merged.item_counts), 10)
+        self.assertLessEqual(merged.item_error, len(self.data) / 11)
+        self.assertEqual(merged.item_counts.idxmax(), "Jablka")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from shop_analyzer.src.cache import DataCache
+from shop_analyzer.src.data_loader import DataLoader
+
+
+class TestDataCache(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře se zdrojovým CSV a cache."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "nakupy.csv")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("Datum,Položka,Kategorie,Množství,Cena za jednotku,Celková cena\n"
+                    "12.04.2024,Banány,Potraviny,1,26.51,26.51\n"
+                    "31.05.2024,Jablka,Potraviny,2,15.08,30.16\n")
+        self.cache = DataCache(cache_dir=os.path.join(self.tmp_dir.name, "cache"))
+        self.loader = DataLoader(self.source, encoding_cache=None, data_cache=self.cache)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_warm_load_matches_cold_load(self):
+        """Test, že data z cache odpovídají datům načteným z CSV včetně datových typů."""
+        cold = self.loader.load_validated()
+        self.assertIsInstance(cold["Kategorie"].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(cold["Datum"]))
+        warm = self.cache.load(self.source)
+        pd.testing.assert_frame_equal(warm, cold)
+
+    def test_changed_source_invalidates_cache(self):
+        """Test, že změna zdrojového souboru zneplatní záznam v cache."""
+        self.loader.load_validated()
+        with open(self.source, "a", encoding="utf-8") as f:
+            f.write("02.08.2024,Šampon,Drogerie,1,64.1,64.1\n")
+        self.assertIsNone(self.cache.load(self.source))
+        self.assertEqual(len(self.loader.load_validated()), 3)
+
+    def test_hash_key_mode(self):
+        """Test cache s klíčem podle otisku obsahu souboru."""
+        cache = DataCache(cache_dir=self.cache.cache_dir, key_mode="hash")
+        cache.store(self.source, self.loader.load_validated(use_cache=False))
+        os.utime(self.source, ns=(0, 0))
+        self.assertIsNotNone(cache.load(self.source))
+
+    def test_missing_source(self):
+        """Test, že chybějící zdrojový soubor vyhodí FileNotFoundError."""
+        self.loader.file_path = os.path.join(self.tmp_dir.name, "non_existent.csv")
+        with self.assertRaises(FileNotFoundError):
+            self.loader.load_validated()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from shop_analyzer.src.analyzer import Analyzer, StreamingAnalyzer
+from shop_analyzer.src.cube import ExpenseCube
+from shop_analyzer.src.data_loader import DataLoader
+from shop_analyzer.src.incremental import IncrementalAnalyzer
+from shop_analyzer.src.parallel import analyze_files
+from shop_analyzer.src.schema import DtypePlan
+from shop_analyzer.tests.generator import write_csv
+
+# Float součty buněk sloučených z bloků se sčítají v jiném pořadí než v kostce celých dat
+FLOAT_RTOL = 1e-12
+
+
+class TestExpenseCube(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře s vygenerovanými daty (rok nákupů, všechny kategorie)."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = write_csv(os.path.join(self.tmp_dir.name, "nakupy.csv"), 6000, seed=11)
+        self.loader = DataLoader(self.source, encoding_cache=None)
+        self.data = self.loader.validate_data(self.loader.load_data())
+        self.cube = ExpenseCube.from_frame(self.data)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _assert_same_cells(self, cube: ExpenseCube, expected: ExpenseCube, exact: bool = False):
+        keys = ["Kategorie", "Položka"]
+        pd.testing.assert_frame_equal(cube.totals("day", by=keys), expected.totals("day", by=keys),
+                                      check_exact=exact, rtol=FLOAT_RTOL)
+
+    def test_rollups_match_raw_rows(self):
+        """Test, že souhrny odvozené z kostky odpovídají agregaci přímo z řádků."""
+        for granularity, freq in (("week", "W"), ("month", "M"), ("quarter", "Q"), ("year", "Y")):
+            expected = (self.data.groupby([self.data["Datum"].dt.to_period(freq), "Kategorie"], observed=True)
+                        ["Celková cena"].sum().reset_index())
+            totals = self.cube.totals(granularity, by=["Kategorie"])
+            self.assertEqual(list(totals["Období"]), list(expected["Datum"]))
+            self.assertEqual(list(totals["Kategorie"]), list(expected["Kategorie"]))
+            pd.testing.assert_series_equal(totals["Výdaje"], expected["Celková cena"], check_names=False,
+                                           rtol=FLOAT_RTOL)
+        self.assertEqual(self.cube.totals("all")["Počet nákupů"].iloc[0], len(self.data))
+
+    def test_monthly_expenses_match_analyzer(self):
+        """Test, že měsíční výdaje z kostky odpovídají Analyzer.calculate_monthly_expenses."""
+        analyzer = Analyzer(self.data)
+        monthly = analyzer.calculate_monthly_expenses()
+        expenses = analyzer.calculate_expenses("month")
+        self.assertEqual(list(expenses["Období"]), list(monthly["Month"]))
+        pd.testing.assert_series_equal(expenses["Výdaje"], monthly["Měsíční výdaje"], check_names=False,
+                                       rtol=FLOAT_RTOL)
+
+    def test_merge_chunks_matches_full_cube(self):
+        """Test, že kostka složená z bloků odpovídá kostce celých dat (v haléřích přesně)."""
+        self._assert_same_cells(ExpenseCube.from_chunks(self.loader.iter_chunks(chunksize=700)), self.cube)
+
+        loader = DataLoader(self.source, encoding_cache=None, dtype_plan=DtypePlan(money="haler"))
+        exact = ExpenseCube.from_frame(loader.validate_data(loader.load_data()))
+        self._assert_same_cells(ExpenseCube.from_chunks(loader.iter_chunks(chunksize=700)), exact, exact=True)
+
+    def test_streaming_analyzer_tracks_cube(self):
+        """Test, že StreamingAnalyzer s track_cube poskytuje stejné přehledy po obdobích jako Analyzer."""
+        streamed = StreamingAnalyzer(self.loader.iter_chunks(chunksize=700), track_cube=True)
+        self._assert_same_cells(streamed.cube, self.cube)
+        pd.testing.assert_frame_equal(streamed.calculate_expenses("quarter", by_category=True),
+                                      Analyzer(self.data).calculate_expenses("quarter", by_category=True),
+                                      rtol=FLOAT_RTOL)
+        with self.assertRaises(ValueError):
+            StreamingAnalyzer(self.loader.iter_chunks(chunksize=700)).cube
+
+    def test_parallel_files_merge_cubes(self):
+        """Test, že kostky více souborů zpracovaných v map-reduce odpovídají kostce spojených dat."""
+        branches = os.path.join(self.tmp_dir.name, "pobocky")
+        frames = []
+        for index in range(3):
+            path = write_csv(os.path.join(branches, f"pobocka_{index}.csv"), 1500, seed=20 + index)
+            loader = DataLoader(path, encoding_cache=None)
+            frames.append(loader.validate_data(loader.load_data()))
+        expected = ExpenseCube.from_frame(pd.concat(frames, ignore_index=True))
+        analyzer = analyze_files(branches, workers=1, chunksize=400, encoding_cache=None, track_cube=True)
+        self._assert_same_cells(analyzer.cube, expected)
+
+    def test_incremental_cube_matches_full_cube(self):
+        """Test, že přírůstkově aktualizovaná kostka odpovídá kostce celého souboru."""
+        state_dir = os.path.join(self.tmp_dir.name, "aggregates")
+
+        def refresh(track_cube: bool) -> IncrementalAnalyzer:
+            incremental = IncrementalAnalyzer(self.source, state_dir=state_dir, chunksize=700,
+                                              loader=DataLoader(self.source, encoding_cache=None),
+                                              track_cube=track_cube)
+            incremental.refresh()
+            return incremental
+
+        refresh(track_cube=False)
+        # Uložené agregace bez kostky se při požadavku na kostku spočítají znovu celé
+        self.assertEqual(refresh(track_cube=True).new_rows, len(self.data))
+
+        appended = write_csv(os.path.join(self.tmp_dir.name, "nove.csv"), 800, seed=12)
+        with open(appended, encoding="utf-8", newline="") as f:
+            new_rows = f.read().split("\r\n", 1)[1]
+        with open(self.source, "a", encoding="utf-8", newline="") as f:
+            f.write(new_rows)
+        incremental = refresh(track_cube=True)
+        self.assertEqual(incremental.new_rows, 800)
+
+        full = DataLoader(self.source, encoding_cache=None)
+        expected = ExpenseCube.from_frame(full.validate_data(full.load_data()))
+        analyzer = IncrementalAnalyzer(self.source, state_dir=state_dir,
+                                       loader=DataLoader(self.source, encoding_cache=None),
+                                       track_cube=True).refresh()
+        self._assert_same_cells(analyzer.cube, expected)
+
+    def test_invalid_rollup(self):
+        """Test, že měsíce nelze odvodit z týdenní kostky a neznámá granularita vyhodí ValueError."""
+        with self.assertRaises(ValueError):
+            self.cube.rollup("week").rollup("month")
+        with self.assertRaises(ValueError):
+            self.cube.totals("decade")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,18 @@
+import json
+import os
+import tempfile
 import unittest
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 from shop_analyzer.src.data_loader import DataLoader
+from shop_analyzer.src.encoding import EncodingDetector
+from shop_analyzer.src.profiling import Instrumentation
+from shop_analyzer.src.schema import DtypePlan, memory_usage
+from shop_analyzer.src.utils import detect_date_format, parse_dates, parse_decimal
+
+HEADER = "Datum,Položka,Kategorie,Množství,Cena za jednotku,Celková cena\n"
+ROW = "12.04.2024,Růže,Potraviny,3,50.12,150.36\n"
 
 
 class TestDataLoader(unittest.TestCase):
@@ -37,5 +49,189 @@ class TestDataLoader(unittest.TestCase):
         self.assertIsInstance(validated_data, pd.DataFrame)
 
 
+def _detect_in_process(cache_file: str, paths: list) -> list:
+    """Detekce kódování v samostatném procesu se sdílenou cache (pro test souběžných zápisů)."""
+    detector = EncodingDetector(cache_file=cache_file, window_size=1024)
+    return [detector.detect(path) for path in paths]
+
+
+class TestEncodingDetection(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře a detektoru s cache."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmp_dir.name, "encodings.json")
+        self.detector = EncodingDetector(cache_file=self.cache_file, window_size=1024)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_detect_windows_1250(self):
+        """Test, že česká data ve windows-1250 nejsou zaměněna za Windows-1252."""
+        path = self._write("cp1250.csv", (HEADER + ROW * 500).encode("windows-1250"))
+        self.assertEqual(self.detector.detect(path), "windows-1250")
+
+    def test_detect_utf8_and_bom(self):
+        """Test rychlé cesty pro UTF-8 a detekce BOM."""
+        utf8 = self._write("utf8.csv", (HEADER + ROW * 500).encode("utf-8"))
+        bom = self._write("bom.csv", (HEADER + ROW).encode("utf-8-sig"))
+        self.assertEqual(self.detector.detect(utf8), "utf-8")
+        self.assertEqual(self.detector.detect(bom), "utf-8-sig")
+
+    def test_cache_is_reused_across_instances(self):
+        """Test, že detekované kódování se ukládá do cache a znovu použije."""
+        path = self._write("cp1250.csv", (HEADER + ROW * 10).encode("windows-1250"))
+        self.detector.detect(path)
+        other = EncodingDetector(cache_file=self.cache_file)
+        other._detect_uncached = None  # detekce nesmí být znovu spuštěna
+        self.assertEqual(other.detect(path), "windows-1250")
+
+    def test_concurrent_writers_keep_all_entries(self):
+        """Test, že souběžné procesy i instance se starou kopií cache nepřepíší záznamy ostatních."""
+        paths = [self._write(f"file{i}.csv", (HEADER + ROW * (10 + i)).encode("windows-1250")) for i in range(12)]
+        stale = EncodingDetector(cache_file=self.cache_file)
+        stale._load_cache()  # cache načtená před zápisy ostatních procesů
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(_detect_in_process, [self.cache_file] * 4, [paths[i::4] for i in range(4)]))
+        extra = self._write("extra.csv", (HEADER + ROW).encode("utf-8"))
+        stale.detect(extra)
+        with open(self.cache_file, encoding="utf-8") as f:
+            cache = json.load(f)
+        self.assertEqual(set(cache), {os.path.abspath(path) for path in paths + [extra]})
+        stale.invalidate(paths[0])
+        with open(self.cache_file, encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), len(paths))
+
+    def test_wrong_guess_is_reported(self):
+        """Test, že chybný odhad z neprozkoumané části souboru je zachycen a nahlášen."""
+        rows = ROW.encode("utf-8") * 1000
+        content = HEADER.encode("utf-8") + rows + ROW.encode("windows-1250") + rows * 3
+        path = self._write("mixed.csv", content)
+        loader = DataLoader(path, encoding_cache=self.cache_file)
+        loader.encoding_detector.window_size = 64
+        with self.assertRaises(ValueError) as e:
+            loader.load_data()
+        self.assertIn("utf-8", str(e.exception))
+        self.assertNotIn(os.path.abspath(path), loader.encoding_detector._load_cache())
+
+
+class TestDateParsing(unittest.TestCase):
+    def test_detect_dominant_format(self):
+        """Test detekce převládajícího formátu data ze vzorku."""
+        values = pd.Series(["12.04.2024", "31.05.2024", "2024-06-01", "02.08.2024"])
+        self.assertEqual(detect_date_format(values), "%d.%m.%Y")
+        self.assertEqual(detect_date_format(pd.Series(["2024-04-12", "2024-05-31"])), "%Y-%m-%d")
+
+    def test_parse_dates_reports_invalid_rows(self):
+        """Test, že neplatné hodnoty jsou nahlášeny indexem a ostatní se převedou."""
+        values = pd.Series(["12.04.2024", "31.02.2024", "2024-06-01", "nesmysl"], index=[10, 11, 12, 13])
+        parsed, invalid = parse_dates(values)
+        self.assertEqual(list(invalid), [11, 13])
+        self.assertEqual(parsed[10], pd.Timestamp(2024, 4, 12))
+        self.assertEqual(parsed[12], pd.Timestamp(2024, 6, 1))
+
+    def test_validate_drops_invalid_date_rows(self):
+        """Test, že validace vyřadí řádky s neplatným datem a zbytek souboru zpracuje."""
+        loader = DataLoader("nakupy.csv", encoding_cache=None)
+        data = loader.load_data()
+        data.loc[5, "Datum"] = "99.99.2024"
+        validated = loader.validate_data(data)
+        self.assertEqual(loader.invalid_date_rows, [5])
+        self.assertEqual(loader.date_format, "%d.%m.%Y")
+        self.assertNotIn(5, validated.index)
+
+
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře pro testovací soubory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _loader(self, content: str, **kwargs) -> DataLoader:
+        path = os.path.join(self.tmp_dir.name, "nakupy.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return DataLoader(path, encoding_cache=None, **kwargs)
+
+    def test_parse_decimal_comma(self):
+        """Test převodu českého zápisu čísel s desetinnou čárkou a mezerami mezi tisíci."""
+        parsed = parse_decimal(pd.Series(["6,1", "1 234,50", "3", "x"]))
+        self.assertEqual(parsed[:3].tolist(), [6.1, 1234.5, 3.0])
+        self.assertTrue(pd.isna(parsed[3]))
+
+    def test_semicolon_file_with_decimal_commas(self):
+        """Test načtení souboru se středníkem jako oddělovačem a desetinnými čárkami."""
+        loader = self._loader("Datum;Položka;Kategorie;Množství;Cena za jednotku;Celková cena\n"
+                              "12.04.2024;Růže;Potraviny;3;50,12;150,36\n")
+        data = loader.validate_data(loader.load_data())
+        self.assertEqual(data["Celková cena"].tolist(), [150.36])
+        self.assertTrue(loader.validation_report.is_valid)
+
+    def test_all_errors_reported_by_row(self):
+        """Test, že validace nahlásí všechna porušená pravidla s indexy řádků, ne jen první chybu."""
+        loader = self._loader(HEADER + ROW + "13.04.2024,Růže,,3,50.12,150.36\n"
+                              + "14.04.2024,Růže,Potraviny,tři,50.12,150.36\n"
+                              + "15.04.2024,Růže,Potraviny,3,50.12,99.00\n")
+        with self.assertRaises(ValueError) as e:
+            loader.validate_data(loader.load_data())
+        self.assertEqual(loader.validation_report.errors, {
+            "missing_value:Kategorie": [1],
+            "invalid_number:Množství": [2],
+            "total_mismatch": [3],
+        })
+        self.assertIn("musí obsahovat číselné hodnoty", str(e.exception))
+
+    def test_quarantine_mode(self):
+        """Test, že v režimu karantény se chybné řádky vyřadí, uloží do souboru a zbytek se zpracuje."""
+        quarantine_file = os.path.join(self.tmp_dir.name, "karantena.csv")
+        loader = self._loader(HEADER + ROW + "15.04.2024,Růže,Potraviny,3,50.12,99.00\n"
+                              + "99.99.2024,Růže,Potraviny,3,50.12,150.36\n" + ROW,
+                              on_error="quarantine", quarantine_file=quarantine_file)
+        chunks = list(loader.iter_chunks(chunksize=2))
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 2)
+        self.assertEqual(loader.validation_report.invalid_rows(), [1, 2])
+        rejected = pd.read_csv(quarantine_file)
+        self.assertEqual(rejected["Řádek"].tolist(), [1, 2])
+        self.assertEqual(rejected["Chyby"].tolist(), ["total_mismatch", "invalid_date"])
+
+
+class TestDtypePlan(unittest.TestCase):
+    def test_validated_data_uses_compact_dtypes(self):
+        """Test, že validovaná data mají kategorie a úzká celá čísla a zabírají méně paměti."""
+        raw = DataLoader("nakupy.csv", encoding_cache=None).load_data()
+        compact = DataLoader("nakupy.csv", encoding_cache=None).validate_data(raw.copy())
+        plain = DataLoader("nakupy.csv", encoding_cache=None,
+                           dtype_plan=DtypePlan.unoptimized()).validate_data(raw.copy())
+        self.assertIsInstance(compact["Položka"].dtype, pd.CategoricalDtype)
+        self.assertEqual(compact["Množství"].dtype, "int16")
+        self.assertEqual(plain["Množství"].dtype, "int64")
+        self.assertLess(memory_usage(compact), memory_usage(plain))
+        pd.testing.assert_frame_equal(compact.astype(plain.dtypes.to_dict()), plain)
+
+    def test_memory_is_measured_only_on_request(self):
+        """Test, že paměť dat se měří jen při Instrumentation(track_memory=True)."""
+        raw = DataLoader("nakupy.csv", encoding_cache=None).load_data()
+        plain = DataLoader("nakupy.csv", encoding_cache=None)
+        plain.validate_data(raw.copy())
+        self.assertNotIn("memory_after_mb", plain.instrumentation.info)
+
+        tracked = DataLoader("nakupy.csv", encoding_cache=None, instrumentation=Instrumentation(track_memory=True))
+        tracked.validate_data(raw.copy())
+        self.assertIn("memory_before_mb", tracked.instrumentation.info)
+        self.assertIn("memory_after_mb", tracked.instrumentation.info)
+
+    def test_out_of_range_integers_keep_type(self):
+        """Test, že hodnoty mimo rozsah úzkého typu se nezúží (nedojde k přetečení)."""
+        df = pd.DataFrame({"Množství": [1, 100_000]})
+        self.assertEqual(DtypePlan().apply(df)["Množství"].dtype, "int64")
+
+
 if __name__ == "__main__":
     unittest.main()
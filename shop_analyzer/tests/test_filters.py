@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from shop_analyzer.src.cache import HAS_PYARROW, DataCache
+from shop_analyzer.src.data_loader import DataLoader
+from shop_analyzer.src.filters import RowFilter
+
+
+class TestRowFilter(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře se zdrojovým CSV (dva měsíce, dvě kategorie)."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "nakupy.csv")
+        rows = []
+        for day in range(1, 31):
+            rows.append(f"{day:02d}.04.2024,Banány,Potraviny,1,26.51,26.51")
+            rows.append(f"{day:02d}.05.2024,Šampon,Drogerie,2,64.1,128.2")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("Datum,Položka,Kategorie,Množství,Cena za jednotku,Celková cena\n" + "\n".join(rows) + "\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_end_date_is_inclusive(self):
+        """Test, že konec okna bez času zahrnuje celý den a neplatné okno se odmítne."""
+        row_filter = RowFilter("2024-04-10", "20.04.2024")
+        data = DataLoader(self.source, encoding_cache=None).load_validated(use_cache=False, row_filter=row_filter)
+        self.assertEqual(len(data), 11)
+        self.assertEqual(data["Datum"].max(), pd.Timestamp("2024-04-20"))
+        with self.assertRaises(ValueError):
+            RowFilter("2024-05-01", "2024-04-01")
+
+    def test_cache_skips_blocks(self):
+        """Test, že čtení z cache (Feather i pickle bez pyarrow) přeskočí bloky mimo filtr."""
+        formats = ["feather", "pickle"] if HAS_PYARROW else ["pickle"]
+        for cache_format in formats:
+            with self.subTest(format=cache_format):
+                cache = DataCache(cache_dir=os.path.join(self.tmp_dir.name, cache_format), block_rows=10)
+                cache.format = cache_format
+                loader = DataLoader(self.source, encoding_cache=None, data_cache=cache)
+                full = loader.load_validated()
+                row_filter = RowFilter(start="2024-05-01", categories=["Drogerie"])
+
+                filtered = cache.load(self.source, row_filter=row_filter)
+                self.assertLess(cache.blocks_read, cache.blocks_total)
+                expected = full[row_filter.mask(full)]
+                pd.testing.assert_frame_equal(filtered.reset_index(drop=True), expected.reset_index(drop=True))
+
+                # Filtr, kterému nevyhovuje žádný blok, vrátí prázdná data se stejnými typy
+                empty = cache.load(self.source, row_filter=RowFilter(start="2025-01-01"))
+                self.assertEqual(cache.blocks_read, 0)
+                self.assertEqual(empty.dtypes.astype(str).tolist(), full.dtypes.astype(str).tolist())
+                self.assertTrue(empty.empty)
+
+    def test_chunks_with_filter(self):
+        """Test, že filtr při čtení po blocích vyřadí nevyhovující kategorie i prázdné bloky."""
+        loader = DataLoader(self.source, encoding_cache=None)
+        chunks = list(loader.iter_chunks(chunksize=7, row_filter=RowFilter(categories=["Potraviny"],
+                                                                            items=["Banány"])))
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 30)
+        self.assertTrue(all(len(chunk) for chunk in chunks))
+        self.assertEqual(set(pd.concat(chunks)["Kategorie"]), {"Potraviny"})
+
+    def test_errors_outside_filter_are_reported(self):
+        """Test, že chyby v řádcích, které filtr vyřadí, se přesto nahlásí."""
+        with open(self.source, "a", encoding="utf-8") as f:
+            f.write("15.05.2024,Šampon,Drogerie,2,64.1,999\n")
+        loader = DataLoader(self.source, encoding_cache=None)
+        row_filter = RowFilter(categories=["Potraviny"])
+        with self.assertRaises(ValueError):
+            loader.load_validated(use_cache=False, row_filter=row_filter)
+        with self.assertRaises(ValueError):
+            list(loader.iter_chunks(chunksize=7, row_filter=row_filter))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from shop_analyzer.tests.generator import CATEGORIES, COLUMNS, ITEMS, generate_frame, write_csv
+
+START, END = date(2024, 3, 1), date(2024, 5, 31)
+
+
+class TestGenerator(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře pro generované soubory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _frame(self, rows: int, seed: int = 0, weights: dict = None) -> pd.DataFrame:
+        return generate_frame(rows, np.random.default_rng(seed), START, END,
+                              weights or dict.fromkeys(CATEGORIES, 1.0))
+
+    def test_frame_schema_and_ranges(self):
+        """Test počtu řádků, sloupců, rozsahu dat a konzistence hodnot."""
+        data = self._frame(50_000)
+        self.assertEqual(len(data), 50_000)
+        self.assertEqual(list(data.columns), COLUMNS)
+
+        dates = pd.to_datetime(data["Datum"], format="%d.%m.%Y")
+        self.assertEqual(dates.min(), pd.Timestamp(START))
+        self.assertEqual(dates.max(), pd.Timestamp(END))
+        self.assertTrue(all(item in ITEMS[category] for item, category in zip(data["Položka"], data["Kategorie"])))
+        self.assertTrue(data["Množství"].between(1, 5).all())
+        self.assertTrue(data["Cena za jednotku"].between(50, 500).all())
+        cents = (data["Cena za jednotku"] * 100).round()
+        np.testing.assert_array_equal(data["Celková cena"], data["Množství"] * cents / 100)
+
+    def test_category_weights(self):
+        """Test, že četnosti kategorií odpovídají zadaným vahám a jiné kategorie se nevyskytují."""
+        data = self._frame(100_000, weights={"Potraviny": 3.0, "Drogerie": 1.0})
+        shares = data["Kategorie"].value_counts(normalize=True)
+        self.assertEqual(set(shares.index), {"Potraviny", "Drogerie"})
+        self.assertAlmostEqual(shares["Potraviny"], 0.75, delta=0.01)
+
+    def test_same_seed_is_reproducible(self):
+        """Test, že stejné semínko vytvoří stejná data a stejný soubor, jiné semínko jiná."""
+        pd.testing.assert_frame_equal(self._frame(1000, seed=7), self._frame(1000, seed=7))
+        self.assertFalse(self._frame(1000, seed=7).equals(self._frame(1000, seed=8)))
+
+        first = write_csv(os.path.join(self.tmp_dir.name, "a.csv"), 25_000, seed=7, chunksize=10_000)
+        second = write_csv(os.path.join(self.tmp_dir.name, "b.csv"), 25_000, seed=7, chunksize=10_000)
+        with open(first, "rb") as a, open(second, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_csv_matches_frame(self):
+        """Test, že zapsaný CSV soubor obsahuje přesně data z generate_frame pro stejný generátor."""
+        path = write_csv(os.path.join(self.tmp_dir.name, "nakupy.csv"), 20_000, seed=3, start_date=START,
+                         end_date=END, chunksize=20_000, encoding="windows-1250")
+        written = pd.read_csv(path, encoding="windows-1250", float_precision="round_trip")
+        expected = generate_frame(20_000, np.random.default_rng(np.random.SeedSequence(3).spawn(1)[0]), START, END,
+                                  dict.fromkeys(CATEGORIES, 1.0))
+        pd.testing.assert_frame_equal(written, expected, check_exact=True)
+
+    def test_empty_and_invalid_arguments(self):
+        """Test souboru bez řádků a zachycení neplatných parametrů."""
+        path = write_csv(os.path.join(self.tmp_dir.name, "empty.csv"), 0)
+        with open(path, encoding="utf-8", newline="") as f:
+            self.assertEqual(f.read(), ",".join(COLUMNS) + "\r\n")
+        with self.assertRaises(ValueError):
+            write_csv(path, 10, start_date=END, end_date=START)
+        with self.assertRaises(ValueError):
+            write_csv(path, 10, category_weights={"Neexistující": 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
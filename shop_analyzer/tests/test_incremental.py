@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from shop_analyzer.src.analyzer import Analyzer
+from shop_analyzer.src.data_loader import DataLoader
+from shop_analyzer.src.incremental import IncrementalAnalyzer
+from shop_analyzer.tests.generator import write_csv
+
+HEADER = "Datum,Položka,Kategorie,Množství,Cena za jednotku,Celková cena\n"
+DAY_1 = ("12.04.2024,Banány,Potraviny,1,26.51,26.51\n"
+         "31.05.2024,Jablka,Potraviny,2,15.08,30.16\n")
+DAY_2 = ("02.06.2024,Šampon,Drogerie,1,64.1,64.1\n"
+         "03.06.2024,Jablka,Potraviny,3,15.08,45.24\n")
+
+
+class TestIncrementalAnalyzer(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře se zdrojovým CSV a uloženými agregacemi."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "nakupy.csv")
+        self._write(HEADER + DAY_1, "w")
+        self.state_dir = os.path.join(self.tmp_dir.name, "aggregates")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, text: str, mode: str):
+        with open(self.source, mode, encoding="windows-1250") as f:
+            f.write(text)
+
+    def _incremental(self) -> IncrementalAnalyzer:
+        loader = DataLoader(self.source, encoding_cache=None)
+        return IncrementalAnalyzer(self.source, state_dir=self.state_dir, loader=loader)
+
+    def _assert_matches_full_analysis(self, analyzer):
+        loader = DataLoader(self.source, encoding_cache=None)
+        expected = Analyzer(loader.validate_data(loader.load_data())).compute_all()
+        for name, frame in analyzer.compute_all().items():
+            pd.testing.assert_frame_equal(frame, expected[name])
+
+    def test_only_appended_rows_are_processed(self):
+        """Test, že druhý běh zpracuje jen nově připsané řádky a výsledky odpovídají celé analýze."""
+        self._incremental().refresh()
+        self._write(DAY_2, "a")
+        incremental = self._incremental()
+        analyzer = incremental.refresh()
+        self.assertEqual(incremental.new_rows, 2)
+        self.assertEqual(analyzer.state.rows, 4)
+        self._assert_matches_full_analysis(analyzer)
+
+    def test_incomplete_last_line_is_deferred(self):
+        """Test, že neúplný poslední řádek se zpracuje až po dopsání."""
+        self._incremental().refresh()
+        self._write(DAY_2[:20], "a")
+        incremental = self._incremental()
+        incremental.refresh()
+        self.assertEqual(incremental.new_rows, 0)
+        self._write(DAY_2[20:], "a")
+        analyzer = incremental.refresh()
+        self.assertEqual(incremental.new_rows, 2)
+        self._assert_matches_full_analysis(analyzer)
+
+    def test_rewritten_file_is_recomputed(self):
+        """Test, že přepsaný soubor vede k novému výpočtu agregací od začátku."""
+        self._incremental().refresh()
+        self._write(HEADER + DAY_2 + DAY_1, "w")
+        incremental = self._incremental()
+        analyzer = incremental.refresh()
+        self.assertEqual(incremental.new_rows, 4)
+        self._assert_matches_full_analysis(analyzer)
+
+    def test_edit_after_first_block_is_recomputed(self):
+        """Test, že úprava řádku daleko za začátkem souboru (za 64 KiB) vede k novému výpočtu celého souboru."""
+        write_csv(self.source, 5000, seed=3)
+        self._incremental().refresh()
+        with open(self.source, "rb") as f:
+            content = f.read()
+        self.assertGreater(len(content), 3 * 64 * 1024)
+        # Zdvojení jednoho řádku uprostřed souboru - soubor je delší a jeho začátek se nezměnil
+        position = content.index(b"\n", len(content) // 2) + 1
+        line = content[position:content.index(b"\n", position) + 1]
+        with open(self.source, "wb") as f:
+            f.write(content[:position] + line + content[position:])
+        incremental = self._incremental()
+        analyzer = incremental.refresh()
+        self.assertEqual(incremental.new_rows, 5001)
+        self._assert_matches_full_analysis(analyzer)
+
+    def test_row_indices_count_from_file_start(self):
+        """Test, že indexy chybných řádků v připsaných datech odpovídají pořadí řádku v celém souboru."""
+        self._incremental().refresh()
+        self._write(DAY_2.replace("03.06.2024", "33.06.2024"), "a")
+        incremental = self._incremental()
+        incremental.refresh()
+        self.assertEqual(incremental.new_rows, 1)
+        self.assertEqual(incremental.loader.invalid_date_rows, [3])
+        self.assertEqual(incremental.loader.validation_report.errors["invalid_date"], [3])
+
+        self._write("04.06.2024,Jablka,Potraviny,1,15.08,15.08\n05.06.2024,Jablka,Potraviny,1,15.08,15.08\n"
+                    "36.06.2024,Jablka,Potraviny,1,15.08,15.08\n", "a")
+        incremental = self._incremental()
+        incremental.refresh()
+        self.assertEqual(incremental.loader.invalid_date_rows, [6])
+
+
+if __name__ == "__main__":
+    unittest.main()
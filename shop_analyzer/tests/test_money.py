@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from shop_analyzer.src.analyzer import Analyzer, StreamingAnalyzer
+from shop_analyzer.src.data_loader import DataLoader
+from shop_analyzer.src.money import check_sums, convert_money, decimal_sums, money_mode, to_haler
+from shop_analyzer.src.schema import DtypePlan
+from shop_analyzer.tests.generator import CATEGORIES, generate_frame, write_csv
+
+
+class TestExactMoney(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře s vygenerovanými daty načtenými v haléřích."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = write_csv(os.path.join(self.tmp_dir.name, "nakupy.csv"), 3000, seed=5)
+        self.loader = DataLoader(self.source, encoding_cache=None, dtype_plan=DtypePlan(money="haler"))
+        self.data = self.loader.validate_data(self.loader.load_data())
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_haler_sums_match_decimal_reference(self):
+        """Test, že součty v haléřích přesně odpovídají referenčním součtům v Decimal."""
+        self.assertEqual(money_mode(self.data), "haler")
+        self.assertEqual(self.data["Celková cena"].dtype, np.int64)
+        sums = self.data.groupby("Kategorie", observed=True)["Celková cena"].sum()
+        self.assertEqual(check_sums(sums, decimal_sums(self.data, "Kategorie")), [])
+
+        # Mnoho malých částek, jejichž součet ve float64 nevychází přesně
+        data = convert_money(generate_frame(200_000, np.random.default_rng(1), date(2024, 1, 1),
+                                            date(2024, 12, 31), dict.fromkeys(CATEGORIES, 1.0)), "haler")
+        sums = data.groupby("Kategorie", observed=True)["Celková cena"].sum()
+        self.assertEqual(check_sums(sums, decimal_sums(data, "Kategorie")), [])
+
+    def test_results_match_float_mode(self):
+        """Test, že výsledky analýzy v haléřích odpovídají výsledkům v korunách (na haléře)."""
+        float_loader = DataLoader(self.source, encoding_cache=None)
+        float_data = float_loader.validate_data(float_loader.load_data())
+        expected = Analyzer(float_data).compute_all()
+        exact = Analyzer(self.data).compute_all()
+        streamed = StreamingAnalyzer(self.loader.iter_chunks(chunksize=400)).compute_all()
+        for results in (exact, streamed):
+            for metric in ("monthly_expenses", "category_analysis"):
+                pd.testing.assert_frame_equal(results[metric], expected[metric], atol=0.005)
+        categories = exact["category_analysis"].set_index("Kategorie")["Celkové výdaje"]
+        reference = decimal_sums(float_data, "Kategorie")
+        for category, total in categories.items():
+            self.assertEqual(Decimal(repr(total)), reference[category])
+        expenses = Analyzer(self.data).calculate_expenses("quarter", by_category=True)
+        pd.testing.assert_series_equal(expenses["Výdaje"],
+                                       Analyzer(float_data).calculate_expenses("quarter", True)["Výdaje"],
+                                       atol=0.005)
+
+    def test_conversion(self):
+        """Test převodu částek na haléře a zpět a odmítnutí částek s přesností pod haléř."""
+        self.assertEqual(to_haler(pd.Series([0.1, 19.99, -2.5, 1e9])).tolist(), [10, 1999, -250, 10 ** 11])
+        self.assertEqual(to_haler(pd.Series([3, 7])).tolist(), [300, 700])
+        with self.assertRaises(ValueError):
+            to_haler(pd.Series([1.005], name="Celková cena"))
+        # Odchylka pod haléř se odmítne i u velkých částek (tolerance je absolutní, ne relativní)
+        for amount in (5000.004, 12345.678, 1e9 + 0.001):
+            with self.assertRaises(ValueError):
+                to_haler(pd.Series([amount], name="Celková cena"))
+        self.assertEqual(to_haler(pd.Series([5000.01, 123456789.99])).tolist(), [500001, 12345678999])
+        with self.assertRaises(ValueError):
+            to_haler(pd.Series([1.0, np.nan], name="Celková cena"))
+        with self.assertRaises(ValueError):
+            DtypePlan(money="decimal")
+        # Převod je idempotentní a lze se vrátit zpět na koruny
+        data = convert_money(self.data.copy(), "haler")
+        pd.testing.assert_frame_equal(data, self.data)
+        crowns = convert_money(data, "float")
+        self.assertEqual(money_mode(crowns), "float")
+        self.assertAlmostEqual(crowns["Celková cena"].sum(), self.data["Celková cena"].sum() / 100)
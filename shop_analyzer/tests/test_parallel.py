@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from shop_analyzer.src.analyzer import Analyzer
+from shop_analyzer.src.data_loader import DataLoader
+from shop_analyzer.src.parallel import analyze_files, resolve_files
+from shop_analyzer.src.paths import is_multi_file_pattern
+
+HEADER = "Datum,Položka,Kategorie,Množství,Cena za jednotku,Celková cena\n"
+BRANCHES = {
+    "pobocka_1.csv": ("12.04.2024,Banány,Potraviny,1,26.51,26.51\n"
+                      "31.05.2024,Jablka,Potraviny,2,15.08,30.16\n"),
+    "pobocka_2.csv": ("02.06.2024,Šampon,Drogerie,1,64.1,64.1\n"
+                      "03.06.2024,Jablka,Potraviny,3,15.08,45.24\n"),
+    "pobocka_3.csv": "15.04.2024,Růže,Zahrada,4,50.12,200.48\n",
+}
+
+
+class TestParallelIngestion(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře se soubory několika poboček."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for name, rows in BRANCHES.items():
+            with open(os.path.join(self.tmp_dir.name, name), "w", encoding="windows-1250") as f:
+                f.write(HEADER + rows)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_parallel_matches_concatenated_analysis(self):
+        """Test, že map-reduce přes procesy dává stejné výsledky jako analýza spojených dat."""
+        frames = []
+        for file in resolve_files(self.tmp_dir.name):
+            loader = DataLoader(file, encoding_cache=None)
+            frames.append(loader.validate_data(loader.load_data()))
+        expected = Analyzer(pd.concat(frames, ignore_index=True)).compute_all()
+
+        for workers in (1, 2):
+            analyzer = analyze_files(self.tmp_dir.name, workers=workers, encoding_cache=None)
+            self.assertEqual(analyzer.state.rows, 5)
+            for name, frame in analyzer.compute_all().items():
+                pd.testing.assert_frame_equal(frame, expected[name])
+
+    def test_resolve_glob_and_directory(self):
+        """Test vyhledání souborů podle glob vzoru i adresáře."""
+        pattern = os.path.join(self.tmp_dir.name, "pobocka_[12].csv")
+        self.assertTrue(is_multi_file_pattern(pattern))
+        self.assertEqual(len(resolve_files(pattern)), 2)
+        self.assertEqual(len(resolve_files(self.tmp_dir.name)), 3)
+        with self.assertRaises(FileNotFoundError):
+            resolve_files(os.path.join(self.tmp_dir.name, "*.txt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
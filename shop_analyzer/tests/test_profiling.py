@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import unittest
+from shop_analyzer.src.data_loader import DataLoader
+from shop_analyzer.src.profiling import Instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře se zdrojovým CSV."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "nakupy.csv")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("Datum,Položka,Kategorie,Množství,Cena za jednotku,Celková cena\n"
+                    "12.04.2024,Banány,Potraviny,1,26.51,26.51\n"
+                    "31.05.2024,Jablka,Potraviny,2,15.08,30.16\n"
+                    "02.08.2024,Šampon,Drogerie,1,64.1,64.1\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_stage_accumulates_and_notifies_hooks(self):
+        """Test, že opakovaná fáze sčítá čas i počet volání a posluchači dostanou události."""
+        events = []
+        instrumentation = Instrumentation(hooks=[lambda event, data: events.append((event, data.get("stage")))])
+        for _ in range(3):
+            with instrumentation.stage("analyze"):
+                pass
+        self.assertEqual(instrumentation.stages["analyze"]["calls"], 3)
+        self.assertGreaterEqual(instrumentation.stages["analyze"]["seconds"], 0)
+        self.assertEqual(events.count(("stage_end", "analyze")), 3)
+
+    def test_loader_records_stages_and_counters(self):
+        """Test, že DataLoader zaznamená kódování, formát data, fáze a počty řádků i bajtů."""
+        instrumentation = Instrumentation(track_memory=True)
+        loader = DataLoader(self.source, encoding_cache=None, instrumentation=instrumentation)
+        chunks = list(loader.iter_chunks(chunksize=2))
+
+        report = instrumentation.report()
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 3)
+        self.assertEqual(report["info"]["encoding"], "utf-8")
+        self.assertEqual(report["info"]["date_format"], "%d.%m.%Y")
+        self.assertEqual(report["counters"]["rows"], 3)
+        self.assertEqual(report["counters"]["bytes_read"], os.path.getsize(self.source))
+        self.assertEqual(report["stages"]["validate"]["calls"], 2)
+        self.assertIn("parse_dates", report["stages"])
+        self.assertIn("read_csv", report["stages"])
+
+    def test_write_report(self):
+        """Test, že report lze uložit a načíst jako JSON."""
+        instrumentation = Instrumentation()
+        loader = DataLoader(self.source, encoding_cache=None, instrumentation=instrumentation)
+        loader.validate_data(loader.load_data())
+        report_path = instrumentation.write_report(os.path.join(self.tmp_dir.name, "report.json"))
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(report["counters"]["rows_read"], 3)
+        self.assertIn("detect_encoding", report["stages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
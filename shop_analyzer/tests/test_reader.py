@@ -0,0 +1,123 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from shop_analyzer.src.data_loader import DataLoader
+from shop_analyzer.src.reader import FLOAT_PRECISION, HAS_PYARROW_CSV, MappedFile, read_csv_mapped
+
+HEADER = "Datum,Položka,Kategorie,Množství,Cena za jednotku,Celková cena\n"
+
+
+@unittest.skipUnless(HAS_PYARROW_CSV, "pyarrow není nainstalován")
+class TestCsvEngines(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře pro testovací soubory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name: str, content: bytes) -> str:
+        file_path = os.path.join(self.tmp_dir.name, name)
+        with open(file_path, "wb") as f:
+            f.write(content)
+        return file_path
+
+    def load_both(self, file_path: str):
+        """Načte soubor přes pd.read_csv i přes pyarrow a vrátí oba výsledky (nebo text výjimky)."""
+        results = []
+        for engine in ("pandas", "pyarrow"):
+            loader = DataLoader(file_path, encoding_cache=None, csv_engine=engine)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results.append(loader.load_data())
+            except ValueError as e:
+                results.append(str(e))
+        return results
+
+    def test_engines_match(self):
+        """Test, že obě cesty načtou české, chybějící, citované i mezerami obalené hodnoty stejně."""
+        files = [
+            self.write("cz.csv", ("Datum;Položka;Kategorie;Množství;Cena za jednotku;Celková cena\r\n"
+                                  "12.04.2024;Banány;Potraviny;1;26,51;26,51\r\n\r\n"
+                                  "13.04.2024;\"Mýdlo; velké\";Drogerie; 2 ;1 234,50;NA\r\n").encode("windows-1250")),
+            self.write("bom.csv", ("\ufeff" + HEADER + "2024-04-12,Banány,Potraviny,1,26.51,26.51\n"
+                                   "2024-04-13,,Drogerie,,3,\n"
+                                   "2024-04-14,\"a \"\"b\"\"\",null,3,1e1,30\n").encode("utf-8")),
+            self.write("header.csv", HEADER.encode("utf-8")),
+        ]
+        for file_path in files:
+            expected, data = self.load_both(file_path)
+            pd.testing.assert_frame_equal(data, expected, check_exact=True)
+
+    def test_floats_match_bit_for_bit(self):
+        """Test, že obě cesty převedou desetinná čísla na stejné (správně zaokrouhlené) hodnoty."""
+        values = np.random.default_rng(0).uniform(-1e6, 1e6, 5000)
+        lines = [f"{value},{value:.17g},{value:.3e},{abs(value):.2f}" for value in values.tolist()]
+        file_path = self.write("floats.csv", ("a,b,c,d\n" + "\n".join(lines) + "\n").encode("utf-8"))
+        expected, data = self.load_both(file_path)
+        pd.testing.assert_frame_equal(data, expected, check_exact=True)
+        np.testing.assert_array_equal(data["a"].to_numpy(), values)
+
+    def test_dtypes_match(self):
+        """Test, že obě cesty odvodí stejné typy i pro bool, znaménko "+", hexadecimální a příliš velká čísla."""
+        columns = {
+            "bool": ["True", "False", "true"],
+            "bool_na": ["TRUE", "", "false"],
+            "plus": ["+1", "2", " -3 "],
+            "hex": ["0x10", "1", "2"],
+            "big": ["99999999999999999999", "1", "2"],
+            "uint": ["9999999999999999999", "1", "2"],
+            "inf": ["inf", "-Infinity", "1.5"],
+            "overflow": ["1e400", "1e-400", "1.5"],
+            "dots": ["1.", ".5", "1E+05"],
+            "integral": ["2.0", " 3", "4"],
+            "text": ["abc", "1", "1 5"],
+        }
+        expected_dtypes = {"bool": "bool", "bool_na": "object", "plus": "int64", "hex": "object", "big": "object",
+                           "uint": "uint64", "inf": "float64", "overflow": "object", "dots": "float64",
+                           "integral": "float64", "text": "object"}
+        for name, values in columns.items():
+            with self.subTest(column=name):
+                # Každý sloupec ve vlastním souboru - jinak by celý soubor načetl pd.read_csv kvůli jedinému sloupci
+                content = "a,b\n" + "".join(f"{value},{index}\n" for index, value in enumerate(values))
+                expected, data = self.load_both(self.write(f"{name}.csv", content.encode("utf-8")))
+                pd.testing.assert_frame_equal(data, expected, check_exact=True)
+                self.assertEqual(str(data["a"].dtype), expected_dtypes[name])
+
+    def test_unambiguous_columns_stay_in_pyarrow(self):
+        """Test, že celá čísla, desetinná čísla a text načte pyarrow bez přechodu na pd.read_csv."""
+        file_path = self.write("plain.csv", (HEADER + "2024-04-12,Banány,Potraviny,+1,26.51,26.51\n"
+                                             "2024-04-13,0x10,Drogerie,2,3,6\n").encode("utf-8"))
+        with MappedFile(file_path) as mapped:
+            data, engine = read_csv_mapped(mapped, "utf-8", ",", "pyarrow")
+        self.assertEqual(engine, "pyarrow")
+        self.assertEqual(list(data.dtypes.astype(str)), ["object", "object", "object", "int64", "float64", "float64"])
+
+    def test_missing_text_is_nan(self):
+        """Test, že chybějící text je NaN (jako v pd.read_csv), ne None."""
+        file_path = self.write("missing.csv", (HEADER + "12.04.2024,,Potraviny,1,2,2\n").encode("utf-8"))
+        with MappedFile(file_path) as mapped:
+            data, engine = read_csv_mapped(mapped, "utf-8", ",", "pyarrow")
+        self.assertEqual(engine, "pyarrow")
+        self.assertIsInstance(data["Položka"].iloc[0], float)
+
+    def test_fallback_and_errors(self):
+        """Test, že soubor, který pyarrow nenačte, zpracuje pd.read_csv a prázdný soubor je chyba v obou cestách."""
+        file_path = self.write("ragged.csv", b"Datum,Polozka\n1,2,3\n")
+        with MappedFile(file_path) as mapped:
+            expected = pd.read_csv(file_path, float_precision=FLOAT_PRECISION)
+            data, engine = read_csv_mapped(mapped, "utf-8", ",", "pyarrow")
+        self.assertEqual(engine, "pandas")
+        pd.testing.assert_frame_equal(data, expected, check_exact=True)
+
+        expected, data = self.load_both(self.write("empty.csv", b""))
+        self.assertIn("je prázdný", data)
+        self.assertEqual(data, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
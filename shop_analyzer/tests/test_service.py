@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+from shop_analyzer.src import service
+from shop_analyzer.src.service import AnalyzerService, DatasetRegistry, LRUCache, create_server
+
+HEADER = "Datum,Položka,Kategorie,Množství,Cena za jednotku,Celková cena\n"
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného adresáře s daty a služby nad ním."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "nakupy.csv")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write(HEADER +
+                    "12.04.2024,Banány,Potraviny,1,26.51,26.51\n"
+                    "31.05.2024,Jablka,Potraviny,2,15.08,30.16\n"
+                    "02.08.2024,Šampon,Drogerie,1,64.1,64.1\n")
+        self.registry = DatasetRegistry(self.tmp_dir.name, use_cache=False)
+        self.service = AnalyzerService(self.registry, cache_size=8)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lru_eviction(self):
+        """Test, že LRU cache zahodí nejdéle nepoužitou položku."""
+        cache = LRUCache(capacity=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 0)
+        cache.get_or_compute("c", lambda: 3)
+        self.assertEqual(cache.get_or_compute("a", lambda: 0), 1)
+        self.assertEqual(cache.get_or_compute("b", lambda: 0), 0)
+        self.assertEqual(cache.hits, 2)
+
+    def test_cached_query_and_reload(self):
+        """Test, že opakovaný dotaz jde z cache a po změně souboru se data znovu načtou."""
+        first = self.service.query("nakupy.csv", "category_analysis")
+        self.assertIs(self.service.query("nakupy.csv", "category_analysis"), first)
+
+        with open(self.source, "a", encoding="utf-8") as f:
+            f.write("03.08.2024,Mýdlo,Drogerie,1,20,20\n")
+        os.utime(self.source, ns=(0, os.stat(self.source).st_mtime_ns + 1))
+        self.assertEqual(self.registry.refresh(), ["nakupy.csv"])
+        updated = self.service.query("nakupy.csv", "category_analysis")
+        self.assertAlmostEqual(updated["Celkové výdaje"].sum(), first["Celkové výdaje"].sum() + 20)
+
+    def test_cold_load_does_not_block_other_datasets(self):
+        """Test, že pomalé první načtení souboru neblokuje dotazy na jiný soubor a načte se jen jednou."""
+        with open(os.path.join(self.tmp_dir.name, "velky.csv"), "w", encoding="utf-8") as f:
+            f.write(HEADER + "01.01.2024,Banány,Potraviny,1,26.51,26.51\n")
+        cached = self.registry.get("nakupy.csv")
+        started, release, loads = threading.Event(), threading.Event(), []
+
+        class SlowDataset(service.Dataset):
+            def __init__(self, name, *args, **kwargs):
+                loads.append(name)
+                started.set()
+                release.wait(10)
+                super().__init__(name, *args, **kwargs)
+
+        results = []
+        with mock.patch.object(service, "Dataset", SlowDataset):
+            threads = [threading.Thread(target=lambda: results.append(self.registry.get("velky.csv")))
+                       for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            self.assertTrue(started.wait(10))
+            self.assertIs(self.registry.get("nakupy.csv"), cached)
+            self.assertEqual(list(self.registry.stats()), ["nakupy.csv"])
+            release.set()
+            for thread in threads:
+                thread.join(10)
+        self.assertEqual(loads, ["velky.csv"])
+        self.assertEqual(len(results), 2)
+        self.assertIs(results[0], results[1])
+
+    def test_failed_load_is_reported_to_all_waiters(self):
+        """Test, že chyba načtení se nahlásí a další dotaz se o načtení pokusí znovu."""
+        with self.assertRaises(FileNotFoundError):
+            self.registry.get("chybi.csv")
+        with open(os.path.join(self.tmp_dir.name, "chybi.csv"), "w", encoding="utf-8") as f:
+            f.write(HEADER + "01.01.2024,Banány,Potraviny,1,26.51,26.51\n")
+        self.assertEqual(self.registry.get("chybi.csv").rows, 1)
+
+    def test_chart_is_rendered_in_memory(self):
+        """Test, že graf se vrátí jako PNG bez zápisu souborů na disk."""
+        reports = os.path.join(os.path.dirname(os.path.dirname(service.__file__)), "output", "reports")
+
+        def listing() -> list:
+            return [sorted(os.listdir(path)) if os.path.isdir(path) else [] for path in (self.tmp_dir.name, reports)]
+
+        before = listing()
+        png = self.service.chart("nakupy.csv", "monthly_expenses", {"from": ["2024-05-01"]})
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        self.assertIs(self.service.chart("nakupy.csv", "monthly_expenses", {"from": ["2024-05-01"]}), png)
+        self.assertEqual(listing(), before)
+
+    def test_http_server(self):
+        """Test dotazů na metriky, grafy a chybových odpovědí přes HTTP."""
+        server = create_server(self.service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(f"{base}/datasets/nakupy.csv/expenses?granularity=year"
+                                        f"&category=Potraviny") as response:
+                records = json.loads(response.read())
+            self.assertEqual(records, [{"Období": "2024", "Výdaje": 56.67, "Množství": 3, "Počet nákupů": 2}])
+            with urllib.request.urlopen(f"{base}/datasets/nakupy.csv/charts/top_items.png") as response:
+                self.assertEqual(response.headers["Content-Type"], "image/png")
+                self.assertTrue(response.read().startswith(b"\x89PNG"))
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{base}/datasets/chybi.csv/top_items")
+            self.assertEqual(error.exception.code, 404)
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{base}/datasets/nakupy.csv/median")
+            self.assertEqual(error.exception.code, 400)
+            with mock.patch.object(self.service, "query", side_effect=KeyError("Výdaje")), \
+                    mock.patch.object(service.ServiceRequestHandler, "log_error") as log_error, \
+                    self.assertRaises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{base}/datasets/nakupy.csv/top_items")
+            self.assertEqual(error.exception.code, 500)
+            self.assertIn("error", json.loads(error.exception.read()))
+            log_error.assert_called_once()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
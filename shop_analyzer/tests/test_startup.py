@@ -0,0 +1,87 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+from shop_analyzer.src.cube import GRANULARITIES
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Spustí main.py jako skript a vypíše, které těžké knihovny byly importovány
+PROBE = """
+import contextlib, io, json, runpy, sys
+sys.argv = ["main.py"] + {argv!r}
+with contextlib.redirect_stdout(io.StringIO()), contextlib.suppress(SystemExit):
+    runpy.run_path("main.py", run_name="__main__")
+print(json.dumps({{name: name in sys.modules for name in ("pandas", "matplotlib")}}))
+"""
+
+
+def run_cli(*argv) -> dict:
+    """Spustí CLI v novém procesu a vrátí, zda byly importovány pandas a matplotlib."""
+    result = subprocess.run([sys.executable, "-c", PROBE.format(argv=list(argv))], cwd=PROJECT_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_main():
+    """Importuje main.py (a jeho balíček src) tak, jak ho spouští CLI ze složky projektu."""
+    sys.path.insert(0, PROJECT_DIR)
+    try:
+        import main
+    finally:
+        sys.path.remove(PROJECT_DIR)
+    return main
+
+
+class TestStartup(unittest.TestCase):
+    def test_missing_file_and_help_skip_heavy_imports(self):
+        """Test, že nápověda a neexistující soubor se obslouží bez importu Pandas a Matplotlib."""
+        for argv in (["--help"], ["analyze", "--help"], ["validate", "neexistujici_soubor.csv"]):
+            self.assertEqual(run_cli(*argv), {"pandas": False, "matplotlib": False}, argv)
+
+    def test_analyze_skips_matplotlib(self):
+        """Test, že příkazy validate a analyze neimportují Matplotlib."""
+        for command in ("validate", "analyze"):
+            modules = run_cli(command, "nakupy.csv", "--no-cache")
+            self.assertTrue(modules["pandas"])
+            self.assertFalse(modules["matplotlib"], command)
+
+    def test_period_choices_match_cube(self):
+        """Test, že volby --period odpovídají granularitám agregační kostky."""
+        self.assertEqual(tuple(import_main().PERIODS), tuple(GRANULARITIES))
+
+    def test_plot_does_not_print_period(self):
+        """Test, že příkaz plot jen vykreslí grafy a přehled --period vypíše jen analyze."""
+        main = import_main()
+        import src.visualizer
+        outputs = {}
+        for command in ("plot", "analyze"):
+            with mock.patch.object(src.visualizer, "Visualizer") as visualizer, \
+                    contextlib.redirect_stdout(io.StringIO()) as output:
+                instrumentation = main.main("nakupy.csv", use_cache=False, period="quarter", command=command)
+            self.assertNotIn("error", instrumentation.info)
+            self.assertEqual(visualizer.return_value.render_all.called, command == "plot")
+            outputs[command] = output.getvalue()
+        self.assertNotIn("Výdaje podle kategorií (quarter)", outputs["plot"])
+        self.assertIn("Výdaje podle kategorií (quarter)", outputs["analyze"])
+
+    def test_item_capacity_requires_chunksize(self):
+        """Test, že --item-capacity mimo zpracování jednoho souboru po blocích se odmítne a neignoruje."""
+        main = import_main()
+        for options in ({}, {"chunksize": 2, "incremental": True}):
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                instrumentation = main.main("nakupy.csv", use_cache=False, item_capacity=10, command="analyze",
+                                            **options)
+            self.assertIn("--item-capacity", instrumentation.info["error"], options)
+            self.assertNotIn("Data úspěšně načtena", output.getvalue())
+        with contextlib.redirect_stdout(io.StringIO()):
+            instrumentation = main.main("nakupy.csv", chunksize=2, item_capacity=10, command="validate")
+        self.assertNotIn("error", instrumentation.info)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from shop_analyzer.src.visualizer import Visualizer, render_png
+
+
+class TestVisualizer(unittest.TestCase):
+    def setUp(self):
+        """Nastavení dočasného výstupního adresáře a ukázkových agregací."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.visualizer = Visualizer(output_dir=self.tmp_dir.name)
+        self.results = {
+            "monthly_expenses": pd.DataFrame({"Month": pd.PeriodIndex(["2024-01", "2024-02"], freq="M"),
+                                              "Měsíční výdaje": [120.5, 80.0]}),
+            "category_analysis": pd.DataFrame({"Kategorie": ["Drogerie", "Potraviny"],
+                                               "Celkové výdaje": [64.1, 56.67]}),
+            "top_items": pd.DataFrame({"Položka": ["Jablka", "Banány"], "Celkový počet": [5, 1]}),
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_render_all_creates_charts(self):
+        """Test vykreslení všech grafů."""
+        paths = self.visualizer.render_all(self.results)
+        self.assertEqual(set(paths), set(self.results))
+        for path in paths.values():
+            self.assertTrue(os.path.exists(path))
+
+    def test_unchanged_aggregate_is_not_rendered_again(self):
+        """Test, že nezměněná agregace se znovu nevykresluje a změněná ano."""
+        first = self.visualizer.render_all(self.results)
+        modified_time = os.path.getmtime(first["top_items"])
+        os.utime(first["top_items"], (0, 0))
+
+        self.results["monthly_expenses"].loc[0, "Měsíční výdaje"] = 121.0
+        second = self.visualizer.render_all(self.results)
+        self.assertEqual(second["top_items"], first["top_items"])
+        self.assertEqual(os.path.getmtime(second["top_items"]), 0)
+        self.assertNotEqual(second["monthly_expenses"], first["monthly_expenses"])
+        self.assertGreater(modified_time, 0)
+
+    def test_old_versions_are_pruned(self):
+        """Test, že po změně agregace zůstane od každého grafu jen aktuální soubor."""
+        timestamped = os.path.join(self.tmp_dir.name, "top_items_20250118_180927.png")
+        open(timestamped, "wb").close()
+        for value in [121.0, 122.0, 123.0]:
+            self.results["monthly_expenses"].loc[0, "Měsíční výdaje"] = value
+            paths = self.visualizer.render_all(self.results)
+
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)),
+                         sorted([os.path.basename(path) for path in paths.values()] + [os.path.basename(timestamped)]))
+
+    def test_concurrent_render_matches_serial(self):
+        """Test, že grafy vykreslené souběžně ve vláknech jsou shodné s postupným vykreslením do paměti."""
+        paths = self.visualizer.render_all(self.results)
+        for chart, path in paths.items():
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), render_png(chart, self.results[chart]), chart)
+
+    def test_unknown_chart(self):
+        """Test zachycení neznámého typu grafu."""
+        with self.assertRaises(ValueError):
+            self.visualizer.render_all({"unknown": pd.DataFrame()})
+
+
+if __name__ == "__main__":
+    unittest.main()